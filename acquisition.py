@@ -0,0 +1,252 @@
+# /// script
+# requires-python = ">=3.9"
+# dependencies = ["adafruit-blinka"]
+# ///
+"""
+Acquisition continue de l'AHT20 dans un tampon circulaire
+
+Un fil echantillonne le capteur a frequence fixe et range chaque
+echantillon (horodatage, temperature, humidite) dans un tampon
+circulaire preallouee: un array('d') de taille fixe, jamais agrandi.
+La memoire reste constante, meme apres des semaines de fonctionnement.
+
+Les lectures rendent des memoryview sur le tampon, sans copie:
+    - dernier():      les 3 valeurs du dernier echantillon
+    - fenetre(n):     les n derniers echantillons, du plus ancien au
+                      plus recent, en une seule vue contigue
+    - instantane():   tout le contenu valide du tampon
+
+Chaque echantillon est ecrit deux fois (a l'indice i et i + capacite):
+toute fenetre est alors une tranche contigue, meme a cheval sur la fin
+du tampon. Une vue est vivante: elle reflete les ecritures qui suivent.
+Pour figer des valeurs, copier la vue (array('d', vue), vue.tolist()).
+
+colonne(vue, "temperature") extrait un champ d'une vue (tranche a pas
+de 3, toujours sans copie).
+
+Avec --partage, chaque echantillon est aussi publie en memoire partagee
+pour les autres processus (voir memoire_partagee.py).
+
+Usage: python3 acquisition.py [--frequence 1] [--capacite 86400] [--partage] [--simulation]
+"""
+
+import argparse
+import math
+import sys
+import threading
+import time
+from array import array
+
+import aht20
+from memoire_partagee import NOM_DEFAUT as NOM_PARTAGE, PublicationPartagee, SegmentOccupe
+
+
+CHAMPS = ("horodatage", "temperature", "relative_humidity")
+LARGEUR = len(CHAMPS)
+
+# Une journee a 1 Hz
+CAPACITE_DEFAUT = 86400
+
+
+def colonne(vue, champ):
+    """
+    Vue sur un seul champ d'une fenetre.
+
+    Args:
+        vue: Vue retournee par dernier(), fenetre() ou instantane()
+        champ: Un des CHAMPS
+
+    Returns:
+        memoryview: Valeurs du champ, dans l'ordre des echantillons
+    """
+    return vue[CHAMPS.index(champ)::LARGEUR]
+
+
+class TamponCirculaire:
+    """
+    Tampon circulaire d'echantillons dans un array('d') preallouee.
+
+    Args:
+        capacite: Nombre d'echantillons conserves
+    """
+
+    def __init__(self, capacite=CAPACITE_DEFAUT):
+        if capacite < 1:
+            raise ValueError("La capacite doit etre d'au moins 1 echantillon")
+        self.capacite = capacite
+        # Deux copies consecutives du tampon, voir la docstring du module
+        self._donnees = array('d', bytes(8 * LARGEUR * 2 * capacite))
+        self._vue = memoryview(self._donnees)
+        self._suivant = 0
+        self.total = 0
+
+    def __len__(self):
+        return min(self.total, self.capacite)
+
+    def ajouter(self, horodatage, temperature, humidite):
+        """Range un echantillon, en ecrasant le plus ancien si plein."""
+        debut = self._suivant * LARGEUR
+        miroir = debut + self.capacite * LARGEUR
+        donnees = self._donnees
+        donnees[debut] = donnees[miroir] = horodatage
+        donnees[debut + 1] = donnees[miroir + 1] = temperature
+        donnees[debut + 2] = donnees[miroir + 2] = humidite
+        self._suivant = (self._suivant + 1) % self.capacite
+        self.total += 1
+
+    def fenetre(self, n):
+        """
+        Les n derniers echantillons, du plus ancien au plus recent.
+
+        Args:
+            n: Nombre d'echantillons (limite au contenu du tampon)
+
+        Returns:
+            memoryview: 3 * n valeurs (horodatage, temperature, humidite)
+        """
+        n = max(0, min(n, len(self)))
+        fin = (self._suivant + self.capacite) * LARGEUR
+        return self._vue[fin - n * LARGEUR:fin]
+
+    def dernier(self):
+        """Le dernier echantillon (vue de 3 valeurs), ou None si vide."""
+        if not self.total:
+            return None
+        return self.fenetre(1)
+
+    def instantane(self):
+        """Tout le contenu valide du tampon, du plus ancien au plus recent."""
+        return self.fenetre(self.capacite)
+
+
+class Acquisition:
+    """
+    Fil qui lit le capteur a frequence fixe et remplit un tampon.
+
+    Les echeances sont calculees a partir du debut (pas de derive); une
+    echeance manquee (lecture trop longue) est sautee plutot que
+    rattrapee en rafale.
+
+    Args:
+        capteur: Objet avec une methode lire() -> Echantillon (CapteurAHT20)
+        tampon: TamponCirculaire a remplir
+        periode: Intervalle entre deux mesures (secondes)
+        publication: PublicationPartagee optionnelle, mise a jour a
+            chaque echantillon (ce fil en est l'unique ecrivain)
+    """
+
+    def __init__(self, capteur, tampon, periode=1.0, publication=None):
+        self.capteur = capteur
+        self.tampon = tampon
+        self.periode = periode
+        self.publication = publication
+        self.erreurs = 0
+        self.derniere_erreur = None
+        self._arret = threading.Event()
+        self._fil = None
+
+    def demarrer(self):
+        self._arret.clear()
+        self._fil = threading.Thread(target=self._boucle, name="acquisition-aht20", daemon=True)
+        self._fil.start()
+
+    def arreter(self):
+        self._arret.set()
+        if self._fil is not None:
+            self._fil.join()
+            self._fil = None
+
+    def _boucle(self):
+        echeance = time.monotonic()
+        while not self._arret.is_set():
+            try:
+                echantillon = self.capteur.lire()
+                self.tampon.ajouter(*echantillon)
+                if self.publication is not None:
+                    self.publication.publier(echantillon)
+            except (aht20.ErreurAHT20, OSError) as e:
+                # Capteur debranche, trame corrompue: on continue
+                self.erreurs += 1
+                self.derniere_erreur = e
+
+            echeance += self.periode
+            maintenant = time.monotonic()
+            if echeance < maintenant:
+                echeance += (maintenant - echeance) // self.periode * self.periode + self.periode
+            self._arret.wait(echeance - maintenant)
+
+
+def reel_positif(texte):
+    """Argument reel fini et strictement positif (frequence, intervalle)."""
+    try:
+        valeur = float(texte)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"nombre invalide: {texte}")
+    if not (math.isfinite(valeur) and valeur > 0):
+        raise argparse.ArgumentTypeError(f"doit etre strictement positif: {texte}")
+    return valeur
+
+
+def entier_positif(texte):
+    """Argument entier strictement positif (capacite)."""
+    try:
+        valeur = int(texte)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"entier invalide: {texte}")
+    if valeur <= 0:
+        raise argparse.ArgumentTypeError(f"doit etre strictement positif: {texte}")
+    return valeur
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Acquisition continue de l'AHT20")
+    parser.add_argument("--frequence", type=reel_positif, default=1.0,
+                        help="Mesures par seconde (defaut: 1)")
+    parser.add_argument("--capacite", type=entier_positif, default=CAPACITE_DEFAUT,
+                        help=f"Echantillons conserves (defaut: {CAPACITE_DEFAUT})")
+    parser.add_argument("--affichage", type=reel_positif, default=10.0,
+                        help="Intervalle d'affichage en secondes (defaut: 10)")
+    parser.add_argument("--partage", nargs="?", const=NOM_PARTAGE, default=None, metavar="NOM",
+                        help=f"Publier en memoire partagee (defaut: {NOM_PARTAGE})")
+    parser.add_argument("--simulation", action="store_true",
+                        help="Utiliser le bus I2C simule de tests/simulation")
+    args = parser.parse_args()
+
+    if args.simulation:
+        sys.path.insert(0, str(aht20.FAKES_SIMULATION))
+    import board
+
+    try:
+        publication = PublicationPartagee(args.partage) if args.partage else None
+    except SegmentOccupe as e:
+        print(f"Erreur: {e}")
+        return 1
+    tampon = TamponCirculaire(args.capacite)
+    acquisition = Acquisition(aht20.CapteurAHT20(board.I2C()), tampon, 1.0 / args.frequence,
+                              publication)
+    acquisition.demarrer()
+
+    fenetre = max(1, int(args.affichage * args.frequence))
+    try:
+        while True:
+            time.sleep(args.affichage)
+            vue = tampon.fenetre(fenetre)
+            if not len(vue):
+                continue
+            temperatures = colonne(vue, "temperature")
+            humidites = colonne(vue, "relative_humidity")
+            print(f"{time.strftime('%H:%M:%S')}  "
+                  f"T {temperatures[-1]:5.1f} C (min {min(temperatures):.1f}, max {max(temperatures):.1f})  "
+                  f"H {humidites[-1]:5.1f} %  "
+                  f"[{len(tampon)}/{tampon.capacite} echantillons, {acquisition.erreurs} erreurs]")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        acquisition.arreter()
+        if publication is not None:
+            publication.fermer()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
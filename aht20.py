@@ -0,0 +1,326 @@
+# /// script
+# requires-python = ">=3.9"
+# dependencies = ["adafruit-blinka"]
+# ///
+"""
+Lecture du capteur AHT20 en echantillons coherents
+
+Avec le pilote adafruit_ahtx0, sensor.temperature et
+sensor.relative_humidity declenchent chacun leur propre mesure (environ
+80 ms): une lecture des deux valeurs coute deux conversions et les
+valeurs ne viennent pas du meme instant.
+
+CapteurAHT20.lire() declenche une seule conversion et decode la
+temperature et l'humidite de la meme trame de 6 octets (verifiee par
+son CRC-8) en un Echantillon horodate. Les noms des champs reprennent
+ceux du pilote Adafruit: echantillon.temperature,
+echantillon.relative_humidity.
+
+Deux facons d'attendre la fin de la conversion:
+    - MODE_SCRUTATION (defaut): attente courte puis lecture du bit
+      occupe du statut avec un intervalle croissant (1 puis 2 ms);
+      l'echantillon est rendu des que la conversion est terminee.
+    - MODE_FIXE: attente fixe de 80 ms (fiche technique), puis relecture
+      toutes les 10 ms si le capteur est encore occupe.
+
+Le capteur tient un histogramme des latences de conversion
+(capteur.latences) pour voir leur distribution reelle sur nos cartes.
+
+Fonctionne avec tout bus I2C au sens CircuitPython (board.I2C(),
+busio.I2C) y compris le bus simule de tests/simulation (--simulation).
+
+Usage: python3 aht20.py [-n 20] [--mode scrutation|fixe] [--attente 5] [--simulation]
+"""
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+
+ADRESSE_AHT20 = 0x38
+
+CMD_CALIBRER = (0xBE, 0x08, 0x00)
+CMD_MESURER = (0xAC, 0x33, 0x00)
+CMD_RESET = (0xBA,)
+
+STATUT_OCCUPE = 0x80
+STATUT_CALIBRE = 0x08
+
+# Fiche technique: mise sous tension et reset 20 ms, conversion 80 ms
+DELAI_DEMARRAGE = 0.020
+DELAI_CONVERSION = 0.080
+
+# Attente supplementaire si le bit occupe est encore leve apres 80 ms
+DELAI_RELECTURE = 0.010
+RELECTURES_MAX = 10
+
+MODE_SCRUTATION = "scrutation"
+MODE_FIXE = "fixe"
+
+# Scrutation: courte attente avant la premiere lecture du statut, puis
+# intervalle double jusqu'a 2 ms. L'attente par defaut reste bien sous
+# la plus courte conversion possible; l'allonger d'apres l'histogramme
+# des latences mesure sur le materiel (--attente) economise des lectures.
+SCRUTATION_ATTENTE = 0.005
+SCRUTATION_PAS_MIN = 0.001
+SCRUTATION_PAS_MAX = 0.002
+SCRUTATION_DELAI_MAX = 0.250
+
+FAKES_SIMULATION = Path(__file__).parent / "tests" / "simulation" / "fakes"
+
+
+class Echantillon(NamedTuple):
+    """Une mesure: temperature et humidite issues de la meme conversion."""
+
+    horodatage: float         # time.time() a la fin de la conversion
+    temperature: float        # degres Celsius
+    relative_humidity: float  # pourcentage
+
+
+class ErreurAHT20(RuntimeError):
+    """Trame invalide ou capteur qui ne repond pas comme attendu."""
+
+
+def crc8(donnees):
+    """CRC-8 de la trame AHT20 (polynome 0x31, valeur initiale 0xFF)."""
+    crc = 0xFF
+    for octet in donnees:
+        crc ^= octet
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x31) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def decoder_trame(trame):
+    """
+    Decode une trame de mesure.
+
+    Args:
+        trame: 7 octets (statut, 20 bits d'humidite, 20 bits de
+            temperature, CRC-8) ou 6 octets sans CRC
+
+    Returns:
+        tuple: (temperature en C, humidite en %)
+
+    Raises:
+        ErreurAHT20: Conversion non terminee ou CRC invalide
+    """
+    if trame[0] & STATUT_OCCUPE:
+        raise ErreurAHT20("Conversion non terminee (bit occupe)")
+    if len(trame) > 6 and crc8(trame[:6]) != trame[6]:
+        raise ErreurAHT20("CRC invalide")
+
+    brute_h = (trame[1] << 12) | (trame[2] << 4) | (trame[3] >> 4)
+    brute_t = ((trame[3] & 0x0F) << 16) | (trame[4] << 8) | trame[5]
+    return brute_t * 200.0 / 0x100000 - 50, brute_h * 100.0 / 0x100000
+
+
+class HistogrammeLatences:
+    """
+    Histogramme des latences de conversion, par tranches de largeur fixe.
+
+    Args:
+        largeur: Largeur d'une tranche (secondes)
+        maximum: Les latences au-dela tombent dans la derniere tranche
+    """
+
+    def __init__(self, largeur=0.001, maximum=0.200):
+        self.largeur = largeur
+        self.comptes = [0] * (int(math.ceil(maximum / largeur)) + 1)
+        self.total = 0
+        self.somme = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+
+    def ajouter(self, latence):
+        tranche = min(int(latence / self.largeur), len(self.comptes) - 1)
+        self.comptes[tranche] += 1
+        self.total += 1
+        self.somme += latence
+        self.minimum = min(self.minimum, latence)
+        self.maximum = max(self.maximum, latence)
+
+    @property
+    def moyenne(self):
+        return self.somme / self.total if self.total else 0.0
+
+    def centile(self, p):
+        """
+        Centile p (0-100) des latences, arrondi a la tranche.
+
+        Returns:
+            float: Borne superieure de la tranche qui contient le centile:
+                la valeur rendue depasse le centile exact d'au plus une
+                largeur de tranche
+        """
+        if not self.total:
+            return 0.0
+        rang = p / 100 * self.total
+        cumul = 0
+        for tranche, compte in enumerate(self.comptes):
+            cumul += compte
+            if cumul >= rang and compte:
+                return (tranche + 1) * self.largeur
+        return len(self.comptes) * self.largeur
+
+    def lignes(self, largeur_barre=40):
+        """
+        Representation texte, une ligne par tranche non vide.
+
+        Returns:
+            list: Lignes "  76-77 ms  ######  12"
+        """
+        plus_grand = max(self.comptes, default=0)
+        lignes = []
+        for tranche, compte in enumerate(self.comptes):
+            if not compte:
+                continue
+            debut = tranche * self.largeur * 1000
+            fin = debut + self.largeur * 1000
+            barre = "#" * max(1, round(compte * largeur_barre / plus_grand))
+            lignes.append(f"  {debut:4.0f}-{fin:.0f} ms  {barre:<{largeur_barre}}  {compte}")
+        return lignes
+
+
+class CapteurAHT20:
+    """
+    AHT20 lu directement sur le bus I2C.
+
+    Args:
+        i2c: Bus I2C (board.I2C(), busio.I2C)
+        adresse: Adresse du capteur (defaut: 0x38)
+        mode: MODE_SCRUTATION ou MODE_FIXE
+        attente: Scrutation: attente avant la premiere lecture du statut
+            (secondes)
+    """
+
+    def __init__(self, i2c, adresse=ADRESSE_AHT20, mode=MODE_SCRUTATION,
+                 attente=SCRUTATION_ATTENTE):
+        if mode not in (MODE_SCRUTATION, MODE_FIXE):
+            raise ValueError(f"Mode inconnu: {mode}")
+        self.i2c = i2c
+        self.adresse = adresse
+        self.mode = mode
+        self.attente = attente
+        self.latences = HistogrammeLatences()
+        self._trame = bytearray(7)
+        self._commande = bytearray(3)
+
+        time.sleep(DELAI_DEMARRAGE)
+        self._ecrire(CMD_RESET)
+        time.sleep(DELAI_DEMARRAGE)
+        self._ecrire(CMD_CALIBRER)
+        time.sleep(DELAI_RELECTURE)
+        if not self.statut() & STATUT_CALIBRE:
+            raise ErreurAHT20("Calibration du capteur impossible")
+
+    def _verrouiller(self):
+        while not self.i2c.try_lock():
+            pass
+
+    def _ecrire(self, commande):
+        self._commande[:len(commande)] = bytes(commande)
+        self._verrouiller()
+        try:
+            self.i2c.writeto(self.adresse, self._commande, end=len(commande))
+        finally:
+            self.i2c.unlock()
+
+    def _lire(self, longueur):
+        self._verrouiller()
+        try:
+            self.i2c.readfrom_into(self.adresse, self._trame, end=longueur)
+        finally:
+            self.i2c.unlock()
+
+    def statut(self):
+        """Octet de statut du capteur."""
+        self._lire(1)
+        return self._trame[0]
+
+    def _attendre_fixe(self):
+        time.sleep(DELAI_CONVERSION)
+        self._lire(7)
+        for _ in range(RELECTURES_MAX):
+            if not self._trame[0] & STATUT_OCCUPE:
+                break
+            time.sleep(DELAI_RELECTURE)
+            self._lire(7)
+
+    def _attendre_scrutation(self, debut):
+        time.sleep(self.attente)
+        pas = SCRUTATION_PAS_MIN
+        while self.statut() & STATUT_OCCUPE:
+            if time.perf_counter() - debut > SCRUTATION_DELAI_MAX:
+                raise ErreurAHT20("Conversion trop longue (bit occupe toujours leve)")
+            time.sleep(pas)
+            pas = min(pas * 2, SCRUTATION_PAS_MAX)
+        self._lire(7)
+
+    def lire(self):
+        """
+        Declenche une conversion et retourne les deux valeurs mesurees.
+
+        Returns:
+            Echantillon: Horodatage, temperature et humidite
+
+        Raises:
+            ErreurAHT20: Trame invalide
+        """
+        self._ecrire(CMD_MESURER)
+        debut = time.perf_counter()
+        if self.mode == MODE_SCRUTATION:
+            self._attendre_scrutation(debut)
+        else:
+            self._attendre_fixe()
+        self.latences.ajouter(time.perf_counter() - debut)
+        horodatage = time.time()
+        temperature, humidite = decoder_trame(self._trame)
+        return Echantillon(horodatage, temperature, humidite)
+
+
+def afficher_latences(histogramme):
+    """Affiche le resume et l'histogramme des latences de conversion."""
+    print(f"\nLatences de conversion ({histogramme.total} mesures): "
+          f"min {histogramme.minimum * 1000:.1f} ms, "
+          f"moyenne {histogramme.moyenne * 1000:.1f} ms, "
+          f"p50 {histogramme.centile(50) * 1000:.0f} ms, "
+          f"p99 {histogramme.centile(99) * 1000:.0f} ms, "
+          f"max {histogramme.maximum * 1000:.1f} ms")
+    for ligne in histogramme.lignes():
+        print(ligne)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lecture de l'AHT20 (temperature et humidite)")
+    parser.add_argument("-n", "--mesures", type=int, default=1,
+                        help="Nombre de mesures (defaut: 1)")
+    parser.add_argument("--mode", choices=[MODE_SCRUTATION, MODE_FIXE], default=MODE_SCRUTATION,
+                        help="Attente de fin de conversion (defaut: scrutation)")
+    parser.add_argument("--attente", type=float, default=SCRUTATION_ATTENTE * 1000,
+                        help="Scrutation: attente avant la premiere lecture du statut "
+                             f"en ms (defaut: {SCRUTATION_ATTENTE * 1000:g})")
+    parser.add_argument("--simulation", action="store_true",
+                        help="Utiliser le bus I2C simule de tests/simulation")
+    args = parser.parse_args()
+
+    if args.simulation:
+        sys.path.insert(0, str(FAKES_SIMULATION))
+    import board
+
+    capteur = CapteurAHT20(board.I2C(), mode=args.mode, attente=args.attente / 1000)
+    for _ in range(args.mesures):
+        echantillon = capteur.lire()
+        print(f"Temperature: {echantillon.temperature:.1f} C")
+        print(f"Humidite: {echantillon.relative_humidity:.1f} %")
+
+    if args.mesures > 1:
+        afficher_latences(capteur.latences)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,465 @@
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Banc d'essai du script de correction — Formatif F1
+Cours 243-413-SH — Introduction aux objets connectés
+
+Ce script mesure la performance de correction.py avant la session:
+1. Génère N dépôts étudiants synthétiques à partir de gabarits
+2. Corrige un échantillon de dépôts en mode single (un dépôt par appel)
+3. Corrige tous les dépôts en mode batch, avec chaque moteur demandé
+4. Rapporte le débit (dépôts/s), la latence p50/p95 par dépôt et la
+   mémoire maximale (RSS) des processus de correction
+
+Gabarits de dépôts:
+    reussite  Solution complète, marqueurs de validation présents
+    echec     Script minimal (sans main(), try/except), sans marqueurs
+    syntaxe   Script avec une erreur de syntaxe
+    marqueurs Solution complète, mais .test_markers/ absent
+    copie     Copie identique d'un dépôt « reussite » (détection des doublons)
+    boucle    tests/conftest.py modifié qui ne termine jamais (délai des tests)
+
+Un dépôt « boucle » coûte jusqu'à DELAI_TESTS secondes avec le moteur
+« depot » (les moteurs « session » et « fork » utilisent les tests
+canoniques et ne sont pas affectés).
+
+Usage:
+    python3 bench_correction.py [-n 40] [--jobs N] [--moteurs depot,session,fork]
+
+Exemple:
+    python3 bench_correction.py -n 150 --jobs 8 --json bench.json
+    python3 bench_correction.py -n 20 --mix reussite=10,echec=10 --single 0
+"""
+
+import sys
+import os
+import time
+import json
+import shutil
+import resource
+import argparse
+import subprocess
+import tempfile
+from itertools import zip_longest
+from pathlib import Path
+from string import Template
+
+
+RACINE = Path(__file__).resolve().parent
+CORRECTION = RACINE / "correction.py"
+
+# Proportion de chaque gabarit dans un banc de N dépôts (voir --mix)
+MIX_DEFAUT = {
+    "reussite": 0.40,
+    "echec": 0.25,
+    "syntaxe": 0.10,
+    "marqueurs": 0.10,
+    "copie": 0.13,
+    "boucle": 0.02
+}
+
+ENTETE_UV = """\
+# /// script
+# requires-python = ">=3.9"
+# dependencies = ["adafruit-circuitpython-ahtx0", "adafruit-blinka"]
+# ///
+"""
+
+GABARITS = {
+    "reussite": Template(ENTETE_UV + '''\
+"""Lecture du capteur AHT20 via STEMMA QT/I2C — ${etudiant}."""
+
+import board
+import adafruit_ahtx0
+
+
+def main():
+    """Affiche la température et l'humidité mesurées par l'AHT20."""
+    try:
+        i2c = board.I2C()
+        sensor = adafruit_ahtx0.AHTx0(i2c)
+        print(f"Temperature: {sensor.temperature:.1f} C")
+        print(f"Humidite: {sensor.relative_humidity:.1f} %")
+    except Exception as e:
+        print(f"Erreur de lecture du capteur: {e}")
+
+
+if __name__ == "__main__":
+    main()
+'''),
+    "echec": Template(ENTETE_UV + '''\
+"""Test du capteur AHT20 — ${etudiant}."""
+
+import board
+import adafruit_ahtx0
+
+i2c = board.I2C()
+sensor = adafruit_ahtx0.AHTx0(i2c)
+
+print(f"Temperature: {sensor.temperature:.1f} C")
+print(f"Humidite: {sensor.relative_humidity:.1f} %")
+'''),
+    "syntaxe": Template(ENTETE_UV + '''\
+"""Test du capteur AHT20 — ${etudiant}."""
+
+import board
+import adafruit_ahtx0
+
+def main()
+    i2c = board.I2C()
+    sensor = adafruit_ahtx0.AHTx0(i2c)
+    print(f"Temperature: {sensor.temperature:.1f} C")
+'''),
+}
+GABARITS["marqueurs"] = GABARITS["reussite"]
+GABARITS["boucle"] = GABARITS["reussite"]
+
+CONFTEST_BOUCLE = '''\
+"""Configuration pytest modifiée par l'étudiant."""
+
+import time
+
+while True:
+    time.sleep(0.1)
+'''
+
+MARQUEURS = {
+    "ssh_key_verified": "Key: id_ed25519",
+    "aht20_verified": "T=22.4C H=41.0%",
+    "aht20_script_verified": "Script structure valid",
+    "all_tests_passed": "All required validations completed"
+}
+
+
+def repartir_mix(n, mix):
+    """
+    Calcule le nombre de dépôts de chaque gabarit.
+
+    Args:
+        n: Nombre total de dépôts
+        mix: Proportion (ou poids) de chaque gabarit
+
+    Returns:
+        dict: Nombre de dépôts par gabarit (la somme vaut n)
+    """
+    total = sum(mix.values())
+    comptes = {g: int(n * p / total) for g, p in mix.items()}
+    # Répartir le reste selon les plus grandes parts fractionnaires
+    restes = sorted(mix, key=lambda g: n * mix[g] / total - comptes[g], reverse=True)
+    for g in restes[:n - sum(comptes.values())]:
+        comptes[g] += 1
+    return comptes
+
+
+def creer_depot(dossier, gabarit, etudiant, modele=None):
+    """
+    Crée un dépôt étudiant synthétique.
+
+    Args:
+        dossier: Dossier du dépôt à créer
+        gabarit: Nom du gabarit (voir GABARITS)
+        etudiant: Nom inscrit dans le script (rend chaque dépôt distinct)
+        modele: Dépôt à copier tel quel (gabarit « copie »)
+    """
+    if modele is not None:
+        shutil.copytree(modele, dossier)
+        return
+
+    shutil.copytree(RACINE / "tests", dossier / "tests",
+                    ignore=shutil.ignore_patterns("__pycache__", "outils"))
+    (dossier / "test_aht20.py").write_text(GABARITS[gabarit].substitute(etudiant=etudiant))
+    shutil.copy(RACINE / "test_neoslider.py", dossier / "test_neoslider.py")
+
+    if gabarit == "boucle":
+        (dossier / "tests" / "conftest.py").write_text(CONFTEST_BOUCLE)
+
+    if gabarit in ("reussite", "boucle"):
+        marqueurs = dossier / ".test_markers"
+        marqueurs.mkdir()
+        horodatage = time.strftime("%Y-%m-%dT%H:%M:%S")
+        for nom, contenu in MARQUEURS.items():
+            (marqueurs / f"{nom}.txt").write_text(f"Verified: {horodatage}\n{contenu}\n")
+        (marqueurs / "test_summary.txt").write_text("AHT20 OK\nI2C OK\n")
+
+
+def generer_depots(dossier, comptes):
+    """
+    Génère les dépôts synthétiques d'un banc d'essai.
+
+    Args:
+        dossier: Dossier où créer les dépôts
+        comptes: Nombre de dépôts par gabarit (voir repartir_mix)
+
+    Returns:
+        dict: Gabarit de chaque dépôt, par nom de dépôt
+    """
+    gabarits = [g for g, nombre in comptes.items() if g != "copie" for _ in range(nombre)]
+    gabarits += ["copie"] * comptes.get("copie", 0)
+    depots = {}
+    modele = None
+
+    for i, gabarit in enumerate(gabarits):
+        nom = f"etudiant-{i:04d}-{gabarit}"
+        if gabarit == "copie" and modele is None:
+            # Aucun dépôt « reussite » à copier: le premier devient le modèle
+            gabarit, nom = "reussite", f"etudiant-{i:04d}-reussite"
+        creer_depot(dossier / nom, gabarit, nom, modele if gabarit == "copie" else None)
+        if gabarit == "reussite" and modele is None:
+            modele = dossier / nom
+        depots[nom] = gabarit
+
+    return depots
+
+
+def mesurer(cmd):
+    """
+    Exécute une commande dans un processus de mesure dédié.
+
+    Le processus de mesure lance la commande, l'attend, puis rapporte
+    le RSS maximal de ses descendants (getrusage(RUSAGE_CHILDREN)):
+    chaque mesure est ainsi indépendante des précédentes.
+
+    Args:
+        cmd: Commande à exécuter
+
+    Returns:
+        tuple: (durée en secondes, RSS maximal en Mo, code de retour)
+    """
+    debut = time.perf_counter()
+    sortie = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--mesurer", "--"] + cmd,
+        capture_output=True, text=True
+    )
+    duree = time.perf_counter() - debut
+    mesure = json.loads(sortie.stdout.strip().splitlines()[-1])
+    return duree, mesure["rss_mo"], mesure["code"]
+
+
+def executer_mesure(cmd):
+    """
+    Corps du processus de mesure (--mesurer): exécute cmd et affiche la mesure.
+
+    Returns:
+        int: 0
+    """
+    code = subprocess.call(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    rss_mo = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    print(json.dumps({"rss_mo": rss_mo, "code": code}))
+    return 0
+
+
+def centile(valeurs, p):
+    """
+    Calcule un centile par interpolation linéaire.
+
+    Args:
+        valeurs: Liste de valeurs (non vide)
+        p: Centile voulu (0-100)
+
+    Returns:
+        float: Valeur du centile
+    """
+    valeurs = sorted(valeurs)
+    rang = (len(valeurs) - 1) * p / 100
+    bas = int(rang)
+    haut = min(bas + 1, len(valeurs) - 1)
+    return valeurs[bas] + (valeurs[haut] - valeurs[bas]) * (rang - bas)
+
+
+def resumer(mode, duree, rss_mo, latences, depots):
+    """
+    Construit la ligne de résultats d'une mesure.
+
+    Args:
+        mode: Nom de la mesure (ex.: "batch/fork")
+        duree: Durée totale (secondes)
+        rss_mo: RSS maximal (Mo)
+        latences: Latence de chaque dépôt corrigé (secondes)
+        depots: Nombre de dépôts traités
+
+    Returns:
+        dict: Résultats de la mesure
+    """
+    return {
+        "mode": mode,
+        "depots": depots,
+        "duree": duree,
+        "debit": depots / duree if duree > 0 else 0.0,
+        "p50": centile(latences, 50) if latences else None,
+        "p95": centile(latences, 95) if latences else None,
+        "rss_mo": rss_mo
+    }
+
+
+def bench_single(batch, noms, tmp):
+    """
+    Corrige des dépôts un par un (python3 correction.py <dépôt>).
+
+    Args:
+        batch: Dossier des dépôts
+        noms: Noms des dépôts à corriger
+        tmp: Dossier temporaire
+
+    Returns:
+        dict: Résultats de la mesure (voir resumer)
+    """
+    latences = []
+    rss_max = 0.0
+    debut = time.perf_counter()
+    for nom in noms:
+        duree, rss_mo, _ = mesurer([sys.executable, str(CORRECTION), str(batch / nom)])
+        latences.append(duree)
+        rss_max = max(rss_max, rss_mo)
+    return resumer("single", time.perf_counter() - debut, rss_max, latences, len(noms))
+
+
+def bench_batch(batch, moteur, jobs, tmp):
+    """
+    Corrige tous les dépôts en mode batch, sans cache.
+
+    La latence par dépôt provient du profil des phases (--profile):
+    seuls les dépôts réellement corrigés (ni doublons ni cache) comptent.
+
+    Args:
+        batch: Dossier des dépôts
+        moteur: Moteur de correction (depot, session, fork)
+        jobs: Nombre de corrections simultanées
+        tmp: Dossier temporaire
+
+    Returns:
+        dict: Résultats de la mesure (voir resumer)
+    """
+    profil = Path(tmp) / f"profil-{moteur}.jsonl"
+    for fichier in (".correction_journal.jsonl", ".correction_durees.json"):
+        (batch / fichier).unlink(missing_ok=True)
+
+    duree, rss_mo, code = mesurer([
+        sys.executable, str(CORRECTION),
+        "--batch", str(batch),
+        "--jobs", str(jobs),
+        "--moteur", moteur,
+        "--sans-cache",
+        "--rapports", str(Path(tmp) / f"rapports-{moteur}"),
+        "--profile", str(profil)
+    ])
+    if code != 0 or not profil.exists():
+        print(f"❌ batch/{moteur}: correction.py a échoué (code {code})")
+        return None
+
+    lignes = [json.loads(l) for l in profil.read_text().splitlines() if l.strip()]
+    latences = [l["duree"] for l in lignes if l["origine"] == "execution"]
+    return resumer(f"batch/{moteur}", duree, rss_mo, latences, len(lignes))
+
+
+def afficher_resultats(resultats, comptes):
+    """
+    Affiche le tableau des mesures.
+
+    Args:
+        resultats: Liste des résultats (voir resumer)
+        comptes: Nombre de dépôts par gabarit
+    """
+    print(f"\n{'='*70}")
+    print("🏁 BANC D'ESSAI DE CORRECTION")
+    print('='*70)
+    print("Dépôts: " + ", ".join(f"{g}={n}" for g, n in comptes.items() if n))
+    print(f"\n  {'Mode':<16} {'Dépôts':>7} {'Durée':>9} {'Débit':>10} "
+          f"{'p50':>8} {'p95':>8} {'RSS max':>9}")
+    for r in resultats:
+        p50 = f"{r['p50']:.3f}" if r["p50"] is not None else "-"
+        p95 = f"{r['p95']:.3f}" if r["p95"] is not None else "-"
+        print(f"  {r['mode']:<16} {r['depots']:>7} {r['duree']:>8.2f}s "
+              f"{r['debit']:>6.2f}/s {p50:>8} {p95:>8} {r['rss_mo']:>6.1f} Mo")
+
+
+def lire_mix(texte):
+    """
+    Lit --mix: « gabarit=poids,... » (les gabarits omis sont exclus).
+
+    Returns:
+        dict: Poids de chaque gabarit
+    """
+    mix = {}
+    for element in texte.split(","):
+        gabarit, _, poids = element.partition("=")
+        if gabarit not in MIX_DEFAUT:
+            raise argparse.ArgumentTypeError(f"gabarit inconnu: {gabarit}")
+        mix[gabarit] = float(poids or 1)
+    return mix
+
+
+def main():
+    """
+    Fonction principale du banc d'essai.
+    """
+    if len(sys.argv) > 2 and sys.argv[1] == "--mesurer" and sys.argv[2] == "--":
+        return executer_mesure(sys.argv[3:])
+
+    parser = argparse.ArgumentParser(description="Banc d'essai de correction.py (F1)")
+    parser.add_argument("-n", type=int, default=40, help="Nombre de dépôts générés (défaut: 40)")
+    parser.add_argument("--mix", type=lire_mix, default=MIX_DEFAUT,
+                        help="Poids des gabarits, ex.: reussite=6,echec=3,boucle=1")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Corrections simultanées en mode batch (défaut: nombre de cœurs)")
+    parser.add_argument("--moteurs", default="depot,session,fork",
+                        help="Moteurs mesurés en mode batch (défaut: depot,session,fork)")
+    parser.add_argument("--single", type=int, default=5,
+                        help="Dépôts corrigés un par un en mode single (défaut: 5, 0 = aucun)")
+    parser.add_argument("--dossier", help="Dossier vide où générer les dépôts (conservé)")
+    parser.add_argument("--json", help="Écrire les résultats dans ce fichier JSON")
+
+    args = parser.parse_args()
+    moteurs = [m for m in args.moteurs.split(",") if m]
+    if "fork" in moteurs and not hasattr(os, "fork"):
+        moteurs.remove("fork")
+
+    with tempfile.TemporaryDirectory(prefix="bench-correction-") as tmp:
+        batch = Path(args.dossier) if args.dossier else Path(tmp) / "depots"
+        batch.mkdir(parents=True, exist_ok=True)
+        if any(batch.iterdir()):
+            print(f"❌ Le dossier {batch} n'est pas vide")
+            return 1
+
+        comptes = repartir_mix(args.n, args.mix)
+        print(f"🧪 Génération de {args.n} dépôt(s) dans {batch}")
+        depots = generer_depots(batch, comptes)
+
+        resultats = []
+        if args.single > 0:
+            # Échantillon réparti sur les gabarits, sans les dépôts qui bouclent
+            par_gabarit = {}
+            for nom, gabarit in depots.items():
+                if gabarit != "boucle":
+                    par_gabarit.setdefault(gabarit, []).append(nom)
+            noms = [nom for rang in zip_longest(*par_gabarit.values())
+                    for nom in rang if nom is not None]
+            print(f"⏱️  Mode single: {min(args.single, len(noms))} dépôt(s)")
+            resultats.append(bench_single(batch, noms[:args.single], tmp))
+
+        for moteur in moteurs:
+            print(f"⏱️  Mode batch: moteur {moteur}, {args.jobs} job(s)")
+            resultat = bench_batch(batch, moteur, args.jobs, tmp)
+            if resultat is not None:
+                resultats.append(resultat)
+
+        afficher_resultats(resultats, comptes)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "horodatage": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "depots": args.n,
+            "jobs": args.jobs,
+            "mix": comptes,
+            "resultats": resultats
+        }, indent=2, ensure_ascii=False))
+        print(f"\n✅ Résultats écrits dans: {args.json}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,18 +14,95 @@ Ce script:
 
 Usage:
     python3 correction.py <chemin_dépôt_étudiant>
+    python3 correction.py --batch <dossier_dépôts> [--jobs N] [--moteur session]
 
 Exemple:
     python3 correction.py ../etudiants/du-pierre-julien-f1
+    python3 correction.py --batch ../etudiants --jobs 8 --export f1.xlsx
+    python3 correction.py --batch ../etudiants --rapports rapports --format-rapport html
+    python3 correction.py --batch ../etudiants --profile phases.csv --profile-piles piles.txt
 """
 
 import sys
+import io
+import os
+import time
+import contextlib
 import subprocess
+import tempfile
 import json
+import re
+import hashlib
+import copy
+import ast
+import csv
+import xml.etree.ElementTree as ET
+import html
+import queue
+from string import Template
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 import argparse
+import cProfile
+import pstats
+import socket
+import select
+import signal
+import threading
 
+import file_attente
+import historique
+from tests.scoring import BONUS, POINTS
+from tests.simulation import available_isolation, script_timeout
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Tests canoniques (identiques dans tous les dépôts étudiants)
+TESTS_CANONIQUES = Path(__file__).resolve().parent / "tests"
+
+# Tests des outils de correction et du Pi: jamais exécutés pour noter
+NOM_TESTS_OUTILS = "outils"
+
+# Nombre maximal de dépôts par session pytest (moteur « session »)
+TAILLE_SESSION = 50
+
+# Longueur maximale conservée pour un message d'échec
+LONGUEUR_MESSAGE = 500
+
+# Fichiers évalués par les tests (servent de clé au cache de correction)
+FICHIERS_EVALUES = ["test_aht20.py", "test_neoslider.py"]
+
+# Horodatages ISO écrits dans les marqueurs (ignorés dans les empreintes)
+MOTIF_HORODATAGE = re.compile(rb"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?")
+
+# Délai des tests par dépôt (secondes): maximum, minimum, et facteur
+# appliqué à la durée historique du dépôt pour le délai adaptatif
+DELAI_TESTS = 60
+DELAI_MIN = 10
+FACTEUR_DELAI = 3
+
+# Attente entre deux vérifications de la file partagée (secondes)
+INTERVALLE_FILE = 1.0
+
+# Intervalle de vérification d'une demande d'abandon de pytest (secondes)
+INTERVALLE_ABANDON = 0.5
+
+# Incrémenter pour invalider toutes les entrées du cache
+VERSION_CACHE = 1
+
+# Phases de correction mesurées par dépôt (--profile):
+# lancement du processus, démarrage de pytest, collecte, exécution des
+# tests, analyse des résultats, calcul des notes, rapport et export
+PHASES = ["lancement", "demarrage", "collecte", "execution", "analyse",
+          "notes", "rapport", "export"]
+
+# Profondeur maximale des piles reconstruites (--profile-piles)
+PROFONDEUR_PILES = 64
 
 # Configuration de l'évaluation
 CONFIG = {
@@ -50,60 +127,368 @@ CONFIG = {
 }
 
 
-def executer_tests(repo_path):
+# Grille de correction: tests qui composent chaque indicateur. Un test
+# pèse ses points de jalon (tests/scoring.py, POINTS): le barème de
+# GitHub Classroom et celui de la correction ne peuvent pas diverger.
+# Le score d'un indicateur est la somme des points des tests réussis,
+# sur la somme des points des tests obligatoires: un test bonus réussi
+# ajoute ses points (score plafonné à 100), échoué il ne retire rien.
+# Les tests à 0 point (POINTS) ne sont pas notés et n'ont pas de place
+# dans la grille. Voir compiler_rubrique() et calculer_notes_lot().
+RUBRIQUE = {
+    "IND-00SX-E": (
+        "test_aht20_script_exists",
+        "test_aht20_script_syntax",
+        "test_aht20_imports",
+        "test_uv_dependencies",
+        "test_local_tests_executed",
+        "test_all_local_tests_passed",
+    ),
+    "IND-00SX-D": (
+        "test_i2c_initialization",
+        "test_aht20_sensor_creation",
+        "test_temperature_reading",
+        "test_humidity_reading",
+        "test_aht20_script_runs",
+        "test_main_function_exists",
+        "test_error_handling",
+        "test_humidity_display",
+        "test_code_quality",
+        "test_neoslider_script",
+    ),
+}
+
+# Tests optionnels (bonus des jalons): jamais comptés au dénominateur
+TESTS_OPTIONNELS = BONUS
+
+
+def repartir_phases(phases, resultats_tests, duree_pytest):
+    """
+    Répartit la durée d'une exécution de pytest entre ses phases.
+
+    Le démarrage (interpréteur, pytest et plugins) vient du résumé;
+    l'exécution est la somme des durées des tests; le reste (collecte
+    des tests, fin de session) est attribué à la collecte.
+
+    Args:
+        phases: Dictionnaire des phases à compléter
+        resultats_tests: Résultats des tests
+        duree_pytest: Durée totale du processus pytest (secondes; None
+            si elle n'est pas connue, ex.: session partagée entre dépôts)
+    """
+    lancement = phases.get("lancement", 0.0)
+    demarrage = resultats_tests.get("summary", {}).get("demarrage")
+    execution = sum(t.get("duration", 0) for t in resultats_tests.get("tests", []))
+
+    if demarrage is not None:
+        phases["demarrage"] = max(demarrage - lancement, 0.0)
+    phases["execution"] = execution
+    if duree_pytest is not None:
+        reste = duree_pytest - lancement - phases.get("demarrage", 0.0) - execution
+        phases["collecte"] = max(reste, 0.0)
+
+
+def executer_pytest(cmd, delai, phases=None, abandon=None, **kwargs):
+    """
+    Lance pytest dans son propre groupe de processus, avec un délai.
+
+    À l'expiration du délai, tout le groupe est tué: un script étudiant
+    qui boucle (ex.: while True dans test_neoslider.py) ou ses
+    sous-processus ne peuvent pas survivre à la correction. Il l'est
+    aussi si la correction est interrompue (Ctrl-C, exception).
+
+    Args:
+        cmd: Commande à exécuter
+        delai: Délai maximal (secondes)
+        phases: Dictionnaire où noter la durée du lancement (optionnel)
+        abandon: threading.Event optionnel; s'il est levé, pytest est tué
+            (ex.: bail perdu dans la file partagée)
+        **kwargs: Arguments supplémentaires pour subprocess.Popen
+
+    Returns:
+        subprocess.CompletedProcess: Code de retour et sorties capturées
+
+    Raises:
+        subprocess.TimeoutExpired: Si le délai est dépassé
+        InterruptedError: Si l'abandon a été demandé
+    """
+    debut = time.perf_counter()
+    limite = time.monotonic() + delai
+    with subprocess.Popen(cmd, start_new_session=True, **kwargs) as processus:
+        if phases is not None:
+            phases["lancement"] = time.perf_counter() - debut
+        try:
+            while True:
+                attente = delai if abandon is None else min(
+                    INTERVALLE_ABANDON, max(limite - time.monotonic(), 0))
+                try:
+                    stdout, stderr = processus.communicate(timeout=attente)
+                    break
+                except subprocess.TimeoutExpired:
+                    if abandon is None or abandon.is_set() or time.monotonic() >= limite:
+                        raise
+        except BaseException as erreur:
+            # Délai, abandon, mais aussi Ctrl-C: le groupe est dans sa propre
+            # session, le terminal ne peut plus l'atteindre
+            try:
+                os.killpg(processus.pid, signal.SIGKILL)
+            except (AttributeError, ProcessLookupError):
+                processus.kill()
+            if (isinstance(erreur, subprocess.TimeoutExpired)
+                    and abandon is not None and abandon.is_set()):
+                raise InterruptedError("Correction abandonnée") from None
+            raise
+        finally:
+            processus.wait()
+    return subprocess.CompletedProcess(cmd, processus.returncode, stdout, stderr)
+
+
+def executer_tests(repo_path, delai=DELAI_TESTS, phases=None, abandon=None):
     """
     Exécute les tests pytest sur le dépôt de l'étudiant.
 
     Args:
         repo_path: Chemin vers le dépôt de l'étudiant
+        delai: Délai maximal des tests (secondes)
+        phases: Dictionnaire où noter la durée de chaque phase (voir PHASES)
+        abandon: threading.Event qui interrompt pytest (voir executer_pytest)
 
     Returns:
         dict: Résultats des tests avec détails
     """
     print(f"🔍 Exécution des tests sur: {repo_path}")
 
-    # Construire la commande pytest
-    cmd = [
-        sys.executable, "-m", "pytest",
-        str(repo_path / "tests"),
-        "-v",
-        "--tb=short",
-        "--json-report",
-        f"--json-report-file={repo_path}/test_results.json"
-    ]
+    with tempfile.TemporaryDirectory(prefix="correction-") as tmp:
+        rapport_junit = Path(tmp) / "junit.xml"
+        fichier_sortie = Path(tmp) / "sortie.txt"
+        fichier_points = Path(tmp) / "points.json"
+
+        # Construire la commande pytest
+        cmd = [
+            sys.executable, "-m", "pytest",
+            str(repo_path / "tests"),
+            f"--ignore={repo_path / 'tests' / NOM_TESTS_OUTILS}",
+            "-v",
+            "--tb=short",
+            "-p", "no:cacheprovider",
+            f"--junitxml={rapport_junit}"
+        ]
+        # Les anciens dépôts n'ont pas le barème des jalons (tests/scoring.py)
+        if (repo_path / "tests" / "scoring.py").exists():
+            cmd.append(f"--score-json={fichier_points}")
+
+        phases = {} if phases is None else phases
+
+        try:
+            lancement = time.time()
+            chrono = time.perf_counter()
+
+            # La sortie va dans un fichier plutôt qu'en mémoire
+            with open(fichier_sortie, "w") as sortie:
+                result = executer_pytest(
+                    cmd,
+                    delai,
+                    phases,
+                    abandon,
+                    stdout=sortie,
+                    stderr=subprocess.STDOUT,
+                    cwd=str(repo_path)
+                )
+            duree_pytest = time.perf_counter() - chrono
+            chrono = time.perf_counter()
+
+            # Lire le rapport JUnit si disponible
+            if rapport_junit.exists():
+                resultats = lire_junitxml(rapport_junit)
+                debut = resultats["summary"].pop("debut", None)
+                if debut is not None:
+                    resultats["summary"]["demarrage"] = max(debut - lancement, 0.0)
+            else:
+                # Sinon, parser depuis stdout
+                with open(fichier_sortie) as sortie:
+                    resultats = parser_sortie_pytest(sortie, result.returncode)
+
+            points = lire_points(fichier_points)
+            if points is not None:
+                resultats["points"] = points
+
+            phases["analyse"] = time.perf_counter() - chrono
+            repartir_phases(phases, resultats, duree_pytest)
+            return resultats
+
+        except subprocess.TimeoutExpired:
+            return {"erreur": f"Timeout - Les tests prennent trop de temps ({delai:.0f} s)"}
+        except InterruptedError:
+            return {"erreur": "Correction abandonnée"}
+        except FileNotFoundError:
+            return {"erreur": "pytest non installé ou tests introuvables"}
+        except Exception as e:
+            return {"erreur": f"Erreur lors des tests: {str(e)}"}
 
+
+def lire_points(chemin, depot=None):
+    """
+    Lit le sommaire des points par jalon écrit par pytest --score-json.
+
+    Args:
+        chemin: Fichier JSON produit par tests/conftest.py
+        depot: Dépôt à extraire d'un sommaire de correction en lot (None:
+            sommaire d'un seul dépôt)
+
+    Returns:
+        dict: Points (score, max, bonus, milestones, tests) ou None si absent
+    """
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            cwd=str(repo_path)
-        )
+        points = json.loads(Path(chemin).read_text())
+    except (OSError, ValueError):
+        return None
+    if depot is not None:
+        return points.get("repos", {}).get(str(depot))
+    return points
 
-        # Lire les résultats JSON si disponibles
-        test_results_path = repo_path / "test_results.json"
-        if test_results_path.exists():
-            with open(test_results_path) as f:
-                return json.load(f)
 
-        # Sinon, parser depuis stdout
-        return parser_sortie_pytest(result.stdout, result.returncode)
+def lire_junitxml(chemin):
+    """
+    Lit un rapport JUnit XML de pytest de façon incrémentale.
 
-    except subprocess.TimeoutExpired:
-        return {"erreur": "Timeout - Les tests prennent trop de temps"}
-    except FileNotFoundError:
-        return {"erreur": "pytest non installé ou tests introuvables"}
-    except Exception as e:
-        return {"erreur": f"Erreur lors des tests: {str(e)}"}
+    Chaque <testcase> est libéré dès qu'il est lu, ce qui garde la
+    mémoire constante même pour de très gros rapports.
+
+    Args:
+        chemin: Chemin du fichier produit par pytest --junitxml
+
+    Returns:
+        dict: Résultats (summary et tests avec outcome, duration, message);
+        summary["debut"] est l'heure de début de la session (time.time())
+    """
+    result = {
+        "summary": {
+            "total": 0,
+            "passed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "duration": 0
+        },
+        "tests": []
+    }
+
+    for _, elem in ET.iterparse(str(chemin), events=("end",)):
+        if elem.tag == "testcase":
+            outcome = "passed"
+            message = ""
+            for enfant in elem:
+                if enfant.tag in ("failure", "error"):
+                    outcome = "failed"
+                    message = enfant.get("message") or (enfant.text or "")
+                elif enfant.tag == "skipped" and outcome == "passed":
+                    outcome = "skipped"
+                    message = enfant.get("message", "")
+
+            result["summary"]["total"] += 1
+            result["summary"][outcome] += 1
+            result["tests"].append({
+                "name": elem.get("name"),
+                "outcome": outcome,
+                "duration": float(elem.get("time", 0)),
+                "message": message.strip()[:LONGUEUR_MESSAGE]
+            })
+            elem.clear()
+
+        elif elem.tag == "testsuite":
+            result["summary"]["duration"] = float(elem.get("time", 0))
+            if elem.get("timestamp"):
+                result["summary"]["debut"] = datetime.fromisoformat(elem.get("timestamp")).timestamp()
+            elem.clear()
+
+    return result
+
+
+def delai_session(nombre):
+    """
+    Délai d'une session pytest qui corrige plusieurs dépôts.
+
+    Chaque dépôt peut épuiser le délai d'un script simulé
+    (tests/simulation, $SIM_SCRIPT_TIMEOUT): un seul script qui boucle
+    ne doit pas faire échouer toute la session, donc ses voisins.
+
+    Args:
+        nombre: Nombre de dépôts de la session
+
+    Returns:
+        float: Délai (secondes)
+    """
+    return DELAI_TESTS + nombre * (2 + script_timeout())
+
+
+def executer_tests_session(depots):
+    """
+    Exécute les tests canoniques sur plusieurs dépôts en une seule session pytest.
+
+    Les tests sont collectés une seule fois puis paramétrés sur chaque
+    dépôt par plugin_correction.py, ce qui évite de payer le démarrage
+    de l'interpréteur et la collecte pour chaque étudiant.
+
+    Args:
+        depots: Liste des chemins vers les dépôts des étudiants
+
+    Returns:
+        dict: Résultats des tests par dépôt (clé: chemin du dépôt en str)
+    """
+    with tempfile.TemporaryDirectory(prefix="correction-") as tmp:
+        fichier_depots = Path(tmp) / "depots.json"
+        fichier_resultats = Path(tmp) / "resultats.json"
+        fichier_points = Path(tmp) / "points.json"
+        fichier_depots.write_text(json.dumps([str(d) for d in depots]))
+
+        cmd = [
+            sys.executable, "-m", "pytest",
+            str(TESTS_CANONIQUES),
+            f"--ignore={TESTS_CANONIQUES / NOM_TESTS_OUTILS}",
+            "-q",
+            "-p", "plugin_correction",
+            "-p", "no:cacheprovider",
+            f"--rootdir={TESTS_CANONIQUES.parent}",
+            f"--depots={fichier_depots}",
+            f"--resultats={fichier_resultats}",
+            f"--score-json={fichier_points}"
+        ]
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(TESTS_CANONIQUES.parent), env.get("PYTHONPATH")])
+        )
+
+        try:
+            env["CORRECTION_LANCEMENT"] = str(time.time())
+            result = executer_pytest(
+                cmd,
+                delai_session(len(depots)),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                env=env
+            )
+            if fichier_resultats.exists():
+                resultats = json.loads(fichier_resultats.read_text())
+                for depot in depots:
+                    points = lire_points(fichier_points, depot)
+                    if points is not None:
+                        resultats[str(depot)]["points"] = points
+                return resultats
+            erreur = f"Erreur lors des tests: {result.stderr.strip()[-500:]}"
+        except subprocess.TimeoutExpired:
+            erreur = "Timeout - Les tests prennent trop de temps"
+        except Exception as e:
+            erreur = f"Erreur lors des tests: {str(e)}"
+
+    return {str(d): {"erreur": erreur} for d in depots}
 
 
 def parser_sortie_pytest(stdout, returncode):
     """
-    Parse la sortie texte de pytest si le rapport JSON n'est pas disponible.
+    Parse la sortie texte de pytest si le rapport JUnit n'est pas disponible.
 
     Args:
-        stdout: Sortie standard de pytest
+        stdout: Sortie standard de pytest (texte ou fichier ouvert, lu ligne par ligne)
         returncode: Code de retour de pytest
 
     Returns:
@@ -120,7 +505,8 @@ def parser_sortie_pytest(stdout, returncode):
     }
 
     # Parsing simple de la sortie
-    for line in stdout.split('\n'):
+    lignes = stdout.split('\n') if isinstance(stdout, str) else stdout
+    for line in lignes:
         line = line.strip()
         if '::' in line and ('PASSED' in line or 'FAILED' in line):
             parts = line.split()
@@ -144,58 +530,127 @@ def parser_sortie_pytest(stdout, returncode):
     return result
 
 
-def calculer_notes(resultats_tests):
+def compiler_rubrique(rubrique=RUBRIQUE, points=POINTS):
     """
-    Calcule les notes selon les grilles permanentes.
+    Compile la grille de correction en matrice de poids.
 
     Args:
-        resultats_tests: Résultats des tests pytest
+        rubrique: Tests de chaque indicateur (voir RUBRIQUE)
+        points: Poids de chaque test (défaut: points des jalons)
 
     Returns:
-        dict: Notes par indicateur et note finale
+        tuple: (noms des tests, noms des indicateurs, matrice tests × indicateurs)
     """
-    notes = {
-        "IND-00SX-E": {"score": 0, "niveau": 0, "retroaction": ""},
-        "IND-00SX-D": {"score": 0, "niveau": 0, "retroaction": ""},
-        "finale": 0
-    }
+    indicateurs = list(rubrique)
+    noms_tests = []
+    for tests in rubrique.values():
+        noms_tests += [nom for nom in tests if nom not in noms_tests]
+
+    matrice = [
+        [points.get(nom, 0) if nom in rubrique[ind] else 0 for ind in indicateurs]
+        for nom in noms_tests
+    ]
+    if numpy is not None:
+        matrice = numpy.array(matrice, dtype=float)
+    return noms_tests, indicateurs, matrice
 
-    # Extraire les résultats des tests
-    tests = resultats_tests.get("tests", [])
-    test_status = {t["name"]: t["outcome"] for t in tests}
 
-    # Évaluer IND-00SX-E (Environnement)
-    score_e = 0
-    if test_status.get("test_requirements_present") == "passed":
-        score_e += 50
-    if test_status.get("test_import_board") == "passed" or test_status.get("test_import_dht22") == "passed":
-        score_e += 50
+def verifier_rubrique(rubrique=RUBRIQUE):
+    """
+    Compare la grille de correction aux tests canoniques.
 
-    notes["IND-00SX-E"]["score"] = score_e
-    notes["IND-00SX-E"]["niveau"] = determiner_niveau(score_e)
-    notes["IND-00SX-E"]["retroaction"] = generer_retroaction("IND-00SX-E", score_e)
+    Returns:
+        tuple: (tests canoniques notés absents de la grille, tests de la
+        grille introuvables)
+    """
+    canoniques = noms_tests_canoniques()
+    noms_tests, _, _ = compiler_rubrique(rubrique)
+    return (
+        [nom for nom in canoniques if nom not in noms_tests and POINTS.get(nom) != 0],
+        [nom for nom in noms_tests if nom not in canoniques]
+    )
 
-    # Évaluer IND-00SX-D (Programmation)
-    score_d = 0
-    if test_status.get("test_script_exists") == "passed":
-        score_d += 20
-    if test_status.get("test_script_has_required_imports") == "passed":
-        score_d += 20
-    if test_status.get("test_script_creates_sensor") == "passed":
-        score_d += 20
-    if test_status.get("test_script_executes") == "passed":
-        score_d += 20
-    if test_status.get("test_script_output_format") == "passed":
-        score_d += 20
 
-    notes["IND-00SX-D"]["score"] = score_d
-    notes["IND-00SX-D"]["niveau"] = determiner_niveau(score_d)
-    notes["IND-00SX-D"]["retroaction"] = generer_retroaction("IND-00SX-D", score_d)
+def calculer_notes_lot(liste_resultats, rubrique=RUBRIQUE, points=POINTS):
+    """
+    Calcule les notes de plusieurs étudiants d'un seul coup.
+
+    Les résultats sont placés dans une matrice étudiants × tests
+    (1 = réussi), multipliée par la matrice de poids de la grille:
+    renoter toute une session avec une grille révisée ne demande
+    qu'un produit matriciel.
 
-    # Note finale (pondérée)
-    notes["finale"] = (score_e * 0.5) + (score_d * 0.5)
+    Args:
+        liste_resultats: Résultats des tests pytest de chaque étudiant
+        rubrique: Tests de chaque indicateur (voir RUBRIQUE)
+        points: Poids de chaque test (défaut: points des jalons)
 
-    return notes
+    Returns:
+        list: Notes de chaque étudiant (voir calculer_notes)
+    """
+    noms_tests, indicateurs, poids = compiler_rubrique(rubrique, points)
+    colonnes = {nom: i for i, nom in enumerate(noms_tests)}
+
+    reussis = [[0.0] * len(noms_tests) for _ in liste_resultats]
+    obligatoires = [0.0 if nom in TESTS_OPTIONNELS else 1.0 for nom in noms_tests]
+    applicables = [obligatoires for _ in liste_resultats]
+    inconnus = []
+
+    for ligne, resultats_tests in enumerate(liste_resultats):
+        inconnus.append([])
+        for test in resultats_tests.get("tests", []):
+            colonne = colonnes.get(test["name"])
+            if colonne is None:
+                if points.get(test["name"]) != 0:
+                    inconnus[ligne].append(test["name"])
+            elif test["outcome"] == "passed":
+                reussis[ligne][colonne] = 1.0
+
+    if numpy is not None:
+        obtenus = numpy.array(reussis).reshape(-1, len(noms_tests)) @ poids
+        possibles = numpy.array(applicables).reshape(-1, len(noms_tests)) @ poids
+        scores = numpy.minimum(100, numpy.divide(
+            100 * obtenus, possibles, out=numpy.zeros_like(obtenus), where=possibles > 0
+        )).tolist()
+    else:
+        scores = []
+        for r, a in zip(reussis, applicables):
+            ligne = []
+            for j in range(len(indicateurs)):
+                possible = sum(a[i] * poids[i][j] for i in range(len(noms_tests)))
+                obtenu = sum(r[i] * poids[i][j] for i in range(len(noms_tests)))
+                ligne.append(min(100, 100 * obtenu / possible) if possible else 0.0)
+            scores.append(ligne)
+
+    liste_notes = []
+    for ligne, scores_etudiant in enumerate(scores):
+        notes = {"finale": 0, "tests_inconnus": inconnus[ligne]}
+        for indicateur, score in zip(indicateurs, scores_etudiant):
+            score = round(score, 1)
+            notes[indicateur] = {
+                "score": score,
+                "niveau": determiner_niveau(score),
+                "retroaction": generer_retroaction(indicateur, score)
+            }
+            ponderation = CONFIG["indicateurs"].get(indicateur, {}).get("ponderation", 0)
+            notes["finale"] += score * ponderation / 100
+        liste_notes.append(notes)
+
+    return liste_notes
+
+
+def calculer_notes(resultats_tests):
+    """
+    Calcule les notes selon les grilles permanentes.
+
+    Args:
+        resultats_tests: Résultats des tests pytest
+
+    Returns:
+        dict: Notes par indicateur, note finale et noms de tests absents
+        de la grille ("tests_inconnus")
+    """
+    return calculer_notes_lot([resultats_tests])[0]
 
 
 def determiner_niveau(score):
@@ -282,6 +737,21 @@ def afficher_rapport(etudiant, resultats_tests, notes):
     print(f"Tests exécutés: {total}")
     print(f"✅ Réussis: {passed}")
     print(f"❌ Échoués: {failed}")
+    print(f"⏱️  Durée: {summary.get('duration', 0):.2f} s")
+
+    # Points par jalon (tests/scoring.py)
+    points = resultats_tests.get("points")
+    if points:
+        jalons = ", ".join(
+            f"J{j['milestone']} {j['points']}/{j['max']}" for j in points["milestones"]
+        )
+        bonus = f" +{points['bonus']} bonus" if points["bonus"] else ""
+        print(f"🏅 Points: {points['score']}/{points['max']}{bonus} ({jalons})")
+
+    # Tests les plus lents
+    tests = [t for t in resultats_tests.get("tests", []) if t.get("duration")]
+    for test in sorted(tests, key=lambda t: t["duration"], reverse=True)[:3]:
+        print(f"   {test['name']}: {test['duration']:.3f} s ({test['outcome']})")
 
     # Détail par indicateur
     print("\n" + "-"*70)
@@ -296,6 +766,9 @@ def afficher_rapport(etudiant, resultats_tests, notes):
         print(f"  Niveau: {note['niveau']}%")
         print(f"  Rétroaction: {note['retroaction']}")
 
+    if notes.get("tests_inconnus"):
+        print(f"\n⚠️ Tests absents de la grille (non notés): {', '.join(notes['tests_inconnus'])}")
+
     # Note finale
     print("\n" + "-"*70)
     print("NOTE FINALE")
@@ -317,9 +790,435 @@ def afficher_rapport(etudiant, resultats_tests, notes):
     print("="*70 + "\n")
 
 
+# Gabarits des rapports écrits dans des fichiers (--rapports), compilés
+# une seule fois au chargement du module
+GABARITS_RAPPORT = {
+    "md": {
+        "page": Template("""\
+# 📊 Rapport de correction — $titre
+
+- **Étudiant**: $etudiant
+- **Date**: $date
+- **Cours**: $cours
+- **Type**: $type
+
+## Résumé des tests
+
+| Tests exécutés | ✅ Réussis | ❌ Échoués | ⏱️ Durée |
+|---|---|---|---|
+| $total | $passed | $failed | $duree s |
+$points$erreur
+| Test | Résultat | Durée (s) | Message |
+|---|---|---|---|
+$tests
+
+## Évaluation par indicateur
+$indicateurs
+## Note finale
+
+📈 **Score global: $finale%**
+
+## 💡 Rappel important
+
+Cette évaluation est **formative et non notée**.
+Son but est de vous donner une rétroaction pour vous améliorer.
+
+Si vous avez des échecs:
+1. Lisez attentivement la rétroaction ci-dessus
+2. Consultez le guide de dépannage
+3. Corrigez votre code
+4. Poussez et relancez les tests
+
+N'hésitez pas à demander de l'aide à l'enseignant!
+"""),
+        "test": Template("| $nom | $outcome | $duree | $message |"),
+        "indicateur": Template("""
+### $indicateur — $critere
+
+- Critères de performance: $criteres
+- Score: **$score%** (niveau $niveau%)
+- Rétroaction: $retroaction
+"""),
+        "erreur": Template("\n> ❌ $message\n"),
+        "points": Template("\n🏅 **Points: $score/$max**$bonus ($jalons)\n"),
+    },
+    "html": {
+        "page": Template("""\
+<!DOCTYPE html>
+<html lang="fr">
+<head><meta charset="utf-8"><title>F1 — $etudiant</title></head>
+<body>
+<h1>📊 Rapport de correction — $titre</h1>
+<ul>
+<li><b>Étudiant</b>: $etudiant</li>
+<li><b>Date</b>: $date</li>
+<li><b>Cours</b>: $cours</li>
+<li><b>Type</b>: $type</li>
+</ul>
+<h2>Résumé des tests</h2>
+<p>Tests exécutés: $total — ✅ Réussis: $passed — ❌ Échoués: $failed — ⏱️ Durée: $duree s</p>
+$points$erreur
+<table border="1" cellpadding="4">
+<tr><th>Test</th><th>Résultat</th><th>Durée (s)</th><th>Message</th></tr>
+$tests
+</table>
+<h2>Évaluation par indicateur</h2>
+$indicateurs
+<h2>Note finale</h2>
+<p>📈 <b>Score global: $finale%</b></p>
+<h2>💡 Rappel important</h2>
+<p>Cette évaluation est <b>formative et non notée</b>.
+Son but est de vous donner une rétroaction pour vous améliorer.</p>
+<ol>
+<li>Lisez attentivement la rétroaction ci-dessus</li>
+<li>Consultez le guide de dépannage</li>
+<li>Corrigez votre code</li>
+<li>Poussez et relancez les tests</li>
+</ol>
+<p>N'hésitez pas à demander de l'aide à l'enseignant!</p>
+</body>
+</html>
+"""),
+        "test": Template("<tr><td>$nom</td><td>$outcome</td><td>$duree</td><td><pre>$message</pre></td></tr>"),
+        "indicateur": Template("""\
+<h3>$indicateur — $critere</h3>
+<ul>
+<li>Critères de performance: $criteres</li>
+<li>Score: <b>$score%</b> (niveau $niveau%)</li>
+<li>Rétroaction: $retroaction</li>
+</ul>
+"""),
+        "erreur": Template("<p>❌ $message</p>"),
+        "points": Template("<p>🏅 <b>Points: $score/$max</b>$bonus ($jalons)</p>"),
+    }
+}
+
+
+def rendre_rapport(etudiant, resultats_tests, notes, format_rapport="md"):
+    """
+    Produit le rapport d'un étudiant à partir des gabarits précompilés.
+
+    Args:
+        etudiant: Nom de l'étudiant (ou ID)
+        resultats_tests: Résultats bruts des tests
+        notes: Notes calculées
+        format_rapport: "md" (Markdown) ou "html"
+
+    Returns:
+        str: Contenu du rapport
+    """
+    gabarits = GABARITS_RAPPORT[format_rapport]
+    if format_rapport == "html":
+        echapper = html.escape
+    else:
+        def echapper(texte):
+            return str(texte).replace("|", "\\|").replace("\n", "<br>")
+
+    summary = resultats_tests.get("summary", {})
+    tests = "\n".join(
+        gabarits["test"].substitute(
+            nom=echapper(t["name"]),
+            outcome=echapper(t["outcome"]),
+            duree=f"{t.get('duration', 0):.3f}",
+            message=echapper(t.get("message", ""))
+        )
+        for t in resultats_tests.get("tests", [])
+    )
+    indicateurs = "".join(
+        gabarits["indicateur"].substitute(
+            indicateur=indicateur,
+            critere=echapper(config["critere"]),
+            criteres=", ".join(config["critères_performance"]),
+            score=f"{notes[indicateur]['score']:.0f}",
+            niveau=notes[indicateur]["niveau"],
+            retroaction=echapper(notes[indicateur]["retroaction"])
+        )
+        for indicateur, config in CONFIG["indicateurs"].items()
+    )
+    erreur = ""
+    if "erreur" in resultats_tests:
+        erreur = gabarits["erreur"].substitute(message=echapper(resultats_tests["erreur"]))
+    points = ""
+    if resultats_tests.get("points"):
+        p = resultats_tests["points"]
+        points = gabarits["points"].substitute(
+            score=p["score"],
+            max=p["max"],
+            bonus=f" +{p['bonus']} bonus" if p["bonus"] else "",
+            jalons=", ".join(f"J{j['milestone']} {j['points']}/{j['max']}" for j in p["milestones"])
+        )
+
+    return gabarits["page"].substitute(
+        titre=echapper(CONFIG["titre"]),
+        etudiant=echapper(etudiant),
+        date=datetime.now().strftime('%Y-%m-%d %H:%M'),
+        cours=CONFIG["cours"],
+        type=echapper(CONFIG["type"]),
+        total=summary.get("total", 0),
+        passed=summary.get("passed", 0),
+        failed=summary.get("failed", 0),
+        duree=f"{summary.get('duration', 0):.2f}",
+        points=points,
+        erreur=erreur,
+        tests=tests,
+        indicateurs=indicateurs,
+        finale=f"{notes['finale']:.1f}"
+    )
+
+
+class EcrivainRapports:
+    """
+    Écrit les rapports des étudiants dans des fichiers, en arrière-plan.
+
+    Le rendu et l'écriture se font dans un fil dédié: la boucle du batch
+    ne fait que déposer les résultats dans une file. Avec
+    en_arriere_plan=False (moteur « fork », qui refuse les fils), ils se
+    font directement dans soumettre().
+    """
+
+    def __init__(self, dossier, format_rapport="md", en_arriere_plan=True):
+        self.dossier = Path(dossier)
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        self.format = format_rapport
+        self.ecrits = 0
+        self.erreurs = []
+        self._file = queue.Queue(maxsize=64)
+        self._fil = None
+        if en_arriere_plan:
+            self._fil = threading.Thread(target=self._ecrire, daemon=True)
+            self._fil.start()
+
+    def soumettre(self, result):
+        """
+        Ajoute le rapport d'un étudiant à la file d'écriture.
+
+        Args:
+            result: Résultat de l'étudiant (voir corriger_depot)
+        """
+        if self._fil is None:
+            self._ecrire_rapport(result)
+        else:
+            self._file.put(result)
+
+    def _ecrire(self):
+        """Boucle du fil d'écriture (se termine à la réception de None)."""
+        while True:
+            result = self._file.get()
+            if result is None:
+                return
+            self._ecrire_rapport(result)
+
+    def _ecrire_rapport(self, result):
+        """Rend et écrit le rapport d'un étudiant."""
+        chemin = self.dossier / f"{result['etudiant']}.{self.format}"
+        try:
+            chemin.write_text(
+                rendre_rapport(result["etudiant"], result["resultats"],
+                               result["notes"], self.format),
+                encoding="utf-8"
+            )
+            self.ecrits += 1
+        except Exception as e:
+            self.erreurs.append(f"{chemin.name}: {e}")
+
+    def fermer(self):
+        """Attend que tous les rapports soumis soient écrits."""
+        if self._fil is not None:
+            self._file.put(None)
+            self._fil.join()
+
+
+def afficher_progression(faits, total, debut):
+    """
+    Affiche une ligne de progression compacte (réécrite sur place).
+
+    Args:
+        faits: Nombre de dépôts traités
+        total: Nombre total de dépôts
+        debut: Début du batch (time.perf_counter())
+    """
+    ecoule = time.perf_counter() - debut
+    debit = faits / ecoule if ecoule > 0 else 0.0
+    restant = (total - faits) / debit if debit > 0 else 0.0
+    minutes, secondes = divmod(int(restant), 60)
+    fin = "\n" if faits >= total else ""
+    print(f"\r⏳ [{faits:>{len(str(total))}}/{total}] {debit:6.1f} dépôts/s  "
+          f"ETA {minutes:02d}:{secondes:02d}", end=fin, flush=True)
+
+
+def noms_tests_canoniques():
+    """
+    Liste les tests des jalons, dans l'ordre des fichiers tests/test_milestone_0*.py.
+
+    Returns:
+        list: Noms des fonctions de test
+    """
+    noms = []
+    for fichier in sorted(TESTS_CANONIQUES.glob("test_milestone_0*.py")):
+        arbre = ast.parse(fichier.read_text())
+        noms += [
+            noeud.name for noeud in arbre.body
+            if isinstance(noeud, ast.FunctionDef) and noeud.name.startswith("test_")
+        ]
+    return noms
+
+
+class ExportateurResultats:
+    """
+    Exporte les résultats ligne par ligne, au fur et à mesure du batch.
+
+    Le format dépend de l'extension du fichier de sortie:
+    - .csv: chaque ligne est écrite et vidée sur disque immédiatement
+    - .xlsx: feuille openpyxl en écriture seule (mémoire constante),
+      enregistrée seulement à la fermeture. Les lignes sont aussi vidées
+      au fur et à mesure dans <sortie>.partiel.csv, supprimé une fois le
+      classeur enregistré: après un arrêt brutal, ce fichier les garde.
+    - .parquet: groupes de lignes via pyarrow (format en colonnes)
+
+    Chaque ligne contient les scores par indicateur, les points des jalons
+    (si disponibles), puis le résultat et la durée de chaque test canonique.
+
+    Raises:
+        ValueError: Extension autre que .csv, .xlsx ou .parquet
+    """
+
+    FORMATS = ("csv", "xlsx", "parquet")
+
+    # Lignes accumulées avant d'écrire un groupe Parquet
+    TAILLE_GROUPE_PARQUET = 256
+
+    def __init__(self, chemin_sortie, noms_tests=None):
+        self.chemin = Path(chemin_sortie)
+        self.noms_tests = noms_tests if noms_tests is not None else noms_tests_canoniques()
+        self.en_tetes = [
+            "Étudiant", "IND-00SX-E (%)", "IND-00SX-D (%)", "Note finale (%)",
+            "Rétroaction", "Durée (s)", "Points"
+        ]
+        for nom in self.noms_tests:
+            self.en_tetes += [nom, f"{nom} (s)"]
+        self.lignes = 0
+        self.format = self.chemin.suffix.lower().lstrip(".")
+        if self.format not in self.FORMATS:
+            raise ValueError(f"Format d'export inconnu: {self.chemin.name} "
+                             f"(.csv, .xlsx ou .parquet)")
+
+        self.chemin_partiel = None
+        if self.format == "csv":
+            self._ouvrir_csv(self.chemin)
+        elif self.format == "parquet":
+            import pyarrow
+            import pyarrow.parquet
+
+            types = [pyarrow.string(), pyarrow.float64(), pyarrow.float64(),
+                     pyarrow.float64(), pyarrow.string(), pyarrow.float64(),
+                     pyarrow.float64()]
+            types += [pyarrow.string(), pyarrow.float64()] * len(self.noms_tests)
+            self._schema = pyarrow.schema(list(zip(self.en_tetes, types)))
+            self._parquet = pyarrow.parquet.ParquetWriter(str(self.chemin), self._schema)
+            self._tampon = []
+        else:
+            import openpyxl
+
+            self._classeur = openpyxl.Workbook(write_only=True)
+            self._feuille = self._classeur.create_sheet("Résultats F1")
+            self._feuille.append(self.en_tetes)
+            self.chemin_partiel = self.chemin.with_name(self.chemin.name + ".partiel.csv")
+            self._ouvrir_csv(self.chemin_partiel)
+
+    def _ouvrir_csv(self, chemin):
+        self._fichier = open(chemin, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._fichier)
+        self._csv.writerow(self.en_tetes)
+        self._fichier.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def ajouter(self, result):
+        """
+        Ajoute la ligne d'un étudiant.
+
+        Args:
+            result: Résultat de l'étudiant (voir corriger_depot)
+        """
+        notes = result["notes"]
+        tests = {t["name"]: t for t in result["resultats"].get("tests", [])}
+        ligne = [
+            result["etudiant"],
+            notes["IND-00SX-E"]["score"],
+            notes["IND-00SX-D"]["score"],
+            notes["finale"],
+            notes["IND-00SX-E"]["retroaction"][:50] + "...",
+            result.get("duree", 0.0),
+            result["resultats"].get("points", {}).get("score")
+        ]
+        for nom in self.noms_tests:
+            test = tests.get(nom, {})
+            ligne += [test.get("outcome", ""), test.get("duration", 0.0)]
+
+        if self.format == "parquet":
+            self._tampon.append(ligne)
+            if len(self._tampon) >= self.TAILLE_GROUPE_PARQUET:
+                self._vider_parquet()
+        else:
+            self._csv.writerow(ligne)
+            self._fichier.flush()
+            if self.format == "xlsx":
+                self._feuille.append(ligne)
+        self.lignes += 1
+
+    def _vider_parquet(self):
+        """Écrit les lignes en attente comme un groupe Parquet."""
+        import pyarrow
+
+        if not self._tampon:
+            return
+        colonnes = [list(c) for c in zip(*self._tampon)]
+        self._parquet.write_table(pyarrow.Table.from_arrays(colonnes, schema=self._schema))
+        self._tampon = []
+
+    def fermer(self):
+        """Termine l'écriture du fichier."""
+        if self.format == "csv":
+            self._fichier.close()
+        elif self.format == "parquet":
+            self._vider_parquet()
+            self._parquet.close()
+        else:
+            self._classeur.save(self.chemin)
+            self._fichier.close()
+            self.chemin_partiel.unlink()
+
+
+def ouvrir_export(chemin_sortie):
+    """
+    Ouvre un exportateur de résultats en affichant les erreurs habituelles.
+
+    Args:
+        chemin_sortie: Chemin du fichier de sortie (.xlsx, .csv ou .parquet)
+
+    Returns:
+        ExportateurResultats: Exportateur ouvert, ou None en cas d'erreur
+    """
+    try:
+        return ExportateurResultats(chemin_sortie)
+    except ImportError as e:
+        if e.name and e.name.startswith("pyarrow"):
+            print("⚠️ pyarrow non installé. Installation: pip install pyarrow")
+        else:
+            print("⚠️ openpyxl non installé. Installation: pip install openpyxl")
+        return None
+    except Exception as e:
+        print(f"❌ Erreur lors de l'export: {e}")
+        return None
+
+
 def exporter_excel(etudiants_resultats, chemin_sortie):
     """
-    Exporte les résultats vers un fichier Excel.
+    Exporte les résultats vers un fichier Excel (ou CSV/Parquet selon l'extension).
 
     Args:
         etudiants_resultats: Liste des résultats par étudiant
@@ -328,75 +1227,1199 @@ def exporter_excel(etudiants_resultats, chemin_sortie):
     Returns:
         bool: True si succès, False sinon
     """
+    exportateur = ouvrir_export(chemin_sortie)
+    if exportateur is None:
+        return False
+
     try:
-        import openpyxl
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Résultats F1"
-
-        # En-têtes
-        headers = ["Étudiant", "IND-00SX-E (%)", "IND-00SX-D (%)", "Note finale (%)", "Rétroaction"]
-        ws.append(headers)
-
-        # Données
-        for result in etudiants_resultats:
-            ws.append([
-                result["etudiant"],
-                result["notes"]["IND-00SX-E"]["score"],
-                result["notes"]["IND-00SX-D"]["score"],
-                result["notes"]["finale"],
-                result["notes"]["IND-00SX-E"]["retroaction"][:50] + "..."
-            ])
-
-        wb.save(chemin_sortie)
+        with exportateur:
+            for result in etudiants_resultats:
+                exportateur.ajouter(result)
         print(f"✅ Résultats exportés vers: {chemin_sortie}")
         return True
 
-    except ImportError:
-        print("⚠️ openpyxl non installé. Installation: pip install openpyxl")
-        return False
     except Exception as e:
         print(f"❌ Erreur lors de l'export Excel: {e}")
         return False
 
 
+def lister_depots(batch_path):
+    """
+    Liste les dépôts étudiants d'un dossier batch, en ordre stable.
+
+    Args:
+        batch_path: Dossier contenant un sous-dossier par étudiant
+
+    Returns:
+        list: Chemins des dépôts, triés par nom
+    """
+    return sorted(
+        (d for d in batch_path.iterdir() if d.is_dir() and not d.name.startswith('.')),
+        key=lambda d: d.name
+    )
+
+
+def empreinte_fichiers(hachage, racine, chemins):
+    """
+    Ajoute le nom et le contenu de fichiers à un hachage.
+
+    Les horodatages ISO sont retirés du contenu: run_tests.py et
+    validate_pi.py en écrivent dans chaque marqueur, mais les tests
+    ne vérifient que leur présence et leur contenu descriptif.
+
+    Args:
+        hachage: Objet hashlib à mettre à jour
+        racine: Dossier de référence pour les noms relatifs
+        chemins: Fichiers à inclure (les absents sont notés comme tels)
+    """
+    for chemin in chemins:
+        hachage.update(str(chemin.relative_to(racine)).encode() + b"\0")
+        if chemin.is_file():
+            hachage.update(MOTIF_HORODATAGE.sub(b"", chemin.read_bytes()))
+        else:
+            hachage.update(b"<absent>")
+        hachage.update(b"\0")
+
+
+def sources_tests(dossier):
+    """
+    Fichiers Python d'un dossier tests/ qui servent à noter.
+
+    Args:
+        dossier: Dossier tests/ (canonique ou d'un dépôt)
+
+    Returns:
+        list: Chemins triés, sans les tests des outils (tests/outils/)
+    """
+    outils = dossier / NOM_TESTS_OUTILS
+    return sorted(p for p in dossier.rglob("*.py") if outils not in p.parents)
+
+
+def empreinte_correcteur():
+    """
+    Calcule l'empreinte du correcteur lui-même (script, plugin, tests canoniques).
+
+    Toute modification de la grille ou des tests invalide ainsi le cache.
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale
+    """
+    racine = TESTS_CANONIQUES.parent
+    hachage = hashlib.sha256(f"v{VERSION_CACHE}".encode())
+    empreinte_fichiers(hachage, racine, [
+        racine / "correction.py",
+        racine / "plugin_correction.py",
+        *sources_tests(TESTS_CANONIQUES)
+    ])
+    return hachage.hexdigest()
+
+
+def empreinte_depot(repo_dir, moteur="depot", correcteur=""):
+    """
+    Calcule l'empreinte des entrées évaluées d'un dépôt.
+
+    Inclut test_aht20.py, test_neoslider.py, .test_markers/* et, pour le
+    moteur « depot », le dossier tests/ de l'étudiant (le moteur
+    « session » utilise toujours les tests canoniques).
+
+    Args:
+        repo_dir: Chemin vers le dépôt de l'étudiant
+        moteur: Moteur de correction utilisé
+        correcteur: Empreinte du correcteur (voir empreinte_correcteur)
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale
+    """
+    hachage = hashlib.sha256(f"{correcteur}:{moteur}".encode())
+    chemins = [repo_dir / nom for nom in FICHIERS_EVALUES]
+    chemins += sorted((repo_dir / ".test_markers").glob("*"))
+    if moteur == "depot":
+        chemins += sources_tests(repo_dir / "tests")
+    empreinte_fichiers(hachage, repo_dir, chemins)
+    return hachage.hexdigest()
+
+
+def charger_cache(cache_dir, cle):
+    """
+    Lit une correction précédente dans le cache.
+
+    Args:
+        cache_dir: Dossier du cache de correction
+        cle: Empreinte du dépôt
+
+    Returns:
+        dict: {"resultats", "notes"} ou None si absent ou illisible
+    """
+    chemin = cache_dir / cle[:2] / f"{cle}.json"
+    try:
+        return json.loads(chemin.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def enregistrer_cache(cache_dir, cle, result):
+    """
+    Enregistre une correction dans le cache (écriture atomique).
+
+    Les corrections en erreur (timeout, pytest introuvable) ne sont pas
+    enregistrées pour être retentées au prochain passage.
+
+    Args:
+        cache_dir: Dossier du cache de correction
+        cle: Empreinte du dépôt
+        result: Résultat de l'étudiant (voir corriger_depot)
+    """
+    if "erreur" in result["resultats"]:
+        return
+
+    chemin = cache_dir / cle[:2] / f"{cle}.json"
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    tmp = chemin.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(
+        {"resultats": result["resultats"], "notes": result["notes"]},
+        ensure_ascii=False
+    ))
+    os.replace(tmp, chemin)
+
+
+def corriger_depot(repo_dir, delai=DELAI_TESTS, abandon=None):
+    """
+    Exécute les tests et calcule les notes d'un dépôt.
+
+    La sortie console de executer_tests() est capturée pour que les
+    dépôts traités en parallèle n'entrelacent pas leurs messages.
+
+    Args:
+        repo_dir: Chemin vers le dépôt de l'étudiant
+        delai: Délai maximal des tests (secondes)
+        abandon: threading.Event qui interrompt pytest (voir executer_pytest)
+
+    Returns:
+        dict: Résultat de l'étudiant (etudiant, resultats, notes, duree, sortie,
+        phases: durée de chaque phase, voir PHASES)
+    """
+    debut = time.perf_counter()
+    sortie = io.StringIO()
+    phases = {}
+
+    with contextlib.redirect_stdout(sortie):
+        resultats_tests = executer_tests(repo_dir, delai, phases, abandon)
+    chrono = time.perf_counter()
+    notes = calculer_notes(resultats_tests)
+    phases["notes"] = time.perf_counter() - chrono
+
+    return {
+        "etudiant": repo_dir.name,
+        "resultats": resultats_tests,
+        "notes": notes,
+        "duree": time.perf_counter() - debut,
+        "sortie": sortie.getvalue(),
+        "phases": phases
+    }
+
+
+def corriger_session(depots):
+    """
+    Corrige un lot de dépôts avec une seule session pytest.
+
+    Args:
+        depots: Liste des chemins de dépôts
+
+    Returns:
+        list: Résultat de chaque étudiant (voir corriger_depot)
+    """
+    resultats_session = executer_tests_session(depots)
+    lot = []
+
+    for repo_dir in depots:
+        resultats_tests = resultats_session[str(repo_dir)]
+        phases = {}
+        repartir_phases(phases, resultats_tests, None)
+        chrono = time.perf_counter()
+        notes = calculer_notes(resultats_tests)
+        phases["notes"] = time.perf_counter() - chrono
+        lot.append({
+            "etudiant": repo_dir.name,
+            "resultats": resultats_tests,
+            "notes": notes,
+            "duree": resultats_tests.get("summary", {}).get("duration", 0),
+            "sortie": "",
+            "phases": phases
+        })
+
+    return lot
+
+
+def decouper_lots(depots, nombre):
+    """
+    Découpe la liste des dépôts en lots contigus pour les sessions pytest.
+
+    Args:
+        depots: Liste des chemins de dépôts
+        nombre: Nombre minimal de lots (ex.: nombre de jobs)
+
+    Returns:
+        list: Lots de dépôts, au plus TAILLE_SESSION dépôts chacun
+    """
+    nombre = max(nombre, -(-len(depots) // TAILLE_SESSION), 1)
+    taille = -(-len(depots) // nombre)
+    return [depots[i:i + taille] for i in range(0, len(depots), taille)]
+
+
+def corriger_batch(depots, jobs=1, moteur="depot", cache_dir=None, deja_corriges=None,
+                   durees=None):
+    """
+    Corrige une liste de dépôts, en parallèle si jobs > 1.
+
+    Les résultats repris du journal et ceux du cache sont produits
+    d'abord, puis chaque correction dès qu'elle se termine: un dépôt lent
+    ne retient pas la journalisation ni l'export de ceux qui le suivent.
+    Les dépôts sont regroupés par empreinte (voir empreinte_depot): les
+    tests ne sont exécutés qu'une fois par groupe de soumissions
+    identiques, et pas du tout si l'empreinte est déjà dans le cache.
+
+    Chaque résultat porte son "empreinte", la taille de son "groupe" et,
+    selon le cas, "cache": True ou "doublon_de": <étudiant corrigé>.
+    Les dépôts présents dans deja_corriges (journal de reprise) sont
+    produits tels quels, avec "reprise": True.
+
+    Args:
+        depots: Liste des chemins de dépôts
+        jobs: Nombre de processus de correction simultanés
+        moteur: "depot" (un pytest par dépôt) ou "session" (un pytest par lot)
+        cache_dir: Dossier du cache de correction (None = pas de cache)
+        deja_corriges: Résultats déjà obtenus, par nom d'étudiant (voir lire_journal)
+        durees: Durées historiques par étudiant (voir charger_durees)
+
+    Yields:
+        dict: Résultat de chaque étudiant (voir corriger_depot)
+    """
+    deja_corriges = deja_corriges or {}
+    correcteur = empreinte_correcteur()
+    cles = {
+        d: empreinte_depot(d, moteur, correcteur)
+        for d in depots if d.name not in deja_corriges
+    }
+
+    groupes = {}
+    for repo_dir, cle in cles.items():
+        groupes.setdefault(cle, []).append(repo_dir)
+
+    en_cache = {}
+    if cache_dir is not None:
+        for cle in groupes:
+            entree = charger_cache(cache_dir, cle)
+            if entree is not None:
+                en_cache[cle] = entree
+
+    def completer(result, cle):
+        result["empreinte"] = cle
+        result["groupe"] = len(groupes[cle])
+        return result
+
+    for repo_dir in depots:
+        if repo_dir.name in deja_corriges:
+            yield dict(deja_corriges[repo_dir.name], sortie="", reprise=True)
+        elif cles[repo_dir] in en_cache:
+            entree = en_cache[cles[repo_dir]]
+            yield completer({
+                "etudiant": repo_dir.name,
+                "resultats": copy.deepcopy(entree["resultats"]),
+                "notes": copy.deepcopy(entree["notes"]),
+                "duree": 0.0,
+                "sortie": "",
+                "cache": True
+            }, cles[repo_dir])
+
+    # Les moteurs produisent les résultats dans l'ordre où ils se terminent
+    representants = {membres[0].name: cle for cle, membres in groupes.items()
+                     if cle not in en_cache}
+    depots_representants = [groupes[cle][0] for cle in representants.values()]
+    for original in _corriger(depots_representants, jobs, moteur, durees):
+        cle = representants[original["etudiant"]]
+        if cache_dir is not None:
+            enregistrer_cache(cache_dir, cle, original)
+        yield completer(dict(original, resultats=copy.deepcopy(original["resultats"]),
+                             notes=copy.deepcopy(original["notes"])), cle)
+
+        for repo_dir in groupes[cle][1:]:
+            yield completer({
+                "etudiant": repo_dir.name,
+                "resultats": copy.deepcopy(original["resultats"]),
+                "notes": copy.deepcopy(original["notes"]),
+                "duree": 0.0,
+                "sortie": "",
+                "doublon_de": original["etudiant"]
+            }, cle)
+
+
+def lire_journal(chemin):
+    """
+    Relit le journal de reprise d'un batch interrompu.
+
+    Une dernière ligne incomplète (arrêt pendant l'écriture) est ignorée.
+
+    Args:
+        chemin: Fichier journal (une ligne JSON par dépôt corrigé)
+
+    Returns:
+        dict: Résultats déjà obtenus, par nom d'étudiant
+    """
+    deja_corriges = {}
+    if not chemin.exists():
+        return deja_corriges
+
+    with open(chemin, encoding="utf-8") as journal:
+        for ligne in journal:
+            try:
+                result = json.loads(ligne)
+            except ValueError:
+                continue
+            deja_corriges[result["etudiant"]] = result
+    return deja_corriges
+
+
+def ouvrir_journal(chemin, deja_corriges):
+    """
+    Ouvre le journal de reprise en ajout.
+
+    Le journal est d'abord réécrit avec les seuls résultats valides
+    (remplacement atomique), pour qu'une ligne tronquée par un arrêt
+    brutal ne corrompe pas la ligne suivante.
+
+    Args:
+        chemin: Fichier journal
+        deja_corriges: Résultats à conserver (voir lire_journal)
+
+    Returns:
+        file: Journal ouvert en ajout
+    """
+    tmp = chemin.with_name(chemin.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as journal:
+        for result in deja_corriges.values():
+            journal.write(json.dumps(result, ensure_ascii=False) + "\n")
+    os.replace(tmp, chemin)
+    return open(chemin, "a", encoding="utf-8")
+
+
+def ecrire_journal(journal, result):
+    """
+    Ajoute le résultat d'un dépôt au journal et le force sur disque.
+
+    Args:
+        journal: Fichier journal ouvert en ajout
+        result: Résultat de l'étudiant (voir corriger_depot)
+    """
+    journal.write(json.dumps(result, ensure_ascii=False) + "\n")
+    journal.flush()
+    os.fsync(journal.fileno())
+
+
+def afficher_groupes(etudiants_resultats):
+    """
+    Affiche les groupes de soumissions identiques détectés en mode batch.
+
+    Args:
+        etudiants_resultats: Liste des résultats par étudiant
+    """
+    groupes = {}
+    for result in etudiants_resultats:
+        groupes.setdefault(result["empreinte"], []).append(result["etudiant"])
+
+    executions = sum(
+        1 for r in etudiants_resultats
+        if not (r.get("cache") or r.get("doublon_de") or r.get("reprise"))
+    )
+    multiples = sorted((m for m in groupes.values() if len(m) > 1), key=len, reverse=True)
+
+    print(f"👥 Soumissions: {len(etudiants_resultats)} dépôt(s), {len(groupes)} distincte(s), "
+          f"{executions} exécution(s) de pytest")
+    for membres in multiples:
+        apercu = ", ".join(membres[:5]) + (", ..." if len(membres) > 5 else "")
+        print(f"  {len(membres):>4} identiques: {apercu}")
+
+
+def _corriger(depots, jobs, moteur, durees=None):
+    """
+    Exécute les tests des dépôts avec le moteur choisi (voir corriger_batch).
+
+    Avec les moteurs « depot » et « fork », chaque dépôt reçoit un délai
+    adaptatif (voir delai_adaptatif) et, en parallèle, les dépôts historiquement
+    les plus lents (ou inconnus) sont lancés en premier pour réduire la
+    durée totale du batch. Les résultats sont produits dès qu'ils sont
+    prêts, pas dans l'ordre de depots.
+
+    Si le générateur est abandonné (Ctrl-C, consommateur arrêté), les
+    corrections pas encore commencées sont annulées.
+    """
+    if moteur == "session":
+        executor = ThreadPoolExecutor(max_workers=max(jobs, 1))
+        try:
+            futures = [executor.submit(corriger_session, lot)
+                       for lot in decouper_lots(depots, jobs)]
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+        return
+
+    durees = durees or {}
+    delais = {d: delai_adaptatif(durees.get(d.name)) for d in depots}
+    plus_longs = sorted(depots, key=lambda d: durees.get(d.name, float("inf")), reverse=True)
+
+    if moteur == "fork":
+        yield from corriger_fork(depots, jobs, delais, plus_longs)
+        return
+
+    if jobs <= 1:
+        for repo_dir in depots:
+            yield corriger_depot(repo_dir, delais[repo_dir])
+        return
+
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        futures = [executor.submit(corriger_depot, d, delais[d]) for d in plus_longs]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def prechauffer_pytest():
+    """
+    Importe pytest, ses plugins et les tests canoniques dans ce processus.
+
+    Une collecte à blanc (--collect-only) laisse les modules de test
+    compilés (avec la réécriture des assert) dans sys.modules; les
+    processus enfants créés par os.fork() en héritent en copie sur
+    écriture et n'ont plus qu'à exécuter les tests.
+
+    Returns:
+        module: Le module pytest importé
+    """
+    import pytest
+
+    sys.path.insert(0, str(TESTS_CANONIQUES.parent))
+    with open(os.devnull, "w") as nul, contextlib.redirect_stdout(nul):
+        pytest.main([
+            str(TESTS_CANONIQUES),
+            f"--ignore={TESTS_CANONIQUES / NOM_TESTS_OUTILS}",
+            "--collect-only", "-q",
+            "-p", "plugin_correction",
+            "-p", "no:cacheprovider",
+            f"--rootdir={TESTS_CANONIQUES.parent}"
+        ])
+    return pytest
+
+
+def _enfant_fork(pytest, repo_dir, tmp, lancement):
+    """Corps d'un processus enfant du moteur « fork » (ne retourne jamais)."""
+    code = 3
+    try:
+        os.setsid()
+        nul = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(nul, fd)
+
+        fichier_depots = Path(tmp) / "depots.json"
+        fichier_depots.write_text(json.dumps([str(repo_dir)]))
+        os.environ["CORRECTION_LANCEMENT"] = str(lancement)
+        code = pytest.main([
+            str(TESTS_CANONIQUES),
+            f"--ignore={TESTS_CANONIQUES / NOM_TESTS_OUTILS}",
+            "-q",
+            "-p", "plugin_correction",
+            "-p", "no:cacheprovider",
+            f"--rootdir={TESTS_CANONIQUES.parent}",
+            f"--depots={fichier_depots}",
+            f"--resultats={Path(tmp) / 'resultats.json'}",
+            f"--score-json={Path(tmp) / 'points.json'}"
+        ])
+    finally:
+        os._exit(int(code))
+
+
+def corriger_fork(depots, jobs, delais, ordre=None):
+    """
+    Corrige des dépôts avec un pool de processus enfants pré-chauffés.
+
+    Le processus parent importe pytest et les tests canoniques une seule
+    fois (voir prechauffer_pytest), puis crée un enfant par dépôt avec
+    os.fork(). Chaque enfant exécute les tests canoniques sur son dépôt
+    (via plugin_correction.py), isolé dans son propre groupe de
+    processus, tué en entier à l'expiration de son délai.
+
+    Args:
+        depots: Liste des chemins de dépôts
+        jobs: Nombre d'enfants simultanés
+        delais: Délai des tests par dépôt (secondes)
+        ordre: Ordre de lancement (défaut: ordre de depots)
+
+    Yields:
+        dict: Résultat de chaque étudiant, dès que son enfant se termine
+
+    Raises:
+        RuntimeError: Si d'autres fils d'exécution existent déjà (un fork
+            n'en copierait que le fil courant, avec leurs verrous éventuellement
+            tenus)
+    """
+    if threading.active_count() > 1:
+        raise RuntimeError("Moteur « fork » impossible: d'autres fils d'exécution sont actifs")
+
+    pytest = prechauffer_pytest()
+    en_attente = list(ordre or depots)
+    en_cours = {}
+    tues = set()
+
+    with tempfile.TemporaryDirectory(prefix="correction-") as racine_tmp:
+        try:
+            while en_attente or en_cours:
+                while en_attente and len(en_cours) < max(jobs, 1):
+                    repo_dir = en_attente.pop(0)
+                    tmp = tempfile.mkdtemp(dir=racine_tmp)
+                    lancement = time.time()
+                    debut = time.perf_counter()
+                    pid = os.fork()
+                    if pid == 0:
+                        _enfant_fork(pytest, repo_dir, tmp, lancement)
+                    en_cours[pid] = (repo_dir, tmp, debut, time.perf_counter() - debut,
+                                     os.pidfd_open(pid))
+
+                # Attente bloquante sur nos seuls enfants (un pidfd devient lisible
+                # à la fin du processus), jusqu'à la prochaine échéance au plus
+                echeances = [debut + delais[repo_dir] - time.perf_counter()
+                             for pid, (repo_dir, _, debut, _, _) in en_cours.items()
+                             if pid not in tues]
+                prets, _, _ = select.select([e[4] for e in en_cours.values()], [], [],
+                                            max(min(echeances), 0) if echeances else None)
+                if not prets:
+                    for pid, (repo_dir, _, debut, _, _) in en_cours.items():
+                        if pid not in tues and time.perf_counter() - debut > delais[repo_dir]:
+                            _tuer_enfant_fork(pid)
+                            tues.add(pid)
+                    continue
+
+                for pid in [p for p, e in en_cours.items() if e[4] in prets]:
+                    os.waitpid(pid, 0)
+                    tues.discard(pid)
+                    repo_dir, tmp, debut, duree_fork, pidfd = en_cours.pop(pid)
+                    os.close(pidfd)
+                    yield _resultat_fork(repo_dir, tmp, debut, duree_fork, delais[repo_dir])
+        finally:
+            # Générateur abandonné (Ctrl-C, exception): pas d'enfant orphelin
+            for pid, (_, _, _, _, pidfd) in en_cours.items():
+                _tuer_enfant_fork(pid)
+                os.waitpid(pid, 0)
+                os.close(pidfd)
+
+
+def _tuer_enfant_fork(pid):
+    """Tue le groupe d'un enfant « fork », ou l'enfant seul s'il n'a pas encore appelé setsid()."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def _resultat_fork(repo_dir, tmp, debut, duree_fork, delai):
+    """Résultat d'un enfant du moteur « fork » terminé (voir corriger_fork)."""
+    duree = time.perf_counter() - debut
+    chrono = time.perf_counter()
+    fichier_resultats = Path(tmp) / "resultats.json"
+    if fichier_resultats.exists():
+        resultats_tests = json.loads(fichier_resultats.read_text())[str(repo_dir)]
+        points = lire_points(Path(tmp) / "points.json", repo_dir)
+        if points is not None:
+            resultats_tests["points"] = points
+    elif duree > delai:
+        resultats_tests = {
+            "erreur": f"Timeout - Les tests prennent trop de temps ({delai:.0f} s)"
+        }
+    else:
+        resultats_tests = {"erreur": "Erreur lors des tests: processus enfant arrêté"}
+
+    phases = {"lancement": duree_fork, "analyse": time.perf_counter() - chrono}
+    repartir_phases(phases, resultats_tests, duree)
+    chrono = time.perf_counter()
+    notes = calculer_notes(resultats_tests)
+    phases["notes"] = time.perf_counter() - chrono
+
+    return {
+        "etudiant": repo_dir.name,
+        "resultats": resultats_tests,
+        "notes": notes,
+        "duree": duree,
+        "sortie": "",
+        "phases": phases
+    }
+
+
+def delai_adaptatif(duree):
+    """
+    Calcule le délai des tests d'un dépôt selon sa durée historique.
+
+    Args:
+        duree: Durée de correction historique (secondes), ou None si inconnue
+
+    Returns:
+        float: FACTEUR_DELAI × durée, borné entre DELAI_MIN et DELAI_TESTS
+    """
+    if duree is None:
+        return DELAI_TESTS
+    return min(DELAI_TESTS, max(DELAI_MIN, FACTEUR_DELAI * duree))
+
+
+def charger_durees(chemin):
+    """
+    Lit les durées de correction historiques par étudiant.
+
+    Args:
+        chemin: Fichier JSON des durées
+
+    Returns:
+        dict: Durée (secondes) par nom d'étudiant
+    """
+    try:
+        return json.loads(chemin.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def enregistrer_durees(chemin, durees, etudiants_resultats):
+    """
+    Met à jour les durées historiques avec celles du batch (moyenne mobile).
+
+    Seuls les dépôts réellement corrigés sont pris en compte (pas ceux
+    tirés du cache, d'un doublon ou du journal de reprise).
+
+    Args:
+        chemin: Fichier JSON des durées
+        durees: Durées historiques actuelles (voir charger_durees)
+        etudiants_resultats: Liste des résultats par étudiant
+    """
+    for result in etudiants_resultats:
+        if result.get("cache") or result.get("doublon_de") or result.get("reprise"):
+            continue
+        precedente = durees.get(result["etudiant"])
+        mesure = result["duree"]
+        durees[result["etudiant"]] = mesure if precedente is None else (precedente + mesure) / 2
+
+    tmp = chemin.with_name(chemin.name + ".tmp")
+    tmp.write_text(json.dumps(durees, indent=1, sort_keys=True))
+    os.replace(tmp, chemin)
+
+
+class ProfilPhases:
+    """
+    Enregistre la durée de chaque phase de correction, par dépôt (--profile).
+
+    Une ligne est écrite par dépôt, au fil du batch: JSON Lines (.jsonl)
+    ou CSV (.csv) selon l'extension du fichier. Les phases absentes
+    (dépôt repris du cache, autre moteur) restent vides.
+    """
+
+    def __init__(self, chemin_sortie, moteur="depot"):
+        self.chemin = Path(chemin_sortie)
+        self.moteur = moteur
+        self.totaux = dict.fromkeys(PHASES, 0.0)
+        self.lignes = 0
+        self._fichier = open(self.chemin, "w", newline="", encoding="utf-8")
+        self._csv = None
+        if self.chemin.suffix.lower() == ".csv":
+            self._csv = csv.writer(self._fichier)
+            self._csv.writerow(["etudiant", "origine", "moteur", "duree"] + PHASES)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def ajouter(self, result):
+        """
+        Ajoute les phases d'un étudiant (result["phases"]).
+
+        Args:
+            result: Résultat de l'étudiant (voir corriger_depot)
+        """
+        phases = result.get("phases") or {}
+        origine = next(
+            (o for o in ("reprise", "cache", "doublon_de") if result.get(o)),
+            "execution"
+        )
+        if origine == "doublon_de":
+            origine = "doublon"
+        if origine != "reprise":
+            for phase in PHASES:
+                self.totaux[phase] += phases.get(phase, 0.0)
+
+        if self._csv is not None:
+            self._csv.writerow(
+                [result["etudiant"], origine, self.moteur, f"{result.get('duree', 0):.6f}"]
+                + [f"{phases[p]:.6f}" if p in phases else "" for p in PHASES]
+            )
+        else:
+            self._fichier.write(json.dumps({
+                "etudiant": result["etudiant"],
+                "origine": origine,
+                "moteur": self.moteur,
+                "duree": result.get("duree", 0),
+                "phases": {p: phases[p] for p in PHASES if p in phases}
+            }, ensure_ascii=False) + "\n")
+        self.lignes += 1
+
+    def fermer(self):
+        """Ferme le fichier de profil."""
+        if not self._fichier.closed:
+            self._fichier.close()
+
+    def afficher(self):
+        """Affiche le temps cumulé de chaque phase et sa part du total."""
+        cumul = sum(self.totaux.values())
+        print(f"\n{'='*70}")
+        print(f"🔬 PROFIL DES PHASES ({self.lignes} dépôt(s), {self.chemin})")
+        print('='*70)
+        for phase in PHASES:
+            part = self.totaux[phase] / cumul * 100 if cumul > 0 else 0.0
+            print(f"  {phase:<12} {self.totaux[phase]:>10.3f} s  {part:5.1f}%")
+
+
+def ecrire_piles(profil, chemin_sortie):
+    """
+    Écrit un profil cProfile en piles repliées (flamegraph.pl, speedscope).
+
+    cProfile ne conserve que les arcs appelant → appelé: chaque pile est
+    reconstruite en remontant les appelants, et le temps propre d'une
+    fonction est réparti entre ses appelants au prorata du temps cumulé
+    de chaque arc.
+
+    Args:
+        profil: cProfile.Profile arrêté
+        chemin_sortie: Fichier texte (une ligne « a;b;c microsecondes » par pile)
+
+    Returns:
+        int: Nombre de piles écrites
+    """
+    stats = pstats.Stats(profil).stats
+
+    def nom(fonction):
+        fichier, ligne, fonc = fonction
+        if fichier == "~":
+            return fonc
+        return f"{Path(fichier).name}:{ligne}({fonc})"
+
+    def remonter(fonction, part, pile, profondeur):
+        appelants = stats.get(fonction, (0, 0, 0, 0, {}))[4]
+        total = sum(arc[3] for arc in appelants.values())
+        if not appelants or total <= 0 or profondeur >= PROFONDEUR_PILES:
+            yield [nom(fonction)] + pile, part
+            return
+        for appelant, arc in appelants.items():
+            fraction = part * arc[3] / total
+            if appelant in pile_fonctions or fraction < 1e-6:
+                continue
+            pile_fonctions.add(appelant)
+            yield from remonter(appelant, fraction, [nom(fonction)] + pile, profondeur + 1)
+            pile_fonctions.discard(appelant)
+
+    piles = {}
+    for fonction, (_, _, temps_propre, _, _) in stats.items():
+        if temps_propre <= 0:
+            continue
+        pile_fonctions = {fonction}
+        for pile, part in remonter(fonction, temps_propre, [], 0):
+            cle = ";".join(pile)
+            piles[cle] = piles.get(cle, 0.0) + part
+
+    with open(chemin_sortie, "w", encoding="utf-8") as sortie:
+        for pile, secondes in sorted(piles.items()):
+            microsecondes = round(secondes * 1e6)
+            if microsecondes > 0:
+                sortie.write(f"{pile} {microsecondes}\n")
+    return len(piles)
+
+
+def afficher_durees(etudiants_resultats, duree_totale, limite=None):
+    """
+    Affiche le temps total du batch et le temps de correction par dépôt.
+
+    Args:
+        etudiants_resultats: Liste des résultats par étudiant
+        duree_totale: Temps écoulé pour tout le batch (secondes)
+        limite: Nombre maximal de dépôts listés (les plus lents; None = tous)
+    """
+    print("\n" + "="*70)
+    print("⏱️  DURÉES DE CORRECTION")
+    print("="*70)
+
+    demarrages = []
+    par_duree = sorted(etudiants_resultats, key=lambda r: r["duree"], reverse=True)
+    for rang, result in enumerate(par_duree):
+        demarrage = result["resultats"].get("summary", {}).get("demarrage")
+        ligne = f"  {result['etudiant']:<50} {result['duree']:>8.2f} s"
+        if demarrage is not None and not (result.get("cache") or result.get("doublon_de")):
+            demarrages.append(demarrage)
+            ligne += f"  (démarrage pytest {demarrage:.3f} s)"
+        if limite is None or rang < limite:
+            print(ligne)
+
+    cumul = sum(r["duree"] for r in etudiants_resultats)
+    print("-"*70)
+    print(f"Dépôts corrigés: {len(etudiants_resultats)}")
+    if demarrages:
+        print(f"Démarrage pytest moyen par dépôt: {sum(demarrages) / len(demarrages):.3f} s")
+    print(f"Temps cumulé par dépôt: {cumul:.2f} s")
+    print(f"Temps total (horloge): {duree_totale:.2f} s")
+    if 0 < duree_totale < cumul:
+        print(f"Accélération: {cumul / duree_totale:.1f}x")
+
+
+def _prolonger_bail(chemin_db, chemin, travailleur, arret, perdu):
+    """
+    Prolonge le bail d'un dépôt tant que la correction n'est pas terminée.
+
+    Si le bail a été repris par un autre travailleur (prolongation trop
+    tardive), lève perdu pour que la correction en cours soit arrêtée.
+    """
+    db = file_attente.connecter(chemin_db)
+    try:
+        while not arret.wait(file_attente.DUREE_BAIL / 3):
+            if not file_attente.prolonger(db, chemin, travailleur):
+                perdu.set()
+                return
+    finally:
+        db.close()
+
+
+def travailler(chemin_db, travailleur=None):
+    """
+    Boucle d'un travailleur de la file partagée.
+
+    Réserve un dépôt, le corrige et enregistre le résultat, jusqu'à ce
+    que la file soit vide. Tant que d'autres travailleurs ont des dépôts
+    en cours, le travailleur attend pour reprendre ceux dont le bail
+    expire (travailleur arrêté).
+
+    Args:
+        chemin_db: Fichier SQLite de la file (voir file_attente.py)
+        travailleur: Identifiant (défaut: <hôte>:<pid>)
+
+    Returns:
+        int: Nombre de dépôts corrigés par ce travailleur
+    """
+    travailleur = travailleur or f"{socket.gethostname()}:{os.getpid()}"
+    db = file_attente.connecter(chemin_db)
+    corriges = 0
+
+    while True:
+        chemin = file_attente.reserver(db, travailleur)
+        if chemin is None:
+            if file_attente.restants(db) == 0:
+                break
+            time.sleep(INTERVALLE_FILE)
+            continue
+
+        arret = threading.Event()
+        perdu = threading.Event()
+        battement = threading.Thread(
+            target=_prolonger_bail, args=(chemin_db, chemin, travailleur, arret, perdu),
+            daemon=True
+        )
+        battement.start()
+        try:
+            result = corriger_depot(Path(chemin), abandon=perdu)
+        finally:
+            arret.set()
+            battement.join()
+
+        result.pop("sortie")
+        if perdu.is_set():
+            print(f"[{travailleur}] {result['etudiant']}: bail perdu, correction arrêtée", flush=True)
+        elif file_attente.terminer(db, chemin, travailleur, result):
+            corriges += 1
+            print(f"[{travailleur}] {result['etudiant']}: {result['notes']['finale']:.1f}% "
+                  f"({result['duree']:.1f} s)", flush=True)
+        else:
+            print(f"[{travailleur}] {result['etudiant']}: bail perdu, résultat ignoré", flush=True)
+
+    db.close()
+    return corriges
+
+
+def coordonner(batch_path, chemin_db, travailleurs):
+    """
+    Inscrit un batch dans la file partagée, lance des travailleurs locaux
+    et attend que tous les dépôts soient traités.
+
+    D'autres travailleurs (autres machines ou conteneurs) peuvent se
+    joindre avec: python3 correction.py --travailleur --file-attente <db>
+    Un travailleur local qui meurt est relancé; son dépôt est repris à
+    l'expiration du bail.
+
+    Args:
+        batch_path: Dossier contenant les dépôts
+        chemin_db: Fichier SQLite de la file
+        travailleurs: Nombre de travailleurs locaux à lancer (0 = aucun)
+
+    Returns:
+        list: Résultats par étudiant, dans l'ordre des dépôts
+    """
+    db = file_attente.connecter(chemin_db)
+    file_attente.initialiser(db, lister_depots(batch_path))
+
+    cmd = [sys.executable, str(Path(__file__).resolve()),
+           "--travailleur", "--file-attente", str(chemin_db)]
+    processus = [subprocess.Popen(cmd) for _ in range(travailleurs)]
+    relances = travailleurs * file_attente.MAX_TENTATIVES
+
+    print(f"📋 File {chemin_db}: {file_attente.restants(db)} dépôt(s) à corriger, "
+          f"{travailleurs} travailleur(s) local(aux)")
+
+    while file_attente.restants(db) > 0:
+        for i, p in enumerate(processus):
+            if p.poll() not in (None, 0) and relances > 0:
+                print(f"⚠️ Travailleur {p.pid} arrêté (code {p.returncode}), relance")
+                processus[i] = subprocess.Popen(cmd)
+                relances -= 1
+        if travailleurs and all(p.poll() is not None for p in processus):
+            print("❌ Plus aucun travailleur local actif; dépôts restants non corrigés")
+            break
+        time.sleep(INTERVALLE_FILE)
+
+    for p in processus:
+        p.wait()
+
+    tous_resultats = []
+    for etudiant, etat, tentatives, result in file_attente.resultats(db):
+        if etat != "termine":
+            resultats_tests = result or {
+                "erreur": f"Correction non terminée ({etat}, {tentatives} tentative(s))"
+            }
+            result = {
+                "etudiant": etudiant,
+                "resultats": resultats_tests,
+                "notes": calculer_notes(resultats_tests),
+                "duree": 0.0
+            }
+        tous_resultats.append(result)
+
+    db.close()
+    return tous_resultats
+
+
+def enregistrer_historique(chemin_db, etudiants_resultats, moteur):
+    """
+    Ajoute les résultats de cette exécution à l'historique SQLite.
+
+    Args:
+        chemin_db: Base d'historique (voir historique.py)
+        etudiants_resultats: Liste des résultats par étudiant
+        moteur: Moteur de correction utilisé
+    """
+    db = historique.connecter(chemin_db)
+    try:
+        execution_id = historique.enregistrer_execution(db, etudiants_resultats, moteur)
+        print(f"🗃️  Historique: exécution #{execution_id} enregistrée dans {chemin_db}")
+    finally:
+        db.close()
+
+
 def main():
     """
     Fonction principale du script de correction.
     """
     parser = argparse.ArgumentParser(description="Script de correction pour F1")
-    parser.add_argument("repo", help="Chemin vers le dépôt de l'étudiant")
-    parser.add_argument("--export", help="Chemin pour exporter les résultats en Excel")
+    parser.add_argument("repo", nargs="?", help="Chemin vers le dépôt de l'étudiant")
+    parser.add_argument("--export", help="Chemin pour exporter les résultats "
+                                         "(.xlsx, .csv ou .parquet)")
     parser.add_argument("--batch", help="Traiter tous les dépôts dans le dossier spécifié")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Nombre de dépôts corrigés en parallèle en mode batch "
+                             "(0 = nombre de cœurs)")
+    parser.add_argument("--moteur", choices=["depot", "session", "fork"], default="depot",
+                        help="depot: un pytest par dépôt; session: tests canoniques "
+                             "exécutés sur plusieurs dépôts dans une même session pytest; "
+                             "fork: pytest pré-chargé, un processus enfant (os.fork) par dépôt")
+    parser.add_argument("--cache", help="Dossier du cache de correction "
+                                        "(défaut: <batch>/.correction_cache)")
+    parser.add_argument("--sans-cache", action="store_true",
+                        help="Recorriger tous les dépôts sans consulter le cache")
+    parser.add_argument("--sans-isolation", action="store_true",
+                        help="Exécuter les scripts des étudiants sur le matériel simulé même "
+                             "sans bac à sable (bwrap/unshare); sinon ce test est ignoré")
+    parser.add_argument("--journal", help="Journal de reprise du batch "
+                                          "(défaut: <batch>/.correction_journal.jsonl)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reprendre un batch interrompu à partir du journal")
+    parser.add_argument("--file-attente", help="File SQLite partagée: répartit le batch "
+                                               "entre plusieurs travailleurs")
+    parser.add_argument("--travailleurs", type=int,
+                        help="Travailleurs locaux lancés par le coordonnateur "
+                             "(défaut: --jobs)")
+    parser.add_argument("--travailleur", action="store_true",
+                        help="Corriger les dépôts de la file --file-attente, puis quitter")
+    parser.add_argument("--rapports", help="Écrire un rapport par étudiant dans ce dossier "
+                                           "au lieu de l'afficher (console: progression seulement)")
+    parser.add_argument("--format-rapport", choices=["md", "html"], default="md",
+                        help="Format des rapports écrits avec --rapports")
+    parser.add_argument("--profile", help="Écrire la durée de chaque phase de correction, "
+                                          "par dépôt (.jsonl ou .csv)")
+    parser.add_argument("--profile-piles", help="Profiler le processus principal avec cProfile "
+                                                "et écrire les piles repliées (flame graph)")
+    parser.add_argument("--historique", help="Base SQLite où conserver les résultats "
+                                             "de chaque exécution (voir historique.py)")
 
     args = parser.parse_args()
 
+    if args.travailleur and not args.file_attente:
+        parser.error("--travailleur nécessite --file-attente <db>")
+    if not args.batch and not args.repo and not args.travailleur:
+        parser.error("indiquez un dépôt ou utilisez --batch <dossier>")
+
+    sans_poids, introuvables = verifier_rubrique()
+    if sans_poids:
+        print(f"⚠️ Tests canoniques absents de la grille: {', '.join(sans_poids)}")
+    if introuvables:
+        print(f"⚠️ Tests de la grille introuvables dans tests/: {', '.join(introuvables)}")
+
+    # Les scripts des étudiants ne tournent sans bac à sable que sur demande
+    # (hérité par les processus pytest et les travailleurs)
+    if args.sans_isolation:
+        os.environ["SIM_REQUIRE_ISOLATION"] = "0"
+    else:
+        os.environ.setdefault("SIM_REQUIRE_ISOLATION", "1")
+    if not args.travailleur:
+        isolation = available_isolation()
+        if isolation != "none":
+            print(f"🔒 Scripts simulés isolés avec {isolation}")
+        elif os.environ["SIM_REQUIRE_ISOLATION"] == "1":
+            print("⚠️ Aucun bac à sable (bwrap ou unshare) sur cette machine: les scripts "
+                  "des étudiants ne seront pas exécutés (--sans-isolation pour les exécuter)")
+        else:
+            print("⚠️ Scripts simulés exécutés SANS isolation (--sans-isolation)")
+
+    moteur = "file" if args.file_attente else args.moteur
+    profil = ProfilPhases(args.profile, moteur) if args.profile else None
+    profileur = cProfile.Profile() if args.profile_piles else None
+    if profileur is not None:
+        profileur.enable()
+
+    # Mode travailleur: corriger les dépôts d'une file partagée
+    if args.travailleur:
+        travailler(Path(args.file_attente))
+
+    # Mode coordonnateur: batch réparti par une file partagée
+    elif args.batch and args.file_attente:
+        travailleurs = args.travailleurs if args.travailleurs is not None else max(args.jobs, 1)
+        debut = time.perf_counter()
+        tous_resultats = coordonner(Path(args.batch), Path(args.file_attente), travailleurs)
+
+        for result in tous_resultats:
+            chrono = time.perf_counter()
+            afficher_rapport(result["etudiant"], result["resultats"], result["notes"])
+            if profil is not None:
+                result.setdefault("phases", {})["rapport"] = time.perf_counter() - chrono
+                profil.ajouter(result)
+        afficher_durees(tous_resultats, time.perf_counter() - debut)
+
+        if args.historique:
+            enregistrer_historique(args.historique, tous_resultats, "file")
+        if args.export:
+            exporter_excel(tous_resultats, args.export)
+
     # Mode batch: traiter plusieurs dépôts
-    if args.batch:
+    elif args.batch:
         tous_resultats = []
         batch_path = Path(args.batch)
-
-        for repo_dir in batch_path.iterdir():
-            if repo_dir.is_dir() and not repo_dir.name.startswith('.'):
-                print(f"\n{'='*70}")
-                print(f"Traitement de: {repo_dir.name}")
-                print('='*70)
-
-                resultats_tests = executer_tests(repo_dir)
-                notes = calculer_notes(resultats_tests)
-
-                tous_resultats.append({
-                    "etudiant": repo_dir.name,
-                    "resultats": resultats_tests,
-                    "notes": notes
-                })
-
-                afficher_rapport(repo_dir.name, resultats_tests, notes)
-
-        # Exporter si demandé
-        if args.export:
-            exporter_excel(tous_resultats, args.export)
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        if args.moteur == "fork" and not hasattr(os, "pidfd_open"):
+            print("⚠️ os.fork()/os.pidfd_open() non disponibles sur ce système; moteur « depot » utilisé")
+            args.moteur = "depot"
+        cache_dir = None
+        if not args.sans_cache:
+            cache_dir = Path(args.cache) if args.cache else batch_path / ".correction_cache"
+        chemin_journal = Path(args.journal) if args.journal else batch_path / ".correction_journal.jsonl"
+        deja_corriges = lire_journal(chemin_journal) if args.resume else {}
+        if deja_corriges:
+            print(f"↩️  Reprise: {len(deja_corriges)} dépôt(s) déjà corrigé(s) dans {chemin_journal}")
+
+        chemin_durees = batch_path / ".correction_durees.json"
+        durees = charger_durees(chemin_durees)
+
+        exportateur = ouvrir_export(args.export) if args.export else None
+        ecrivain = None
+        if args.rapports:
+            ecrivain = EcrivainRapports(args.rapports, args.format_rapport,
+                                        en_arriere_plan=args.moteur != "fork")
+        depots = lister_depots(batch_path)
+        debut = time.perf_counter()
+
+        with ouvrir_journal(chemin_journal, deja_corriges) as journal:
+            try:
+                for result in corriger_batch(depots, jobs, args.moteur,
+                                             cache_dir, deja_corriges, durees):
+                    sortie = result.pop("sortie")
+                    phases = result.setdefault("phases", {})
+
+                    if not result.get("reprise"):
+                        ecrire_journal(journal, result)
+
+                    tous_resultats.append(result)
+                    chrono = time.perf_counter()
+                    if exportateur is not None:
+                        exportateur.ajouter(result)
+                        phases["export"] = time.perf_counter() - chrono
+
+                    chrono = time.perf_counter()
+                    if ecrivain is not None:
+                        ecrivain.soumettre(result)
+                        afficher_progression(len(tous_resultats), len(depots), debut)
+                    else:
+                        print(f"\n{'='*70}")
+                        print(f"Traitement de: {result['etudiant']}")
+                        print('='*70)
+                        print(sortie, end="")
+                        afficher_rapport(result["etudiant"], result["resultats"], result["notes"])
+                    phases["rapport"] = time.perf_counter() - chrono
+
+                    if profil is not None:
+                        profil.ajouter(result)
+
+            except KeyboardInterrupt:
+                print(f"\n⚠️ Batch interrompu après {len(tous_resultats)} dépôt(s).")
+                print(f"Relancez avec --resume pour continuer (journal: {chemin_journal})")
+                sys.exit(130)
+            finally:
+                # Même interrompu, le batch laisse ses rapports et un export lisible
+                if ecrivain is not None:
+                    ecrivain.fermer()
+                if exportateur is not None:
+                    exportateur.fermer()
+
+        if ecrivain is not None:
+            print(f"📝 {ecrivain.ecrits} rapport(s) écrit(s) dans {args.rapports}")
+            for erreur in ecrivain.erreurs:
+                print(f"❌ Rapport non écrit: {erreur}")
+
+        afficher_durees(tous_resultats, time.perf_counter() - debut,
+                        limite=10 if ecrivain is not None else None)
+        enregistrer_durees(chemin_durees, durees, tous_resultats)
+
+        afficher_groupes(tous_resultats)
+        if cache_dir is not None:
+            succes = sum(1 for r in tous_resultats if r.get("cache"))
+            print(f"💾 Cache ({cache_dir}): {succes} réutilisé(s), "
+                  f"{len(tous_resultats) - succes} absent(s) du cache")
+
+        if args.historique:
+            enregistrer_historique(args.historique, tous_resultats, args.moteur)
+
+        # Les lignes ont été écrites au fil du batch
+        if exportateur is not None:
+            print(f"✅ Résultats exportés vers: {args.export} ({exportateur.lignes} lignes)")
 
     # Mode single: un seul dépôt
     else:
@@ -407,10 +2430,35 @@ def main():
             sys.exit(1)
 
         etudiant = repo_path.name
-        resultats_tests = executer_tests(repo_path)
+        phases = {}
+        debut = time.perf_counter()
+        resultats_tests = executer_tests(repo_path, phases=phases)
+        chrono = time.perf_counter()
         notes = calculer_notes(resultats_tests)
+        phases["notes"] = time.perf_counter() - chrono
 
+        chrono = time.perf_counter()
         afficher_rapport(etudiant, resultats_tests, notes)
+        phases["rapport"] = time.perf_counter() - chrono
+
+        if profil is not None:
+            profil.ajouter({"etudiant": etudiant, "duree": time.perf_counter() - debut,
+                            "phases": phases})
+
+        if args.historique:
+            enregistrer_historique(args.historique, [{
+                "etudiant": etudiant,
+                "resultats": resultats_tests,
+                "notes": notes
+            }], "depot")
+
+    if profileur is not None:
+        profileur.disable()
+        piles = ecrire_piles(profileur, args.profile_piles)
+        print(f"🔥 {piles} pile(s) cProfile écrite(s) dans {args.profile_piles}")
+    if profil is not None:
+        profil.fermer()
+        profil.afficher()
 
 
 if __name__ == "__main__":
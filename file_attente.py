@@ -0,0 +1,191 @@
+"""
+File d'attente de correction partagée — Formatif F1
+Cours 243-413-SH — Introduction aux objets connectés
+
+Ce module répartit un batch de correction entre plusieurs travailleurs
+(processus locaux, conteneurs ou machines qui partagent un système de
+fichiers). La file est une base SQLite:
+1. Le coordonnateur inscrit les dépôts à corriger
+2. Chaque travailleur réserve un dépôt avec un bail (durée limitée)
+3. Le travailleur prolonge son bail pendant la correction
+4. Un bail expiré (travailleur mort) remet le dépôt dans la file
+5. Après MAX_TENTATIVES, le dépôt est marqué en échec
+
+Note: SQLite se fie aux verrous du système de fichiers; sur NFS, ceux-ci
+doivent être fonctionnels (lockd) pour que les réservations restent
+exclusives.
+"""
+
+import json
+import sqlite3
+import time
+
+
+# Durée d'un bail de correction (secondes)
+DUREE_BAIL = 120
+
+# Nombre de réservations permises avant d'abandonner un dépôt
+MAX_TENTATIVES = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS depots (
+    chemin TEXT PRIMARY KEY,
+    etudiant TEXT NOT NULL,
+    ordre INTEGER NOT NULL,
+    etat TEXT NOT NULL DEFAULT 'en_attente',
+    travailleur TEXT,
+    bail_expire REAL,
+    tentatives INTEGER NOT NULL DEFAULT 0,
+    resultat TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_depots_etat ON depots (etat, ordre);
+"""
+
+
+def connecter(chemin_db):
+    """
+    Ouvre la base de la file d'attente (et crée le schéma au besoin).
+
+    Args:
+        chemin_db: Chemin du fichier SQLite
+
+    Returns:
+        sqlite3.Connection: Connexion en mode autocommit
+    """
+    db = sqlite3.connect(str(chemin_db), timeout=30, isolation_level=None)
+    db.executescript(SCHEMA)
+    return db
+
+
+def initialiser(db, depots):
+    """
+    Inscrit les dépôts d'un nouveau batch.
+
+    La file est vidée d'abord: une base réutilisée ne doit pas rendre
+    les résultats (ou les échecs) d'un batch précédent comme s'ils
+    venaient de celui-ci. Un travailleur encore occupé par l'ancien
+    batch perd son bail et son résultat est ignoré.
+
+    Args:
+        db: Connexion à la file
+        depots: Liste des chemins de dépôts, dans l'ordre du rapport
+    """
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DELETE FROM depots")
+        db.executemany(
+            "INSERT INTO depots (chemin, etudiant, ordre) VALUES (?, ?, ?)",
+            [(str(d), d.name, i) for i, d in enumerate(depots)]
+        )
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+
+def reserver(db, travailleur, duree_bail=DUREE_BAIL):
+    """
+    Réserve le prochain dépôt disponible.
+
+    Un dépôt est disponible s'il est en attente ou si le bail de son
+    travailleur est expiré. Les dépôts qui ont épuisé leurs tentatives
+    sont marqués en échec au passage.
+
+    Args:
+        db: Connexion à la file
+        travailleur: Identifiant du travailleur
+        duree_bail: Durée du bail (secondes)
+
+    Returns:
+        str: Chemin du dépôt réservé, ou None si aucun n'est disponible
+    """
+    maintenant = time.time()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute(
+            "UPDATE depots SET etat = 'echec', resultat = ? "
+            "WHERE etat = 'en_cours' AND bail_expire < ? AND tentatives >= ?",
+            (json.dumps({"erreur": "Correction abandonnée - travailleur arrêté à répétition"}),
+             maintenant, MAX_TENTATIVES)
+        )
+        ligne = db.execute(
+            "SELECT chemin FROM depots "
+            "WHERE etat = 'en_attente' OR (etat = 'en_cours' AND bail_expire < ?) "
+            "ORDER BY ordre LIMIT 1",
+            (maintenant,)
+        ).fetchone()
+        if ligne is not None:
+            db.execute(
+                "UPDATE depots SET etat = 'en_cours', travailleur = ?, bail_expire = ?, "
+                "tentatives = tentatives + 1 WHERE chemin = ?",
+                (travailleur, maintenant + duree_bail, ligne[0])
+            )
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+    return ligne[0] if ligne is not None else None
+
+
+def prolonger(db, chemin, travailleur, duree_bail=DUREE_BAIL):
+    """
+    Prolonge le bail d'un dépôt en cours de correction.
+
+    Returns:
+        bool: False si le bail a été perdu (repris par un autre travailleur)
+    """
+    curseur = db.execute(
+        "UPDATE depots SET bail_expire = ? "
+        "WHERE chemin = ? AND travailleur = ? AND etat = 'en_cours'",
+        (time.time() + duree_bail, chemin, travailleur)
+    )
+    return curseur.rowcount == 1
+
+
+def terminer(db, chemin, travailleur, result):
+    """
+    Enregistre le résultat d'un dépôt réservé.
+
+    Args:
+        db: Connexion à la file
+        chemin: Chemin du dépôt
+        travailleur: Identifiant du travailleur (doit détenir le bail)
+        result: Résultat JSON-sérialisable de la correction
+
+    Returns:
+        bool: False si le bail appartenait à un autre travailleur
+    """
+    curseur = db.execute(
+        "UPDATE depots SET etat = 'termine', resultat = ?, bail_expire = NULL "
+        "WHERE chemin = ? AND travailleur = ? AND etat = 'en_cours'",
+        (json.dumps(result, ensure_ascii=False), chemin, travailleur)
+    )
+    return curseur.rowcount == 1
+
+
+def restants(db):
+    """
+    Compte les dépôts qui ne sont pas encore terminés ou en échec.
+
+    Returns:
+        int: Nombre de dépôts en attente ou en cours
+    """
+    return db.execute(
+        "SELECT COUNT(*) FROM depots WHERE etat IN ('en_attente', 'en_cours')"
+    ).fetchone()[0]
+
+
+def resultats(db):
+    """
+    Lit tous les résultats, dans l'ordre d'inscription.
+
+    Returns:
+        list: Tuples (etudiant, etat, tentatives, résultat décodé ou None)
+    """
+    return [
+        (etudiant, etat, tentatives, json.loads(resultat) if resultat else None)
+        for etudiant, etat, tentatives, resultat in db.execute(
+            "SELECT etudiant, etat, tentatives, resultat FROM depots ORDER BY ordre"
+        )
+    ]
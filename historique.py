@@ -0,0 +1,266 @@
+"""
+Historique des corrections — Formatif F1
+Cours 243-413-SH — Introduction aux objets connectés
+
+Ce module conserve les résultats de chaque exécution de correction.py
+dans une base SQLite, pour suivre la progression sur toute la session:
+1. Une ligne par exécution (executions)
+2. Une ligne par dépôt et par exécution (depots)
+3. Une ligne par test, par dépôt et par exécution (tests)
+
+Les index couvrent les requêtes par étudiant, par nom de test et par
+date, qui restent rapides avec des centaines de milliers de lignes.
+
+Usage:
+    python3 historique.py <db> regressions <test> [--depuis 7]
+    python3 historique.py <db> tendance [--test <test>] [--depuis 30]
+    python3 historique.py <db> etudiant <nom>
+
+Exemple:
+    python3 historique.py f1.db regressions test_error_handling --depuis 2026-10-11
+"""
+
+import sys
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY,
+    horodatage REAL NOT NULL,
+    moteur TEXT
+);
+CREATE TABLE IF NOT EXISTS depots (
+    execution_id INTEGER NOT NULL REFERENCES executions (id),
+    etudiant TEXT NOT NULL,
+    horodatage REAL NOT NULL,
+    empreinte TEXT,
+    score_e REAL,
+    score_d REAL,
+    finale REAL,
+    duree REAL,
+    erreur TEXT,
+    PRIMARY KEY (execution_id, etudiant)
+);
+CREATE TABLE IF NOT EXISTS tests (
+    execution_id INTEGER NOT NULL REFERENCES executions (id),
+    etudiant TEXT NOT NULL,
+    test TEXT NOT NULL,
+    horodatage REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    duree REAL,
+    PRIMARY KEY (execution_id, etudiant, test)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_executions_horodatage ON executions (horodatage);
+CREATE INDEX IF NOT EXISTS idx_depots_etudiant ON depots (etudiant, horodatage);
+CREATE INDEX IF NOT EXISTS idx_depots_erreur ON depots (horodatage) WHERE erreur IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_tests_test ON tests (test, etudiant, horodatage, outcome);
+CREATE INDEX IF NOT EXISTS idx_tests_horodatage ON tests (horodatage, test, outcome);
+"""
+
+
+def connecter(chemin_db):
+    """
+    Ouvre la base d'historique (et crée le schéma au besoin).
+
+    Args:
+        chemin_db: Chemin du fichier SQLite
+
+    Returns:
+        sqlite3.Connection: Connexion à la base
+    """
+    db = sqlite3.connect(str(chemin_db), timeout=30)
+    db.execute("PRAGMA journal_mode = WAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+def enregistrer_execution(db, etudiants_resultats, moteur="depot", horodatage=None):
+    """
+    Enregistre les résultats d'une exécution de correction.
+
+    Args:
+        db: Connexion à la base
+        etudiants_resultats: Liste des résultats par étudiant (voir correction.py)
+        moteur: Moteur de correction utilisé
+        horodatage: Moment de l'exécution (défaut: maintenant, en secondes epoch)
+
+    Returns:
+        int: Identifiant de l'exécution
+    """
+    horodatage = time.time() if horodatage is None else horodatage
+
+    with db:
+        execution_id = db.execute(
+            "INSERT INTO executions (horodatage, moteur) VALUES (?, ?)",
+            (horodatage, moteur)
+        ).lastrowid
+
+        db.executemany(
+            "INSERT OR REPLACE INTO depots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (execution_id, r["etudiant"], horodatage, r.get("empreinte"),
+                 r["notes"]["IND-00SX-E"]["score"], r["notes"]["IND-00SX-D"]["score"],
+                 r["notes"]["finale"], r.get("duree"), r["resultats"].get("erreur"))
+                for r in etudiants_resultats
+            ]
+        )
+        db.executemany(
+            "INSERT OR REPLACE INTO tests VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (execution_id, r["etudiant"], t["name"], horodatage,
+                 t["outcome"], t.get("duration"))
+                for r in etudiants_resultats
+                for t in r["resultats"].get("tests", [])
+            ]
+        )
+
+    return execution_id
+
+
+def regressions(db, test, depuis):
+    """
+    Trouve les étudiants dont un test a régressé depuis une date.
+
+    Compare le dernier résultat du test avant `depuis` au dernier
+    résultat connu: réussi avant, non réussi maintenant. Une exécution
+    en erreur (timeout, pytest introuvable) n'a aucune ligne de test:
+    elle compte comme un résultat "erreur" pour tous les tests.
+
+    Args:
+        db: Connexion à la base
+        test: Nom du test (ex.: test_error_handling)
+        depuis: Date de référence (secondes epoch)
+
+    Returns:
+        list: Tuples (etudiant, outcome actuel, horodatage actuel)
+    """
+    # SQLite garantit que les colonnes simples d'un SELECT ... MAX()
+    # proviennent de la ligne qui atteint le maximum.
+    return db.execute(
+        """
+        WITH avant AS (
+            SELECT etudiant, outcome, MAX(horodatage) AS horodatage
+            FROM tests WHERE test = :test AND horodatage <= :depuis
+            GROUP BY etudiant
+        ), maintenant AS (
+            SELECT etudiant, outcome, MAX(horodatage) AS horodatage
+            FROM (
+                SELECT etudiant, outcome, horodatage FROM tests WHERE test = :test
+                UNION ALL
+                SELECT etudiant, 'erreur', horodatage FROM depots WHERE erreur IS NOT NULL
+            )
+            GROUP BY etudiant
+        )
+        SELECT m.etudiant, m.outcome, m.horodatage
+        FROM avant a JOIN maintenant m ON m.etudiant = a.etudiant
+        WHERE a.outcome = 'passed' AND m.outcome != 'passed'
+        ORDER BY m.etudiant
+        """,
+        {"test": test, "depuis": depuis}
+    ).fetchall()
+
+
+def tendance(db, test=None, depuis=0):
+    """
+    Calcule le taux de réussite par jour et par test.
+
+    Args:
+        db: Connexion à la base
+        test: Nom du test (None = tous les tests)
+        depuis: Date de début (secondes epoch)
+
+    Returns:
+        list: Tuples (jour, test, taux de réussite 0-1, nombre de résultats)
+    """
+    filtre = "AND test = :test" if test else ""
+    return db.execute(
+        f"""
+        SELECT date(horodatage, 'unixepoch', 'localtime') AS jour, test,
+               AVG(outcome = 'passed'), COUNT(*)
+        FROM tests
+        WHERE horodatage >= :depuis {filtre}
+        GROUP BY jour, test
+        ORDER BY jour, test
+        """,
+        {"test": test, "depuis": depuis}
+    ).fetchall()
+
+
+def historique_etudiant(db, etudiant):
+    """
+    Liste les notes d'un étudiant à chaque exécution.
+
+    Returns:
+        list: Tuples (horodatage, finale, score_e, score_d, erreur)
+    """
+    return db.execute(
+        "SELECT horodatage, finale, score_e, score_d, erreur FROM depots "
+        "WHERE etudiant = ? ORDER BY horodatage",
+        (etudiant,)
+    ).fetchall()
+
+
+def lire_date(texte):
+    """
+    Convertit une date ISO (2026-10-11) ou un nombre de jours en arrière (7).
+
+    Returns:
+        float: Date en secondes epoch
+    """
+    try:
+        return time.time() - float(texte) * 86400
+    except ValueError:
+        return datetime.fromisoformat(texte).timestamp()
+
+
+def formater_date(horodatage):
+    """Formate une date epoch pour l'affichage."""
+    return datetime.fromtimestamp(horodatage).strftime("%Y-%m-%d %H:%M")
+
+
+def main():
+    """
+    Interroge l'historique des corrections.
+    """
+    parser = argparse.ArgumentParser(description="Historique des corrections F1")
+    parser.add_argument("db", help="Base SQLite créée par correction.py --historique")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    p = commandes.add_parser("regressions", help="Étudiants dont un test a régressé")
+    p.add_argument("test", help="Nom du test (ex.: test_error_handling)")
+    p.add_argument("--depuis", default="7", help="Date ISO ou nombre de jours (défaut: 7)")
+
+    p = commandes.add_parser("tendance", help="Taux de réussite par jour et par test")
+    p.add_argument("--test", help="Limiter à un test")
+    p.add_argument("--depuis", default="30", help="Date ISO ou nombre de jours (défaut: 30)")
+
+    p = commandes.add_parser("etudiant", help="Notes d'un étudiant à chaque exécution")
+    p.add_argument("nom", help="Nom du dépôt de l'étudiant")
+
+    args = parser.parse_args()
+    db = connecter(args.db)
+
+    if args.commande == "regressions":
+        lignes = regressions(db, args.test, lire_date(args.depuis))
+        print(f"{len(lignes)} régression(s) de {args.test}")
+        for etudiant, outcome, horodatage in lignes:
+            print(f"  {etudiant:<50} {outcome:<8} {formater_date(horodatage)}")
+
+    elif args.commande == "tendance":
+        for jour, test, taux, nombre in tendance(db, args.test, lire_date(args.depuis)):
+            print(f"  {jour}  {test:<35} {taux * 100:5.1f}%  ({nombre})")
+
+    else:
+        for horodatage, finale, score_e, score_d, erreur in historique_etudiant(db, args.nom):
+            ligne = f"  {formater_date(horodatage)}  {finale:5.1f}%  (E {score_e:.0f}%, D {score_d:.0f}%)"
+            print(ligne + (f"  {erreur}" if erreur else ""))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
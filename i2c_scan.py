@@ -0,0 +1,310 @@
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Scan I2C natif pour le Formatif F1
+
+Ouvre /dev/i2c-N directement et sonde seulement les adresses du cours
+(AHT20 a 0x38, NeoSlider a 0x30) avec les ioctl SMBus du noyau, comme
+i2cdetect, mais sans sudo, sans sous-processus et sans analyser un
+tableau de texte. Un scan prend quelques millisecondes.
+
+Methode de sondage (meme regle que i2cdetect en mode auto):
+    - lecture d'un octet pour 0x30-0x37 et 0x50-0x5F (EEPROM, etc.)
+    - ecriture rapide (quick write) pour les autres adresses
+
+BusI2CSimule remplace /dev/i2c-N dans les tests: meme interface que
+BusI2CLinux, avec des adresses presentes choisies a l'avance.
+
+Usage: python3 i2c_scan.py [--bus 1] [adresse ...]
+"""
+
+import argparse
+import ctypes
+import errno
+import os
+import sys
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Adresses du materiel du cours
+ADRESSE_AHT20 = 0x38
+ADRESSE_NEOSLIDER = 0x30
+ADRESSES_COURS = (ADRESSE_AHT20, ADRESSE_NEOSLIDER)
+
+NOMS_PERIPHERIQUES = {
+    ADRESSE_AHT20: "AHT20",
+    ADRESSE_NEOSLIDER: "NeoSlider",
+}
+
+# ioctl de i2c-dev (linux/i2c-dev.h)
+I2C_SLAVE = 0x0703
+I2C_FUNCS = 0x0705
+I2C_SMBUS = 0x0720
+
+# Fonctionnalites de l'adaptateur (linux/i2c.h)
+I2C_FUNC_SMBUS_QUICK = 0x00010000
+I2C_FUNC_SMBUS_READ_BYTE = 0x00020000
+
+# Transactions SMBus (linux/i2c.h)
+I2C_SMBUS_WRITE = 0
+I2C_SMBUS_READ = 1
+I2C_SMBUS_QUICK = 0
+I2C_SMBUS_BYTE = 1
+
+# Etats d'une adresse sondee
+PRESENT = "present"
+ABSENT = "absent"
+OCCUPE = "occupe"   # reservee par un pilote du noyau ("UU" dans i2cdetect)
+
+ECRITURE_RAPIDE = "quick"
+LECTURE_OCTET = "read_byte"
+
+# Erreurs renvoyees quand aucun peripherique ne repond (NACK)
+ERREURS_ABSENT = {errno.ENXIO, errno.EREMOTEIO, errno.EIO, errno.ETIMEDOUT}
+
+
+def methode_sondage(adresse):
+    """
+    Choisit la methode de sondage d'une adresse, comme i2cdetect.
+
+    Args:
+        adresse: Adresse 7 bits
+
+    Returns:
+        str: LECTURE_OCTET ou ECRITURE_RAPIDE
+    """
+    if 0x30 <= adresse <= 0x37 or 0x50 <= adresse <= 0x5F:
+        return LECTURE_OCTET
+    return ECRITURE_RAPIDE
+
+
+# ---------------------------------------------------------------------------
+# Backend Linux: /dev/i2c-N
+# ---------------------------------------------------------------------------
+class _DonneesSMBus(ctypes.Union):
+    """union i2c_smbus_data"""
+    _fields_ = [
+        ("byte", ctypes.c_uint8),
+        ("word", ctypes.c_uint16),
+        ("block", ctypes.c_uint8 * 34),
+    ]
+
+
+class _IoctlSMBus(ctypes.Structure):
+    """struct i2c_smbus_ioctl_data"""
+    _fields_ = [
+        ("read_write", ctypes.c_uint8),
+        ("command", ctypes.c_uint8),
+        ("size", ctypes.c_uint32),
+        ("data", ctypes.POINTER(_DonneesSMBus)),
+    ]
+
+
+class BusI2CLinux:
+    """
+    Acces a un bus I2C par le peripherique /dev/i2c-N du noyau.
+
+    L'utilisateur doit faire partie du groupe i2c (c'est le cas par
+    defaut sur Raspberry Pi OS): aucun sudo n'est necessaire.
+    """
+
+    def __init__(self, numero=1):
+        if fcntl is None:
+            raise OSError(errno.ENOSYS, "ioctl non disponible sur cette plateforme")
+        self.chemin = f"/dev/i2c-{numero}"
+        self.fd = os.open(self.chemin, os.O_RDWR)
+        self._donnees = _DonneesSMBus()
+
+    def fonctionnalites(self):
+        """Masque I2C_FUNC_* de l'adaptateur."""
+        masque = ctypes.c_ulong()
+        fcntl.ioctl(self.fd, I2C_FUNCS, masque)
+        return masque.value
+
+    def _smbus(self, lecture, taille):
+        requete = _IoctlSMBus(
+            read_write=I2C_SMBUS_READ if lecture else I2C_SMBUS_WRITE,
+            command=0,
+            size=taille,
+            data=ctypes.pointer(self._donnees) if lecture else None,
+        )
+        fcntl.ioctl(self.fd, I2C_SMBUS, requete)
+
+    def sonder(self, adresse, methode):
+        """
+        Sonde une adresse.
+
+        Args:
+            adresse: Adresse 7 bits
+            methode: ECRITURE_RAPIDE ou LECTURE_OCTET
+
+        Returns:
+            str: PRESENT, ABSENT ou OCCUPE
+        """
+        try:
+            fcntl.ioctl(self.fd, I2C_SLAVE, adresse)
+        except OSError as e:
+            if e.errno == errno.EBUSY:
+                return OCCUPE
+            raise
+
+        try:
+            if methode == LECTURE_OCTET:
+                self._smbus(lecture=True, taille=I2C_SMBUS_BYTE)
+            else:
+                self._smbus(lecture=False, taille=I2C_SMBUS_QUICK)
+        except OSError as e:
+            if e.errno in ERREURS_ABSENT:
+                return ABSENT
+            raise
+        return PRESENT
+
+    def fermer(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+# ---------------------------------------------------------------------------
+# Backend simule pour les tests
+# ---------------------------------------------------------------------------
+class BusI2CSimule:
+    """
+    Faux /dev/i2c-N: memes methodes que BusI2CLinux.
+
+    Args:
+        presentes: Adresses qui repondent
+        occupees: Adresses reservees par un pilote du noyau
+        fonctionnalites: Masque I2C_FUNC_* annonce par l'adaptateur
+        erreur: Exception levee a l'ouverture (ex. FileNotFoundError si
+            I2C est desactive, PermissionError hors du groupe i2c)
+    """
+
+    def __init__(self, presentes=(), occupees=(), numero=1,
+                 fonctionnalites=I2C_FUNC_SMBUS_QUICK | I2C_FUNC_SMBUS_READ_BYTE,
+                 erreur=None):
+        self.chemin = f"/dev/i2c-{numero}"
+        if erreur is not None:
+            raise erreur
+        self.presentes = set(presentes)
+        self.occupees = set(occupees)
+        self._fonctionnalites = fonctionnalites
+        self.sondages = []
+
+    def fonctionnalites(self):
+        return self._fonctionnalites
+
+    def sonder(self, adresse, methode):
+        self.sondages.append((adresse, methode))
+        if adresse in self.occupees:
+            return OCCUPE
+        return PRESENT if adresse in self.presentes else ABSENT
+
+    def fermer(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+# ---------------------------------------------------------------------------
+# Scan
+# ---------------------------------------------------------------------------
+def sonder_adresses(adresses=ADRESSES_COURS, numero=1, bus=None):
+    """
+    Sonde chaque adresse et retourne son etat.
+
+    Args:
+        adresses: Adresses 7 bits a sonder
+        numero: Numero du bus (/dev/i2c-N), si bus n'est pas fourni
+        bus: Backend deja ouvert (BusI2CLinux ou BusI2CSimule)
+
+    Returns:
+        dict: {adresse: PRESENT, ABSENT ou OCCUPE}
+
+    Raises:
+        FileNotFoundError: /dev/i2c-N absent (I2C desactive)
+        PermissionError: Utilisateur hors du groupe i2c
+    """
+    if bus is None:
+        with BusI2CLinux(numero) as bus_linux:
+            return sonder_adresses(adresses, bus=bus_linux)
+
+    fonctions = bus.fonctionnalites()
+    etats = {}
+    for adresse in adresses:
+        methode = methode_sondage(adresse)
+        # Repli si l'adaptateur ne supporte pas la methode preferee
+        if methode == ECRITURE_RAPIDE and not fonctions & I2C_FUNC_SMBUS_QUICK:
+            methode = LECTURE_OCTET
+        elif methode == LECTURE_OCTET and not fonctions & I2C_FUNC_SMBUS_READ_BYTE:
+            methode = ECRITURE_RAPIDE
+        etats[adresse] = bus.sonder(adresse, methode)
+    return etats
+
+
+def scanner(adresses=ADRESSES_COURS, numero=1, bus=None):
+    """
+    Retourne l'ensemble des adresses qui repondent sur le bus.
+
+    Une adresse reservee par un pilote du noyau compte comme presente.
+
+    Args:
+        adresses: Adresses 7 bits a sonder
+        numero: Numero du bus (/dev/i2c-N), si bus n'est pas fourni
+        bus: Backend deja ouvert (BusI2CLinux ou BusI2CSimule)
+
+    Returns:
+        set: Adresses detectees
+    """
+    etats = sonder_adresses(adresses, numero, bus)
+    return {adresse for adresse, etat in etats.items() if etat != ABSENT}
+
+
+def formater_adresses(adresses):
+    """Formate un ensemble d'adresses: "0x30, 0x38" (ou "aucune")."""
+    if not adresses:
+        return "aucune"
+    return ", ".join(f"0x{adresse:02x}" for adresse in sorted(adresses))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan I2C natif (sans sudo ni i2cdetect)")
+    parser.add_argument("adresses", nargs="*", type=lambda a: int(a, 16),
+                        help="Adresses a sonder en hexadecimal (defaut: 38 30)")
+    parser.add_argument("--bus", type=int, default=1, help="Numero du bus I2C (defaut: 1)")
+    args = parser.parse_args()
+
+    try:
+        etats = sonder_adresses(args.adresses or ADRESSES_COURS, args.bus)
+    except FileNotFoundError:
+        print(f"/dev/i2c-{args.bus} introuvable - activez I2C: sudo raspi-config")
+        return 1
+    except PermissionError:
+        print(f"Acces refuse a /dev/i2c-{args.bus} - ajoutez-vous au groupe i2c:")
+        print("   sudo usermod -aG i2c $USER   (puis reconnectez-vous)")
+        return 1
+
+    for adresse, etat in etats.items():
+        nom = NOMS_PERIPHERIQUES.get(adresse, "")
+        print(f"0x{adresse:02x}  {etat:8}  {nom}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Publication de la derniere mesure AHT20 en memoire partagee
+
+Tableaux de bord, journaux et controleur de DEL veulent tous la
+temperature et l'humidite courantes. Si chacun ouvre board.I2C() et son
+propre pilote, ils se disputent le bus.
+
+Le processus qui lit le capteur (acquisition.py, serveur_capteur.py)
+publie chaque mesure dans un segment multiprocessing.shared_memory
+protege par un seqlock. Les lecteurs, en nombre quelconque, lisent sans
+verrou et sans aucun trafic I2C.
+
+Disposition du segment (petit-boutiste, 60 octets):
+    0   "<4sII4x" magie b"AH20", version, PID de l'ecrivain
+    16  "<Q"      sequence: impaire pendant une ecriture
+    24  "<Qddd"   numero de mesure, horodatage, temperature, humidite
+    56  "<I"      CRC32 de la mesure
+
+Seqlock: l'ecrivain (unique) rend la sequence impaire, ecrit la mesure
+et son CRC32, puis rend la sequence paire. Le lecteur relit la sequence
+apres la mesure et recommence si elle a change, si elle etait impaire
+ou si le CRC32 ne correspond pas. Python n'emet aucune barriere
+memoire: sur ARM, un autre coeur peut voir ces ecritures dans le
+desordre et le seqlock seul ne suffit pas. Le CRC32 rattrape ces cas;
+une mesure a moitie ecrite n'est alors rendue que si son CRC32 tombe
+juste par hasard (1 chance sur 2**32).
+
+Un seul ecrivain par segment: avant de creer ou d'ouvrir le segment, il
+prend un verrou flock sur /dev/shm/<nom>.verrou et le garde tant qu'il
+est ouvert. Un second ecrivain refuse de demarrer sans toucher au
+segment. Le segment laisse par un ecrivain mort (verrou libere par le
+noyau) est repris tel quel, pour les lecteurs deja attaches; le nouvel
+ecrivain en devient proprietaire et le supprime a sa fermeture.
+
+Usage: python3 memoire_partagee.py [--nom aht20] [--suivre]
+"""
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import aht20
+
+
+NOM_DEFAUT = "aht20"
+
+MAGIE = b"AH20"
+VERSION = 2
+
+ENTETE = struct.Struct("<4sII4x")
+SEQUENCE = struct.Struct("<Q")
+MESURE = struct.Struct("<Qddd")
+CONTROLE = struct.Struct("<I")
+
+POSITION_SEQUENCE = ENTETE.size
+POSITION_MESURE = POSITION_SEQUENCE + SEQUENCE.size
+POSITION_CONTROLE = POSITION_MESURE + MESURE.size
+TAILLE = POSITION_CONTROLE + CONTROLE.size
+
+# Duree maximale des relectures avant d'abandonner (ecrivain bloque)
+DELAI_LECTURE = 0.5
+
+# Dossier des fichiers de verrou des ecrivains (celui des segments sous Linux)
+DOSSIER_VERROUS = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+
+
+def _attacher(nom):
+    """
+    Ouvre un segment existant sans le confier au resource_tracker.
+
+    Avant Python 3.13, le resource_tracker d'un processus qui ne fait
+    qu'ouvrir le segment le detruirait a la fin de ce processus. Seul
+    l'ecrivain le laisse suivre le segment (supprime s'il meurt).
+    """
+    try:
+        return shared_memory.SharedMemory(name=nom, track=False)
+    except TypeError:  # Python < 3.13
+        segment = shared_memory.SharedMemory(name=nom)
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+def _chemin_verrou(nom):
+    return DOSSIER_VERROUS / f"{nom}.verrou"
+
+
+def _verrouiller(nom):
+    """
+    Prend le verrou d'ecrivain de nom, libere par le noyau a la mort du
+    processus.
+
+    Le fichier de verrou peut etre supprime par l'ecrivain precedent
+    pendant qu'on attend son verrou: on recommence tant que le fichier
+    verrouille n'est plus celui du chemin.
+
+    Returns:
+        int: Descripteur du fichier de verrou (None sans fcntl)
+
+    Raises:
+        SegmentOccupe: Un autre ecrivain detient le verrou
+    """
+    if fcntl is None:
+        return None
+    chemin = _chemin_verrou(nom)
+    while True:
+        fd = os.open(chemin, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            try:
+                proprietaire = chemin.read_text().strip() or "?"
+            except OSError:
+                proprietaire = "?"
+            raise SegmentOccupe(f"Segment {nom} deja publie par le processus {proprietaire}")
+        try:
+            if os.stat(chemin).st_ino == os.fstat(fd).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+    os.ftruncate(fd, 0)
+    os.write(fd, f"{os.getpid()}\n".encode())
+    return fd
+
+
+class SegmentOccupe(FileExistsError):
+    """Un autre ecrivain, toujours en vie, publie deja dans ce segment."""
+
+
+class PublicationPartagee:
+    """
+    Ecrivain du segment: un seul par nom.
+
+    Args:
+        nom: Nom du segment (/dev/shm/<nom>)
+
+    Raises:
+        SegmentOccupe: Un autre ecrivain publie deja dans ce segment
+        FileExistsError: Segment existant d'un format trop petit
+    """
+
+    def __init__(self, nom=NOM_DEFAUT):
+        self.nom = nom
+        # Le verrou d'abord: un ecrivain refuse ne cree ni n'ouvre le segment
+        self._verrou = _verrouiller(nom)
+        try:
+            try:
+                self.segment = shared_memory.SharedMemory(name=nom, create=True, size=TAILLE)
+                self.repris = False
+            except FileExistsError:
+                # Segment laisse par un ecrivain arrete brutalement: on le
+                # reprend sans le recreer, les lecteurs attaches le gardent.
+                # Ouvert sans _attacher: le resource_tracker le suit comme
+                # un segment cree ici
+                self.segment = shared_memory.SharedMemory(name=nom)
+                self.repris = True
+                if self.segment.size < TAILLE:
+                    resource_tracker.unregister(self.segment._name, "shared_memory")
+                    self.segment.close()
+                    raise
+        except BaseException:
+            self._liberer_verrou()
+            raise
+
+        self._tampon = self.segment.buf
+        self._sequence = 0
+        self.numero = 0
+        SEQUENCE.pack_into(self._tampon, POSITION_SEQUENCE, 0)
+        self._ecrire_mesure(0, 0.0, 0.0, 0.0)
+        ENTETE.pack_into(self._tampon, 0, MAGIE, VERSION, os.getpid())
+
+    def _ecrire_mesure(self, *mesure):
+        donnees = MESURE.pack(*mesure)
+        self._tampon[POSITION_MESURE:POSITION_CONTROLE] = donnees
+        CONTROLE.pack_into(self._tampon, POSITION_CONTROLE, zlib.crc32(donnees))
+
+    def publier(self, echantillon):
+        """Publie un aht20.Echantillon."""
+        self.numero += 1
+        self._sequence += 1
+        SEQUENCE.pack_into(self._tampon, POSITION_SEQUENCE, self._sequence)
+        self._ecrire_mesure(self.numero, *echantillon)
+        self._sequence += 1
+        SEQUENCE.pack_into(self._tampon, POSITION_SEQUENCE, self._sequence)
+
+    def fermer(self):
+        """Supprime et ferme le segment (cree ou repris), puis libere le verrou."""
+        self._tampon = None
+        try:
+            self.segment.unlink()
+        except FileNotFoundError:
+            pass
+        self.segment.close()
+        self._liberer_verrou()
+
+    def _liberer_verrou(self):
+        if self._verrou is None:
+            return
+        # Supprime tant que le verrou est tenu (voir _verrouiller)
+        try:
+            _chemin_verrou(self.nom).unlink()
+        except FileNotFoundError:
+            pass
+        os.close(self._verrou)
+        self._verrou = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+class LecteurPartage:
+    """
+    Lecteur du segment, sans verrou.
+
+    Args:
+        nom: Nom du segment
+
+    Raises:
+        FileNotFoundError: Aucun ecrivain n'a cree le segment
+    """
+
+    def __init__(self, nom=NOM_DEFAUT):
+        self.segment = _attacher(nom)
+        self._tampon = self.segment.buf
+        magie, version, _ = ENTETE.unpack_from(self._tampon, 0)
+        if magie != MAGIE or version != VERSION:
+            self.fermer()
+            raise ValueError(f"Segment {nom}: format inconnu")
+
+    def lire(self):
+        """
+        La derniere mesure publiee.
+
+        Returns:
+            tuple: (numero, aht20.Echantillon), ou None si rien n'est
+                encore publie
+
+        Raises:
+            aht20.ErreurAHT20: Aucune lecture coherente (ecrivain bloque
+                au milieu d'une ecriture, ou CRC32 toujours faux)
+        """
+        tampon = self._tampon
+        limite = None
+        while True:
+            avant, = SEQUENCE.unpack_from(tampon, POSITION_SEQUENCE)
+            if not avant & 1:
+                donnees = bytes(tampon[POSITION_MESURE:POSITION_CONTROLE])
+                controle, = CONTROLE.unpack_from(tampon, POSITION_CONTROLE)
+                apres, = SEQUENCE.unpack_from(tampon, POSITION_SEQUENCE)
+                if avant == apres and zlib.crc32(donnees) == controle:
+                    numero, horodatage, temperature, humidite = MESURE.unpack(donnees)
+                    if not numero:
+                        return None
+                    return numero, aht20.Echantillon(horodatage, temperature, humidite)
+
+            # Ecriture en cours ou vue incoherente: laisser l'ecrivain
+            # terminer (il peut avoir ete interrompu par l'ordonnanceur au
+            # milieu de son ecriture)
+            if limite is None:
+                limite = time.monotonic() + DELAI_LECTURE
+            elif time.monotonic() > limite:
+                raise aht20.ErreurAHT20("Memoire partagee: aucune lecture coherente")
+            time.sleep(0)
+
+    def fermer(self):
+        self._tampon = None
+        self.segment.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lecture de la mesure AHT20 publiee en memoire partagee")
+    parser.add_argument("--nom", default=NOM_DEFAUT, help=f"Nom du segment (defaut: {NOM_DEFAUT})")
+    parser.add_argument("--suivre", action="store_true", help="Afficher chaque nouvelle mesure")
+    args = parser.parse_args()
+
+    try:
+        lecteur = LecteurPartage(args.nom)
+    except FileNotFoundError:
+        print(f"Segment {args.nom} introuvable - demarrez serveur_capteur.py "
+              f"ou acquisition.py --partage")
+        return 1
+
+    with lecteur:
+        dernier = None
+        try:
+            while True:
+                resultat = lecteur.lire()
+                if resultat is not None and resultat[0] != dernier:
+                    dernier, echantillon = resultat
+                    print(f"#{dernier}  Temperature: {echantillon.temperature:.1f} C  "
+                          f"Humidite: {echantillon.relative_humidity:.1f} %")
+                if not args.suivre:
+                    if resultat is None:
+                        print("Aucune mesure publiee pour l'instant")
+                    break
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
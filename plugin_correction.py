@@ -0,0 +1,120 @@
+"""
+Plugin pytest pour la correction en lot — Formatif F1
+Cours 243-413-SH — Introduction aux objets connectés
+
+Ce plugin est chargé par correction.py (moteur « session »). Il permet
+d'exécuter les tests canoniques (tests/test_milestone_0*.py) une seule
+fois par session pytest, paramétrés sur une liste de dépôts étudiants:
+1. Les tests sont collectés une seule fois
+2. Chaque test est répété pour chaque dépôt (REPO_ROOT est remplacé)
+3. Les résultats sont regroupés par dépôt dans un fichier JSON
+
+Si la variable d'environnement CORRECTION_LANCEMENT contient l'heure de
+lancement (time.time()), le temps de démarrage jusqu'au début de la
+session est ajouté au résumé de chaque dépôt (réparti entre les dépôts).
+
+Usage (normalement lancé par correction.py):
+    python3 -m pytest tests -p plugin_correction \\
+        --depots=depots.json --resultats=resultats.json
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+
+# Longueur maximale conservée pour un message d'échec (comme correction.py)
+LONGUEUR_MESSAGE = 500
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("correction", "Correction en lot du formatif F1")
+    group.addoption("--depots", help="Fichier JSON: liste des chemins de dépôts à corriger")
+    group.addoption("--resultats", help="Fichier JSON où écrire les résultats par dépôt")
+
+
+def pytest_configure(config):
+    chemin = config.getoption("depots")
+    config._depots_correction = json.loads(Path(chemin).read_text()) if chemin else []
+    config._resultats_correction = {
+        depot: {"summary": {"total": 0, "passed": 0, "failed": 0, "skipped": 0, "duration": 0},
+                "tests": []}
+        for depot in config._depots_correction
+    }
+    config._tests_correction = {}
+
+
+def pytest_sessionstart(session):
+    lancement = os.environ.get("CORRECTION_LANCEMENT")
+    depots = session.config._depots_correction
+    if lancement and depots:
+        demarrage = (time.time() - float(lancement)) / len(depots)
+        for resultat in session.config._resultats_correction.values():
+            resultat["summary"]["demarrage"] = demarrage
+
+
+@pytest.fixture(autouse=True)
+def depot_racine(request, monkeypatch):
+    """Pointe REPO_ROOT du module de test vers le dépôt de l'étudiant."""
+    depot = getattr(request, "param", None)
+    if depot is not None:
+        monkeypatch.setattr(request.module, "REPO_ROOT", Path(depot))
+    return depot
+
+
+def pytest_generate_tests(metafunc):
+    depots = metafunc.config._depots_correction
+    if depots and "depot_racine" in metafunc.fixturenames:
+        metafunc.parametrize(
+            "depot_racine", depots, indirect=True,
+            ids=[Path(d).name for d in depots]
+        )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    callspec = getattr(item, "callspec", None)
+    if callspec is None or "depot_racine" not in callspec.params:
+        return
+
+    depot = callspec.params["depot_racine"]
+    tests = item.config._tests_correction
+    test = tests.setdefault(item.nodeid, {
+        "depot": depot,
+        "name": item.originalname,
+        "outcome": "passed",
+        "duration": 0.0,
+        "message": ""
+    })
+
+    test["duration"] += report.duration
+    if report.failed:
+        test["outcome"] = "failed"
+        test["message"] = report.longreprtext.strip()[:LONGUEUR_MESSAGE]
+    elif report.skipped and test["outcome"] == "passed":
+        test["outcome"] = "skipped"
+        if isinstance(report.longrepr, tuple):
+            test["message"] = report.longrepr[2][:LONGUEUR_MESSAGE]
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    chemin = config.getoption("resultats")
+    if not chemin:
+        return
+
+    resultats = config._resultats_correction
+    for test in config._tests_correction.values():
+        resultat = resultats[test.pop("depot")]
+        summary = resultat["summary"]
+        summary["total"] += 1
+        summary[test["outcome"]] += 1
+        summary["duration"] += test["duration"]
+        resultat["tests"].append(test)
+
+    Path(chemin).write_text(json.dumps(resultats, ensure_ascii=False))
@@ -17,6 +17,10 @@ import subprocess
 from pathlib import Path
 from datetime import datetime
 
+import i2c_scan
+from verifications import MoteurVerifications, analyser_script, connexion_github, \
+    formater_durees, trouver_cle_ssh
+
 # Couleurs ANSI pour le terminal
 class Colors:
     GREEN = '\033[92m'
@@ -53,26 +57,15 @@ def check_ssh_key():
 
     ssh_dir = Path.home() / ".ssh"
     # Chercher d'abord la cle specifique au cours IoT
-    pub_keys = [
-        ssh_dir / "id_ed25519_iot.pub",  # Cle recommandee pour le cours
-        ssh_dir / "id_ed25519.pub",
-        ssh_dir / "id_rsa.pub",
-    ]
-
-    key_found = False
-    key_path = None
-
-    for key_path in pub_keys:
-        if key_path.exists():
-            key_found = True
-            print_success(f"Cle SSH publique trouvee: {key_path.name}")
-
-            # Lire le contenu de la cle publique
-            key_content = key_path.read_text().strip()
-            print(f"   {key_content[:40]}...")
-            break
-
-    if not key_found:
+    key_path = trouver_cle_ssh(ssh_dir)
+
+    if key_path is not None:
+        print_success(f"Cle SSH publique trouvee: {key_path.name}")
+
+        # Lire le contenu de la cle publique
+        key_content = key_path.read_text().strip()
+        print(f"   {key_content[:40]}...")
+    else:
         print_error("Aucune cle SSH publique trouvee")
         print("\nPour generer une cle SSH sur le Raspberry Pi:")
         print("   ssh-keygen -t ed25519 -C \"iot-cegep@etu.cegep.qc.ca\" -f ~/.ssh/id_ed25519_iot")
@@ -108,10 +101,7 @@ def check_ssh_key():
     # Tester la connexion GitHub
     print("\nTest de connexion avec GitHub...")
     try:
-        result = subprocess.run(
-            ['ssh', '-T', 'git@github.com'],
-            capture_output=True, text=True, timeout=10
-        )
+        result = connexion_github()
         # GitHub retourne un code non-zero mais avec le message "successfully authenticated"
         if 'successfully authenticated' in result.stderr or result.returncode == 1:
             print_success("Connexion GitHub fonctionnelle!")
@@ -147,33 +137,29 @@ def check_aht20_script():
     """
     print_header("VERIFICATION TEST_AHT20.PY")
 
-    script_path = Path(__file__).parent / "test_aht20.py"
+    required = ['board', 'adafruit_ahtx0']
+    script = analyser_script(Path(__file__).parent / "test_aht20.py", required)
 
-    if not script_path.exists():
+    if not script.existe:
         print_error("Fichier test_aht20.py introuvable")
         return False
 
     print_success("Fichier test_aht20.py trouve")
 
     # Verifier la syntaxe
-    try:
-        with open(script_path) as f:
-            compile(f.read(), script_path, 'exec')
-        print_success("Syntaxe Python valide")
-    except SyntaxError as e:
+    e = script.erreur_syntaxe
+    if e is not None:
         print_error(f"Erreur de syntaxe ligne {e.lineno}: {e.msg}")
         return False
+    print_success("Syntaxe Python valide")
 
     # Verifier les imports
-    content = script_path.read_text()
-    required = ['board', 'adafruit_ahtx0']
-
+    content = script.contenu
     for imp in required:
-        if imp in content:
-            print_success(f"Import trouve: {imp}")
-        else:
+        if imp in script.manquants:
             print_error(f"Import manquant: {imp}")
             return False
+        print_success(f"Import trouve: {imp}")
 
     # Verifier les dependances UV
     if 'dependencies' in content and 'adafruit-circuitpython-ahtx0' in content:
@@ -195,33 +181,28 @@ def check_neoslider_script():
     """
     print_header("VERIFICATION TEST_NEOSLIDER.PY")
 
-    script_path = Path(__file__).parent / "test_neoslider.py"
+    required = ['board', 'adafruit_seesaw']
+    script = analyser_script(Path(__file__).parent / "test_neoslider.py", required)
 
-    if not script_path.exists():
+    if not script.existe:
         print_warning("test_neoslider.py introuvable (optionnel)")
         return True  # Non obligatoire
 
     print_success("Fichier test_neoslider.py trouve")
 
     # Verifier la syntaxe
-    try:
-        with open(script_path) as f:
-            compile(f.read(), script_path, 'exec')
-        print_success("Syntaxe Python valide")
-    except SyntaxError as e:
+    e = script.erreur_syntaxe
+    if e is not None:
         print_error(f"Erreur de syntaxe ligne {e.lineno}: {e.msg}")
         return False
+    print_success("Syntaxe Python valide")
 
     # Verifier les imports
-    content = script_path.read_text()
-    required = ['board', 'adafruit_seesaw']
-
     for imp in required:
-        if imp in content:
-            print_success(f"Import trouve: {imp}")
-        else:
+        if imp in script.manquants:
             print_error(f"Import manquant: {imp}")
             return False
+        print_success(f"Import trouve: {imp}")
 
     # Creer le marqueur
     marker = Path(__file__).parent / ".test_markers" / "neoslider_script_verified.txt"
@@ -231,58 +212,63 @@ def check_neoslider_script():
     return True
 
 
-def run_hardware_tests():
+def run_hardware_tests(bus=None):
     """
     Tente d'executer les tests materiels (si sur Raspberry Pi).
+
+    Args:
+        bus: Backend I2C deja ouvert (ex. i2c_scan.BusI2CSimule); la
+            detection du Raspberry Pi est alors sautee
     """
     print_header("TESTS MATERIEL (Raspberry Pi)")
 
-    # Verifier si on est sur un Raspberry Pi
-    try:
-        with open('/proc/cpuinfo', 'r') as f:
-            cpuinfo = f.read()
-            is_rpi = 'Raspberry Pi' in cpuinfo or 'Broadcom' in cpuinfo
-    except:
-        is_rpi = False
-
-    if not is_rpi:
-        print_warning("Pas sur Raspberry Pi - tests materiels skipes")
-        print("   Executez ce script sur le Raspberry Pi pour les tests materiels")
-        return True
+    if bus is None:
+        # Verifier si on est sur un Raspberry Pi
+        try:
+            with open('/proc/cpuinfo', 'r') as f:
+                cpuinfo = f.read()
+                is_rpi = 'Raspberry Pi' in cpuinfo or 'Broadcom' in cpuinfo
+        except:
+            is_rpi = False
 
-    print_success("Raspberry Pi detecte")
+        if not is_rpi:
+            print_warning("Pas sur Raspberry Pi - tests materiels skipes")
+            print("   Executez ce script sur le Raspberry Pi pour les tests materiels")
+            return True
 
-    # Verifier i2cdetect
+        print_success("Raspberry Pi detecte")
+
+    # Scanner le bus I2C directement (/dev/i2c-1, sans sudo)
     try:
-        result = subprocess.run(
-            ['sudo', 'i2cdetect', '-y', '1'],
-            capture_output=True, text=True, timeout=10
-        )
-        if result.returncode == 0:
-            output = result.stdout
-            if '38' in output:
-                print_success("AHT20 detecte a l'adresse 0x38")
-            else:
-                print_warning("AHT20 non detecte a 0x38 - verifiez le cablage STEMMA QT")
-
-            if '30' in output:
-                print_success("NeoSlider detecte a l'adresse 0x30")
-            else:
-                print_warning("NeoSlider non detecte a 0x30 (optionnel)")
-
-            # Creer le marqueur materiel
-            marker = Path(__file__).parent / ".test_markers" / "hardware_detected.txt"
-            marker.write_text(f"Hardware scan: {datetime.now().isoformat()}\n{output}\n")
-            print_success(f"Marqueur materiel cree: {marker}")
-        else:
-            print_error("i2cdetect a echoue")
-            return False
+        detectees = i2c_scan.scanner(i2c_scan.ADRESSES_COURS, numero=1, bus=bus)
     except FileNotFoundError:
-        print_warning("i2cdetect non trouve - installez: sudo apt install i2c-tools")
-    except subprocess.TimeoutExpired:
-        print_warning("i2cdetect timeout - verifiez I2C")
-    except Exception as e:
-        print_warning(f"Erreur i2cdetect: {e}")
+        print_error("/dev/i2c-1 introuvable - activez I2C: sudo raspi-config")
+        return False
+    except PermissionError:
+        print_error("Acces refuse a /dev/i2c-1 - ajoutez-vous au groupe i2c:")
+        print("   sudo usermod -aG i2c $USER   (puis reconnectez-vous)")
+        return False
+    except OSError as e:
+        print_warning(f"Erreur de scan I2C: {e}")
+        return True
+
+    if i2c_scan.ADRESSE_AHT20 in detectees:
+        print_success("AHT20 detecte a l'adresse 0x38")
+    else:
+        print_warning("AHT20 non detecte a 0x38 - verifiez le cablage STEMMA QT")
+
+    if i2c_scan.ADRESSE_NEOSLIDER in detectees:
+        print_success("NeoSlider detecte a l'adresse 0x30")
+    else:
+        print_warning("NeoSlider non detecte a 0x30 (optionnel)")
+
+    # Creer le marqueur materiel
+    marker = Path(__file__).parent / ".test_markers" / "hardware_detected.txt"
+    marker.write_text(
+        f"Hardware scan: {datetime.now().isoformat()}\n"
+        f"Adresses detectees: {i2c_scan.formater_adresses(detectees)}\n"
+    )
+    print_success(f"Marqueur materiel cree: {marker}")
 
     return True
 
@@ -344,6 +330,7 @@ Markers:
 
     summary_file.write_text(summary)
     print_success(f"Resume des tests cree: {summary_file}")
+    return True
 
 
 def main():
@@ -353,19 +340,30 @@ def main():
     print(f"\n{Colors.BOLD}Formatif F1 - Test Runner Local{Colors.END}")
     print(f"{Colors.BOLD}{'='*60}{Colors.END}\n")
 
-    results = {
-        "SSH": check_ssh_key(),
-        "AHT20": check_aht20_script(),
-        "NeoSlider": check_neoslider_script(),
-        "Hardware": run_hardware_tests(),
-    }
+    # Les verifications s'executent en parallele: le dossier des
+    # marqueurs doit exister avant la premiere
+    (Path(__file__).parent / ".test_markers").mkdir(exist_ok=True)
+
+    moteur = MoteurVerifications()
+    moteur.ajouter("SSH", check_ssh_key)
+    moteur.ajouter("AHT20", check_aht20_script)
+    moteur.ajouter("NeoSlider", check_neoslider_script)
+    moteur.ajouter("Hardware", run_hardware_tests)
+    # Le resume lit les marqueurs crees par toutes les autres verifications
+    moteur.ajouter("Resume", create_test_summary,
+                   apres=("SSH", "AHT20", "NeoSlider", "Hardware"))
+    resultats = moteur.executer()
 
-    # Creer le resume
-    create_test_summary()
+    results = {nom: resultats[nom].reussi for nom in ("SSH", "AHT20", "NeoSlider", "Hardware")}
 
     # Afficher le resultat final
     print_header("RESULTAT FINAL")
 
+    print("Durees des verifications:")
+    for ligne in formater_durees(resultats):
+        print(ligne)
+    print()
+
     all_passed = all(results.values())
 
     for test, passed in results.items():
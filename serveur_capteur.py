@@ -0,0 +1,376 @@
+# /// script
+# requires-python = ">=3.9"
+# dependencies = ["adafruit-blinka"]
+# ///
+"""
+Serveur local du capteur AHT20 (socket Unix)
+
+Un script lance pour une seule lecture paie le demarrage de
+l'interpreteur, import board (detection de plateforme de Blinka),
+board.I2C() et l'initialisation du capteur: des centaines de
+millisecondes, voire des secondes, sur un Pi.
+
+Le serveur est un processus persistant qui possede le bus: il lit le
+capteur en continu (voir acquisition.py) et repond sur un socket Unix
+avec la derniere mesure, ou une mesure fraiche si la derniere est trop
+ancienne. Un client n'importe ni board ni Blinka: une lecture depuis un
+nouveau processus coute quelques millisecondes.
+
+Les mesures de fond sont aussi publiees en memoire partagee (voir
+memoire_partagee.py) pour les lecteurs qui n'ont pas besoin du socket.
+
+Protocole (petit-boutiste, une requete -> une reponse, connexion
+reutilisable):
+    requete  "<2sBxI"     magie b"AH", version, age maximal accepte (ms;
+                          0 = toujours une mesure fraiche)
+    reponse  "<2sBxIddd"  magie, statut, numero de mesure,
+                          horodatage, temperature, humidite
+
+Client:
+    from serveur_capteur import lire
+    echantillon = lire(age_max=2.0)
+    print(echantillon.temperature, echantillon.relative_humidity)
+
+Usage:
+    python3 serveur_capteur.py [--periode 1] [--socket CHEMIN] [--partage NOM] [--simulation]
+    python3 serveur_capteur.py --client [--age-max 1]
+"""
+
+import argparse
+import errno
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+import aht20
+
+
+MAGIE = b"AH"
+VERSION = 1
+
+REQUETE = struct.Struct("<2sBxI")
+REPONSE = struct.Struct("<2sBxIddd")
+
+# Statuts de reponse
+OK = 0
+AUCUNE_MESURE = 1
+ERREUR_CAPTEUR = 2
+REQUETE_INVALIDE = 3
+
+MESSAGES = {
+    AUCUNE_MESURE: "Aucune mesure disponible",
+    ERREUR_CAPTEUR: "Erreur de lecture du capteur",
+    REQUETE_INVALIDE: "Requete invalide",
+}
+
+DELAI_CLIENT = 2.0
+
+# Segment de memoire partagee (memoire_partagee.NOM_DEFAUT)
+NOM_PARTAGE = "aht20"
+
+
+def chemin_socket_defaut():
+    """Socket du serveur: $AHT20_SOCKET, sinon dans $XDG_RUNTIME_DIR ou /tmp."""
+    if os.environ.get("AHT20_SOCKET"):
+        return Path(os.environ["AHT20_SOCKET"])
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "aht20.sock"
+    return Path(f"/tmp/aht20-{os.getuid()}.sock")
+
+
+def serveur_actif(chemin):
+    """Vrai si un serveur accepte les connexions sur le socket."""
+    sonde = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sonde.connect(str(chemin))
+        return True
+    except OSError:
+        return False
+    finally:
+        sonde.close()
+
+
+def _recevoir(connexion, taille):
+    donnees = bytearray()
+    while len(donnees) < taille:
+        morceau = connexion.recv(taille - len(donnees))
+        if not morceau:
+            return None
+        donnees += morceau
+    return bytes(donnees)
+
+
+# ---------------------------------------------------------------------------
+# Serveur
+# ---------------------------------------------------------------------------
+class CapteurPartage:
+    """
+    Acces au capteur partage entre le fil d'acquisition et les clients.
+
+    Serialise les lectures (CapteurAHT20 n'est pas reentrant) et garde la
+    derniere mesure avec son numero.
+    """
+
+    def __init__(self, capteur):
+        self.capteur = capteur
+        self.verrou = threading.Lock()
+        self.dernier = None
+        self.numero = 0
+
+    def lire(self):
+        with self.verrou:
+            echantillon = self.capteur.lire()
+            self.numero += 1
+            # Affectation unique: les clients voient un couple coherent
+            self.dernier = (self.numero, echantillon)
+        return echantillon
+
+    def mesure(self, age_max):
+        """
+        La derniere mesure si elle a moins de age_max secondes, sinon une
+        mesure fraiche.
+
+        Returns:
+            tuple: (numero, Echantillon)
+        """
+        dernier = self.dernier
+        if dernier is None or time.time() - dernier[1].horodatage > age_max:
+            self.lire()
+            dernier = self.dernier
+        return dernier
+
+
+class GestionnaireRequetes(socketserver.BaseRequestHandler):
+    """Repond aux requetes d'un client jusqu'a ce qu'il ferme la connexion."""
+
+    def handle(self):
+        capteur = self.server.capteur
+        while True:
+            requete = _recevoir(self.request, REQUETE.size)
+            if requete is None:
+                return
+            magie, version, age_max_ms = REQUETE.unpack(requete)
+            if magie != MAGIE or version != VERSION:
+                self.request.sendall(REPONSE.pack(MAGIE, REQUETE_INVALIDE, 0, 0.0, 0.0, 0.0))
+                return
+
+            try:
+                numero, echantillon = capteur.mesure(age_max_ms / 1000)
+            except (aht20.ErreurAHT20, OSError):
+                reponse = REPONSE.pack(MAGIE, ERREUR_CAPTEUR, 0, 0.0, 0.0, 0.0)
+            else:
+                reponse = REPONSE.pack(MAGIE, OK, numero & 0xFFFFFFFF, *echantillon)
+            self.request.sendall(reponse)
+
+
+class ServeurCapteur(socketserver.ThreadingUnixStreamServer):
+    """
+    Serveur socket Unix, un fil par client.
+
+    Raises:
+        OSError: (EADDRINUSE) Un autre serveur repond deja sur le socket
+    """
+
+    daemon_threads = True
+
+    def __init__(self, chemin, capteur):
+        self.capteur = capteur
+        chemin = Path(chemin)
+        if chemin.is_socket():
+            if serveur_actif(chemin):
+                raise OSError(errno.EADDRINUSE, f"Un serveur repond deja sur {chemin}")
+            chemin.unlink()  # Socket laisse par un serveur arrete brutalement
+        super().__init__(str(chemin), GestionnaireRequetes)
+        self.chemin = chemin
+        informations = chemin.stat()
+        self._inode = (informations.st_dev, informations.st_ino)
+
+    def server_close(self):
+        super().server_close()
+        # Ne supprimer que notre socket: un serveur lance depuis a pu le
+        # remplacer par le sien
+        try:
+            informations = self.chemin.stat()
+            if (informations.st_dev, informations.st_ino) == self._inode:
+                self.chemin.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def servir(chemin, periode=1.0, simulation=False, partage=NOM_PARTAGE):
+    """
+    Lance le serveur: acquisition continue et socket Unix.
+
+    Args:
+        chemin: Chemin du socket
+        periode: Intervalle entre deux mesures de fond (secondes)
+        simulation: Utiliser le bus I2C simule de tests/simulation
+        partage: Nom du segment de memoire partagee (None: pas de publication)
+    """
+    from acquisition import Acquisition, TamponCirculaire
+    from memoire_partagee import PublicationPartagee
+
+    if simulation:
+        sys.path.insert(0, str(aht20.FAKES_SIMULATION))
+    import board
+
+    capteur = CapteurPartage(aht20.CapteurAHT20(board.I2C()))
+
+    # Le socket d'abord: un second serveur s'arrete ici, avant de
+    # toucher a la memoire partagee du premier
+    with ServeurCapteur(chemin, capteur) as serveur:
+        publication = PublicationPartagee(partage) if partage else None
+        acquisition = Acquisition(capteur, TamponCirculaire(3600), periode, publication)
+        acquisition.demarrer()
+
+        # systemctl stop, kill: meme arret propre que Ctrl+C. shutdown()
+        # attend la fin de serve_forever(), qui tourne dans ce fil: on
+        # l'appelle depuis un autre fil.
+        def arreter(signum, frame):
+            threading.Thread(target=serveur.shutdown, daemon=True).start()
+        ancien = signal.signal(signal.SIGTERM, arreter)
+
+        print(f"Serveur AHT20 pret: {chemin} (mesure toutes les {periode:g} s)", flush=True)
+        try:
+            serveur.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, ancien)
+            acquisition.arreter()
+            if publication is not None:
+                publication.fermer()
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+class ClientCapteur:
+    """
+    Connexion au serveur, reutilisable pour plusieurs lectures.
+
+    Args:
+        chemin: Chemin du socket (defaut: chemin_socket_defaut())
+        delai: Delai maximal d'une reponse (secondes)
+
+    Raises:
+        FileNotFoundError, ConnectionRefusedError: Serveur non demarre
+    """
+
+    def __init__(self, chemin=None, delai=DELAI_CLIENT):
+        self.connexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connexion.settimeout(delai)
+        try:
+            self.connexion.connect(str(chemin or chemin_socket_defaut()))
+        except OSError:
+            self.connexion.close()
+            raise
+        self.numero = None
+
+    def lire(self, age_max=1.0):
+        """
+        Demande une mesure.
+
+        Args:
+            age_max: Age maximal accepte de la mesure (secondes); 0 pour
+                forcer une mesure fraiche
+
+        Returns:
+            aht20.Echantillon: Horodatage, temperature et humidite
+
+        Raises:
+            aht20.ErreurAHT20: Le serveur n'a pas pu lire le capteur
+        """
+        age_max_ms = max(0, min(int(age_max * 1000), 0xFFFFFFFF))
+        self.connexion.sendall(REQUETE.pack(MAGIE, VERSION, age_max_ms))
+        reponse = _recevoir(self.connexion, REPONSE.size)
+        if reponse is None:
+            raise ConnectionError("Connexion fermee par le serveur")
+
+        magie, statut, numero, horodatage, temperature, humidite = REPONSE.unpack(reponse)
+        if magie != MAGIE:
+            raise ConnectionError("Reponse invalide")
+        if statut != OK:
+            raise aht20.ErreurAHT20(MESSAGES.get(statut, f"Statut {statut}"))
+        self.numero = numero
+        return aht20.Echantillon(horodatage, temperature, humidite)
+
+    def fermer(self):
+        self.connexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+def lire(age_max=1.0, chemin=None):
+    """
+    Une mesure du serveur, en une connexion.
+
+    Args:
+        age_max: Age maximal accepte de la mesure (secondes)
+        chemin: Chemin du socket (defaut: chemin_socket_defaut())
+
+    Returns:
+        aht20.Echantillon: Horodatage, temperature et humidite
+    """
+    with ClientCapteur(chemin) as client:
+        return client.lire(age_max)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur local du capteur AHT20")
+    parser.add_argument("--socket", type=Path, default=None,
+                        help="Chemin du socket Unix (defaut: $AHT20_SOCKET, "
+                             "$XDG_RUNTIME_DIR/aht20.sock ou /tmp)")
+    parser.add_argument("--periode", type=float, default=1.0,
+                        help="Intervalle entre deux mesures de fond (defaut: 1 s)")
+    parser.add_argument("--simulation", action="store_true",
+                        help="Utiliser le bus I2C simule de tests/simulation")
+    parser.add_argument("--partage", default=NOM_PARTAGE, metavar="NOM",
+                        help=f"Segment de memoire partagee (defaut: {NOM_PARTAGE}; '' pour aucun)")
+    parser.add_argument("--client", action="store_true",
+                        help="Lire une mesure aupres du serveur et l'afficher")
+    parser.add_argument("--age-max", type=float, default=1.0,
+                        help="Client: age maximal de la mesure (defaut: 1 s)")
+    args = parser.parse_args()
+    chemin = args.socket or chemin_socket_defaut()
+
+    if args.client:
+        try:
+            echantillon = lire(args.age_max, chemin)
+        except (FileNotFoundError, ConnectionRefusedError):
+            print(f"Serveur non demarre ({chemin}): python3 serveur_capteur.py")
+            return 1
+        except aht20.ErreurAHT20 as e:
+            print(f"Erreur: {e}")
+            return 1
+        print(f"Temperature: {echantillon.temperature:.1f} C")
+        print(f"Humidite: {echantillon.relative_humidity:.1f} %")
+        return 0
+
+    from memoire_partagee import SegmentOccupe
+
+    try:
+        servir(chemin, args.periode, args.simulation, args.partage)
+    except SegmentOccupe as e:
+        print(f"Erreur: {e}")
+        return 1
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+        print(f"Erreur: {e.strerror} - arretez-le avant d'en lancer un autre")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
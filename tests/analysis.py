@@ -0,0 +1,250 @@
+"""
+Static analysis of student scripts, shared by all milestone tests
+==================================================================
+
+Each student file is read and parsed once per pytest session into a
+ScriptFacts object. The milestone tests query these facts instead of
+re-reading the file and re-scanning it for every test.
+
+When a file does not parse (SyntaxError), the facts are extracted with
+text patterns instead, so that a script with a syntax error keeps the
+same partial credit as before (only the syntax test fails).
+"""
+
+import ast
+import io
+import re
+import tokenize
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+# ---------------------------------------------------------------------------
+# Text patterns (fallback when the script does not parse)
+# ---------------------------------------------------------------------------
+IMPORT_PATTERN = re.compile(r"^\s*(?:import|from)\s+([\w.]+)", re.MULTILINE)
+CALL_PATTERN = re.compile(r"([A-Za-z_][\w.]*)\s*\(")
+ATTRIBUTE_PATTERN = re.compile(r"\.\s*([A-Za-z_]\w*)")
+FUNCTION_PATTERN = re.compile(r"^\s*def\s+([A-Za-z_]\w*)\s*\(", re.MULTILINE)
+
+
+@dataclass
+class ScriptFacts:
+    """Facts extracted from one student script."""
+
+    path: Path
+    exists: bool = False
+    source: str = ""
+    syntax_error: Optional[SyntaxError] = None
+    # Top-level module names (import board, from adafruit_seesaw import ...)
+    imports: set = field(default_factory=set)
+    # Dotted names of every call (board.I2C, adafruit_ahtx0.AHTx0, print)
+    calls: set = field(default_factory=set)
+    # Dotted names of calls made inside a try block that has an except
+    guarded_calls: set = field(default_factory=set)
+    # Attribute names read or written (temperature, relative_humidity, SCL)
+    attributes: set = field(default_factory=set)
+    functions: set = field(default_factory=set)
+    has_main_guard: bool = False
+    try_except_blocks: int = 0
+    docstrings: int = 0
+    comments: int = 0
+
+    @property
+    def parsed(self):
+        """True if the facts come from the AST (no syntax error)."""
+        return self.exists and self.syntax_error is None
+
+    @property
+    def source_lower(self):
+        return self.source.lower()
+
+    def contains(self, *snippets):
+        """True if any snippet appears in the source text."""
+        return any(snippet in self.source for snippet in snippets)
+
+    def mentions(self, *words):
+        """True if every word appears in the source (case-insensitive)."""
+        text = self.source_lower
+        return all(word.lower() in text for word in words)
+
+    def calls_any(self, *names):
+        """True if any call matches one of the names (board.I2C, AHTx0, ...)."""
+        return any(
+            call == name or call.endswith("." + name)
+            for call in self.calls for name in names
+        )
+
+    def imports_any(self, *modules):
+        return any(module in self.imports for module in modules)
+
+
+# ---------------------------------------------------------------------------
+# AST extraction (single pass)
+# ---------------------------------------------------------------------------
+def dotted_name(node):
+    """Return 'a.b.c' for Name/Attribute chains, or None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+    return None
+
+
+def is_main_guard(node):
+    """True for: if __name__ == "__main__": (either operand order)."""
+    test = node.test
+    if not (isinstance(test, ast.Compare) and len(test.ops) == 1
+            and isinstance(test.ops[0], ast.Eq)):
+        return False
+    operands = [test.left, test.comparators[0]]
+    names = [o.id for o in operands if isinstance(o, ast.Name)]
+    constants = [o.value for o in operands if isinstance(o, ast.Constant)]
+    return names == ["__name__"] and constants == ["__main__"]
+
+
+class FactsVisitor(ast.NodeVisitor):
+    """Collect all facts in one walk over the module tree."""
+
+    def __init__(self, facts):
+        self.facts = facts
+        self.try_depth = 0
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.facts.imports.add(alias.name.split(".")[0])
+
+    def visit_ImportFrom(self, node):
+        if node.module and node.level == 0:
+            self.facts.imports.add(node.module.split(".")[0])
+
+    def visit_Call(self, node):
+        name = dotted_name(node.func)
+        if name:
+            self.facts.calls.add(name)
+            if self.try_depth:
+                self.facts.guarded_calls.add(name)
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node):
+        self.facts.attributes.add(node.attr)
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node):
+        self.facts.functions.add(node.name)
+        if ast.get_docstring(node) is not None:
+            self.facts.docstrings += 1
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        if ast.get_docstring(node) is not None:
+            self.facts.docstrings += 1
+        self.generic_visit(node)
+
+    def visit_If(self, node):
+        if is_main_guard(node):
+            self.facts.has_main_guard = True
+        self.generic_visit(node)
+
+    def visit_Try(self, node):
+        if not node.handlers:
+            self.generic_visit(node)
+            return
+        self.facts.try_except_blocks += 1
+        self.try_depth += 1
+        for statement in node.body:
+            self.visit(statement)
+        self.try_depth -= 1
+        for child in node.handlers + node.orelse + node.finalbody:
+            self.visit(child)
+
+    visit_TryStar = visit_Try
+
+
+def count_comments(source):
+    """Count comment tokens (the '#' inside strings are not comments)."""
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+        return sum(1 for token in tokens if token.type == tokenize.COMMENT)
+    except (tokenize.TokenError, SyntaxError):
+        return source.count("#")
+
+
+def extract_from_text(facts):
+    """Fallback extraction with text patterns (script does not parse)."""
+    source = facts.source
+    facts.imports = {m.split(".")[0] for m in IMPORT_PATTERN.findall(source)}
+    facts.calls = set(CALL_PATTERN.findall(source))
+    facts.attributes = set(ATTRIBUTE_PATTERN.findall(source))
+    facts.functions = set(FUNCTION_PATTERN.findall(source))
+    facts.has_main_guard = "__name__" in source and "__main__" in source
+    if "try:" in source and "except" in source:
+        facts.try_except_blocks = source.count("try:")
+    facts.docstrings = source.count('"""') // 2 + source.count("'''") // 2
+    facts.comments = source.count("#")
+
+
+def analyze(path):
+    """
+    Read and analyze a student script.
+
+    Returns:
+        ScriptFacts: Facts (exists=False if the file is missing)
+    """
+    facts = ScriptFacts(path=Path(path))
+    if not facts.path.exists():
+        return facts
+
+    facts.exists = True
+    facts.source = facts.path.read_text()
+
+    try:
+        tree = ast.parse(facts.source)
+    except SyntaxError as e:
+        facts.syntax_error = e
+        extract_from_text(facts)
+        return facts
+
+    if ast.get_docstring(tree) is not None:
+        facts.docstrings += 1
+    FactsVisitor(facts).visit(tree)
+    facts.comments = count_comments(facts.source)
+    return facts
+
+
+class FactsCache:
+    """
+    Session-wide cache of ScriptFacts, keyed by path.
+
+    An entry is reused while the file keeps the same modification time
+    and size, so grading many repositories in one pytest session parses
+    each file once.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.parses = 0
+
+    def facts(self, path):
+        path = Path(path)
+        try:
+            stat = path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+
+        key = str(path.resolve())
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        facts = analyze(path)
+        self.parses += 1
+        self.entries[key] = (signature, facts)
+        return facts
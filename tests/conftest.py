@@ -0,0 +1,108 @@
+"""
+Shared fixtures and scoring hooks for the milestone tests.
+
+The student scripts are analyzed once per session (see analysis.py).
+REPO_ROOT is read from the test module at each test, so that the
+correction plugin (plugin_correction.py) can point it to another
+student repository.
+
+All milestones run in one session; the points of each test (see
+scoring.py) are shown at the end of the run and, with
+--score-json=<file>, written as a JSON summary:
+
+    pytest tests --score-json=score.json
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from .analysis import FactsCache
+from .scoring import milestone_of, summarize
+
+
+@pytest.fixture(scope="session")
+def facts_cache():
+    """Session-wide cache of script facts."""
+    return FactsCache()
+
+
+@pytest.fixture
+def aht20_facts(request, facts_cache):
+    """Facts of the student's test_aht20.py."""
+    return facts_cache.facts(request.module.REPO_ROOT / "test_aht20.py")
+
+
+@pytest.fixture
+def neoslider_facts(request, facts_cache):
+    """Facts of the student's test_neoslider.py (optional)."""
+    return facts_cache.facts(request.module.REPO_ROOT / "test_neoslider.py")
+
+
+# ---------------------------------------------------------------------------
+# Scoring hooks
+# ---------------------------------------------------------------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("scoring", "Formatif F1 milestone points")
+    group.addoption("--score-json", help="Write the score summary (points per milestone) to this file")
+
+
+def pytest_configure(config):
+    # {repository (None outside batch grading): {test name: (milestone, outcome)}}
+    config._score_outcomes = {}
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    milestone = milestone_of(item.module.__name__)
+    if milestone is None:
+        return
+
+    # Batch grading (plugin_correction.py) runs each test once per repository
+    callspec = getattr(item, "callspec", None)
+    repo = callspec.params.get("depot_racine") if callspec is not None else None
+
+    outcomes = item.config._score_outcomes.setdefault(repo, {})
+    name = item.originalname
+    _, previous = outcomes.get(name, (milestone, "passed"))
+    if report.failed:
+        previous = "failed"
+    elif report.skipped and previous == "passed":
+        previous = "skipped"
+    outcomes[name] = (milestone, previous)
+
+
+def score_summaries(config):
+    return {repo: summarize(outcomes) for repo, outcomes in config._score_outcomes.items()}
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    summaries = score_summaries(config)
+    if list(summaries) != [None]:
+        return
+
+    summary = summaries[None]
+    terminalreporter.section("Formatif F1 - points")
+    for milestone in summary["milestones"]:
+        terminalreporter.write_line(
+            f"Milestone {milestone['milestone']}: {milestone['title']:<25} "
+            f"{milestone['points']:>3}/{milestone['max']}"
+        )
+    bonus = f" (+{summary['bonus']} bonus)" if summary["bonus"] else ""
+    terminalreporter.write_line(f"Total: {summary['score']}/{summary['max']}{bonus}")
+
+
+def pytest_sessionfinish(session):
+    path = session.config.getoption("score_json")
+    if not path:
+        return
+
+    summaries = score_summaries(session.config)
+    if list(summaries) == [None]:
+        data = summaries[None]
+    else:
+        data = {"repos": {repo: summary for repo, summary in summaries.items() if repo is not None}}
+    Path(path).write_text(json.dumps(data, ensure_ascii=False))
@@ -0,0 +1,50 @@
+"""
+Fixtures for the tests of the grading and Raspberry Pi tools.
+
+These tests cover the repository's own scripts (correction.py,
+file_attente.py, aht20.py, ...), not the student's work: correction.py
+and the classroom workflow always run pytest with --ignore=tests/outils.
+"""
+
+import importlib
+import sys
+
+import pytest
+
+import aht20
+import bench_correction
+
+
+@pytest.fixture
+def make_repo(tmp_path):
+    """Factory creating a synthetic student repository (see bench_correction.py)."""
+    def make(name, template="reussite", model=None):
+        path = tmp_path / "depots" / name
+        path.parent.mkdir(exist_ok=True)
+        bench_correction.creer_depot(path, template, name, model)
+        return path
+    return make
+
+
+def outcomes(result):
+    """Outcome of each test of a graded repository, by test name."""
+    return {t["name"]: t["outcome"] for t in result["resultats"]["tests"]}
+
+
+FAKE_MODULES = ("board", "busio", "virtual_i2c", "adafruit_ahtx0", "adafruit_seesaw")
+
+
+@pytest.fixture
+def fake_board(monkeypatch):
+    """
+    Import the simulated board module (tests/simulation/fakes).
+
+    Conversions run ten times faster than on the real AHT20; the fake
+    modules are forgotten afterwards so each test gets a fresh bus.
+    """
+    monkeypatch.setenv("SIM_TIME_SCALE", "0.1")
+    monkeypatch.syspath_prepend(str(aht20.FAKES_SIMULATION))
+    yield importlib.import_module("board")
+    for name in list(sys.modules):
+        if name.split(".")[0] in FAKE_MODULES:
+            del sys.modules[name]
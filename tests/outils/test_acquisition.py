@@ -0,0 +1,186 @@
+"""Ring buffer and background acquisition (acquisition.py)."""
+
+import sys
+import threading
+
+import pytest
+
+import acquisition
+import aht20
+from acquisition import Acquisition, TamponCirculaire, colonne
+
+
+def fill(buffer, count, start=0):
+    for i in range(start, start + count):
+        buffer.ajouter(float(i), 20.0 + i, 40.0 + i)
+
+
+def test_empty_buffer():
+    buffer = TamponCirculaire(4)
+
+    assert len(buffer) == 0
+    assert buffer.dernier() is None
+    assert len(buffer.instantane()) == 0
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        TamponCirculaire(0)
+
+
+def test_partial_fill_keeps_insertion_order():
+    buffer = TamponCirculaire(4)
+    fill(buffer, 3)
+
+    assert len(buffer) == 3
+    assert colonne(buffer.instantane(), "horodatage").tolist() == [0.0, 1.0, 2.0]
+    assert buffer.dernier().tolist() == [2.0, 22.0, 42.0]
+
+
+@pytest.mark.parametrize("count", [4, 5, 7, 9, 13])
+def test_wrap_around_keeps_the_latest_samples_contiguous(count):
+    buffer = TamponCirculaire(4)
+    fill(buffer, count)
+
+    assert len(buffer) == 4 and buffer.total == count
+    expected = [float(i) for i in range(count - 4, count)]
+    assert colonne(buffer.instantane(), "horodatage").tolist() == expected
+    assert colonne(buffer.fenetre(2), "temperature").tolist() == [20.0 + t for t in expected[2:]]
+    assert buffer.fenetre(2).contiguous
+
+
+def test_window_is_clamped_to_the_content():
+    buffer = TamponCirculaire(4)
+    fill(buffer, 2)
+
+    assert len(buffer.fenetre(10)) == 2 * acquisition.LARGEUR
+    assert len(buffer.fenetre(-1)) == 0
+
+
+def test_views_are_live_until_copied():
+    buffer = TamponCirculaire(2)
+    fill(buffer, 2)
+    view = buffer.fenetre(1)
+    frozen = view.tolist()
+
+    fill(buffer, 2, start=2)
+
+    assert view.tolist() != frozen
+    assert frozen == [1.0, 21.0, 41.0]
+
+
+def test_memory_is_preallocated():
+    buffer = TamponCirculaire(8)
+    size = buffer._donnees.buffer_info()
+    fill(buffer, 100)
+
+    assert buffer._donnees.buffer_info() == size
+
+
+class FakeSensor:
+    """Sensor returning numbered samples, failing on the requested reads."""
+
+    def __init__(self, failures=(), stop_after=None):
+        self.reads = 0
+        self.failures = set(failures)
+        self.stop_after = stop_after
+        self.done = threading.Event()
+
+    def lire(self):
+        self.reads += 1
+        if self.stop_after is not None and self.reads >= self.stop_after:
+            self.done.set()
+        if self.reads in self.failures:
+            raise aht20.ErreurAHT20("CRC invalide")
+        return aht20.Echantillon(float(self.reads), 21.0, 45.0)
+
+
+class FakePublication:
+    def __init__(self):
+        self.samples = []
+
+    def publier(self, echantillon):
+        self.samples.append(echantillon)
+
+
+def run(sensor, **kwargs):
+    buffer = TamponCirculaire(256)
+    job = Acquisition(sensor, buffer, periode=0.001, **kwargs)
+    job.demarrer()
+    assert sensor.done.wait(5)
+    job.arreter()
+    return job, buffer
+
+
+def test_acquisition_fills_the_buffer_and_publishes():
+    publication = FakePublication()
+    job, buffer = run(FakeSensor(stop_after=5), publication=publication)
+
+    assert buffer.total >= 4
+    assert job.erreurs == 0
+    assert [s.horodatage for s in publication.samples] == \
+        colonne(buffer.fenetre(len(publication.samples)), "horodatage").tolist()
+
+
+def test_acquisition_counts_errors_and_keeps_going():
+    sensor = FakeSensor(failures={2, 3}, stop_after=6)
+    job, buffer = run(sensor)
+
+    assert job.erreurs == 2
+    assert isinstance(job.derniere_erreur, aht20.ErreurAHT20)
+    assert 1.0 in colonne(buffer.instantane(), "horodatage").tolist()
+    assert 4.0 in colonne(buffer.instantane(), "horodatage").tolist()
+
+
+def test_acquisition_stops_promptly():
+    sensor = FakeSensor(stop_after=1)
+    job = Acquisition(sensor, TamponCirculaire(4), periode=60)
+    job.demarrer()
+    assert sensor.done.wait(5)
+
+    job.arreter()
+
+    assert job._fil is None
+    assert sensor.reads == 1
+
+
+def test_missed_deadlines_are_skipped(monkeypatch):
+    clock = iter([0.0, 0.0, 3.5])
+    waits = []
+
+    class Stop(Exception):
+        pass
+
+    job = Acquisition(FakeSensor(), TamponCirculaire(4), periode=1.0)
+    monkeypatch.setattr(acquisition.time, "monotonic", lambda: next(clock))
+
+    def wait(timeout):
+        waits.append(timeout)
+        if len(waits) == 2:
+            raise Stop
+    monkeypatch.setattr(job._arret, "wait", wait)
+
+    with pytest.raises(Stop):
+        job._boucle()
+
+    # First period on time, then a read finishing at 3.5 s: next deadline 4 s
+    assert waits == [1.0, 0.5]
+
+
+@pytest.mark.parametrize("option, value", [
+    ("--frequence", "0"), ("--frequence", "-2"), ("--frequence", "inf"), ("--frequence", "vite"),
+    ("--affichage", "0"), ("--capacite", "0"),
+])
+def test_command_line_rejects_non_positive_values(monkeypatch, capsys, option, value):
+    monkeypatch.setattr(sys, "argv", ["acquisition.py", option, value])
+
+    with pytest.raises(SystemExit) as exit_info:
+        acquisition.main()
+
+    assert exit_info.value.code == 2
+    assert option in capsys.readouterr().err
+
+
+def test_positive_values_are_accepted():
+    assert acquisition.reel_positif("0.5") == 0.5
+    assert acquisition.entier_positif("10") == 10
@@ -0,0 +1,101 @@
+"""Single-pass fact extraction from student scripts (tests/analysis.py)."""
+
+import os
+
+from ..analysis import FactsCache, analyze
+
+SCRIPT = '''\
+"""Module docstring."""
+
+import board
+import adafruit_ahtx0.extra  # comment after code
+from adafruit_seesaw import seesaw
+
+URL = "http://example.com/#not-a-comment"
+
+
+class Sensor:
+    """Class docstring."""
+
+
+def main():
+    """Function docstring."""
+    # A real comment
+    try:
+        sensor = adafruit_ahtx0.AHTx0(board.I2C())
+        print(sensor.temperature)
+    except OSError:
+        print("no sensor")
+    text = """# not a comment either"""
+
+
+if "__main__" == __name__:
+    main()
+'''
+
+
+def write(tmp_path, source, name="test_aht20.py"):
+    path = tmp_path / name
+    path.write_text(source)
+    return path
+
+
+def test_facts_from_the_syntax_tree(tmp_path):
+    facts = analyze(write(tmp_path, SCRIPT))
+
+    assert facts.parsed
+    assert facts.imports == {"board", "adafruit_ahtx0", "adafruit_seesaw"}
+    assert {"board.I2C", "adafruit_ahtx0.AHTx0", "print"} <= facts.calls
+    assert {"board.I2C", "adafruit_ahtx0.AHTx0"} <= facts.guarded_calls
+    assert "temperature" in facts.attributes
+    assert facts.functions == {"main"}
+    assert facts.has_main_guard
+    assert facts.try_except_blocks == 1
+
+
+def test_only_real_comments_and_docstrings_count(tmp_path):
+    facts = analyze(write(tmp_path, SCRIPT))
+
+    assert facts.comments == 2
+    assert facts.docstrings == 3
+
+
+def test_try_without_except_is_not_error_handling(tmp_path):
+    source = "try:\n    open('x')\nfinally:\n    pass\n"
+    facts = analyze(write(tmp_path, source))
+
+    assert facts.try_except_blocks == 0
+    assert facts.guarded_calls == set()
+
+
+def test_syntax_error_falls_back_to_text_patterns(tmp_path):
+    source = SCRIPT.replace("def main():", "def main()")
+    facts = analyze(write(tmp_path, source))
+
+    assert facts.exists and not facts.parsed
+    assert isinstance(facts.syntax_error, SyntaxError)
+    assert {"board", "adafruit_ahtx0", "adafruit_seesaw"} <= facts.imports
+    assert "main" in facts.functions
+    assert facts.has_main_guard
+    assert facts.try_except_blocks == 1
+    assert facts.comments == source.count("#")
+
+
+def test_missing_file(tmp_path):
+    facts = analyze(tmp_path / "absent.py")
+
+    assert not facts.exists and not facts.parsed
+    assert facts.source == ""
+
+
+def test_cache_parses_each_version_once(tmp_path):
+    path = write(tmp_path, "import board\n")
+    cache = FactsCache()
+
+    first = cache.facts(path)
+    assert cache.facts(path) is first
+
+    path.write_text("import board\nimport busio\n")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+    assert cache.facts(path).imports == {"board", "busio"}
+    assert cache.parses == 2
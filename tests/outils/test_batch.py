@@ -0,0 +1,104 @@
+"""Batch grading: parallel jobs, duplicate submissions (correction.corriger_batch)."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import correction
+
+from .conftest import outcomes
+
+
+def grade(repos, **options):
+    return list(correction.corriger_batch(repos, **options))
+
+
+def test_parallel_batch_grades_every_repo(make_repo):
+    repos = [make_repo("carol", "syntaxe"), make_repo("alice"), make_repo("bob", "echec")]
+
+    results = grade(repos, jobs=3)
+
+    assert sorted(r["etudiant"] for r in results) == ["alice", "bob", "carol"]
+
+
+def fake_pool(monkeypatch, durations):
+    """Run the "depot" engine in threads, with a fixed duration per repo."""
+    started = []
+
+    def corriger_depot(repo_dir, delai):
+        started.append(repo_dir.name)
+        time.sleep(durations[repo_dir.name])
+        return {"etudiant": repo_dir.name}
+    monkeypatch.setattr(correction, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(correction, "corriger_depot", corriger_depot)
+    return started
+
+
+def test_results_are_yielded_as_they_complete(monkeypatch):
+    fake_pool(monkeypatch, {"slow": 0.5, "fast": 0.0, "medium": 0.1})
+    depots = [Path(name) for name in ("slow", "fast", "medium")]
+
+    results = [r["etudiant"] for r in correction._corriger(depots, 3, "depot")]
+
+    assert results == ["fast", "medium", "slow"]
+
+
+def test_leaving_the_batch_cancels_queued_repos(monkeypatch):
+    names = [f"repo{i}" for i in range(6)]
+    started = fake_pool(monkeypatch, dict.fromkeys(names, 0.05))
+
+    batch = correction._corriger([Path(name) for name in names], 2, "depot")
+    next(batch)
+    batch.close()
+
+    assert len(started) < len(names)
+
+
+def test_parallel_batch_matches_sequential(make_repo):
+    repos = [make_repo("alice"), make_repo("bob", "echec")]
+
+    sequential = grade(repos, jobs=1)
+    parallel = sorted(grade(repos, jobs=2), key=lambda r: r["etudiant"])
+
+    for one, other in zip(sequential, parallel):
+        assert one["notes"] == other["notes"]
+        assert outcomes(one) == outcomes(other)
+
+
+def test_parallel_output_is_captured_per_repo(make_repo, capsys):
+    grade([make_repo("alice"), make_repo("bob", "echec")], jobs=2)
+
+    assert capsys.readouterr().out == ""
+
+
+def test_identical_submissions_run_once(make_repo, monkeypatch):
+    alice = make_repo("alice")
+    copy = make_repo("copy", model=alice)
+    bob = make_repo("bob", "echec")
+    graded = []
+    corriger_depot = correction.corriger_depot
+
+    def spy(repo_dir, delai):
+        graded.append(repo_dir.name)
+        return corriger_depot(repo_dir, delai)
+    monkeypatch.setattr(correction, "corriger_depot", spy)
+
+    results = grade([alice, bob, copy])
+
+    assert graded == ["alice", "bob"]
+    # A duplicate follows the repo graded for its group
+    assert [r["etudiant"] for r in results] == ["alice", "copy", "bob"]
+    by_name = {r["etudiant"]: r for r in results}
+    assert by_name["copy"]["doublon_de"] == "alice"
+    assert by_name["copy"]["notes"] == by_name["alice"]["notes"]
+    assert by_name["alice"]["groupe"] == by_name["copy"]["groupe"] == 2
+    assert by_name["bob"]["groupe"] == 1
+
+
+def test_duplicate_results_are_independent_copies(make_repo):
+    alice = make_repo("alice")
+
+    original, duplicate = grade([alice, make_repo("copy", model=alice)])
+    duplicate["notes"]["finale"] = -1
+
+    assert original["notes"]["finale"] != -1
@@ -0,0 +1,60 @@
+"""Synthetic student repositories and benchmark statistics (bench_correction.py)."""
+
+import argparse
+
+import pytest
+
+import bench_correction
+import correction
+
+
+@pytest.mark.parametrize("n", [0, 1, 7, 40, 151])
+def test_mix_split_adds_up(n):
+    counts = bench_correction.repartir_mix(n, bench_correction.MIX_DEFAUT)
+
+    assert sum(counts.values()) == n
+    assert set(counts) == set(bench_correction.MIX_DEFAUT)
+
+
+def test_mix_weights_need_not_sum_to_one():
+    assert bench_correction.repartir_mix(10, {"reussite": 3, "echec": 1}) == {
+        "reussite": 8, "echec": 2}
+
+
+def test_mix_option_parsing():
+    assert bench_correction.lire_mix("reussite=2,echec") == {"reussite": 2.0, "echec": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        bench_correction.lire_mix("unknown=1")
+
+
+def test_generated_repos_and_copies(tmp_path):
+    repos = bench_correction.generer_depots(tmp_path, {"copie": 1, "reussite": 1, "syntaxe": 1})
+
+    assert sorted(repos.values()) == ["copie", "reussite", "syntaxe"]
+    original = next(n for n, g in repos.items() if g == "reussite")
+    copy = next(n for n, g in repos.items() if g == "copie")
+    assert ((tmp_path / copy / "test_aht20.py").read_text()
+            == (tmp_path / original / "test_aht20.py").read_text())
+    assert not (tmp_path / original / "tests" / correction.NOM_TESTS_OUTILS).exists()
+
+
+def test_copy_without_model_becomes_a_passing_repo(tmp_path):
+    repos = bench_correction.generer_depots(tmp_path, {"copie": 2})
+
+    assert sorted(repos.values()) == ["copie", "reussite"]
+
+
+@pytest.mark.parametrize("template, final", [("reussite", 100), ("echec", None), ("syntaxe", None)])
+def test_templates_grade_as_intended(make_repo, template, final):
+    notes = correction.corriger_depot(make_repo("alice", template))["notes"]
+
+    if final is None:
+        assert notes["finale"] < 100
+    else:
+        assert notes["finale"] == final
+
+
+def test_percentiles_interpolate():
+    assert bench_correction.centile([4, 1, 3, 2], 50) == 2.5
+    assert bench_correction.centile([1, 2, 3, 4], 100) == 4
+    assert bench_correction.centile([7], 95) == 7
@@ -0,0 +1,77 @@
+"""Content-addressed grading cache (correction.empreinte_depot, charger_cache)."""
+
+import re
+
+import pytest
+
+import correction
+
+
+def fingerprint(repo):
+    return correction.empreinte_depot(repo, "depot", correction.empreinte_correcteur())
+
+
+def test_second_batch_is_served_from_cache(make_repo, tmp_path, monkeypatch):
+    repo = make_repo("alice")
+    cache = tmp_path / "cache"
+    first, = correction.corriger_batch([repo], cache_dir=cache)
+
+    def no_pytest(*args):
+        raise AssertionError("pytest should not run for a cached repo")
+    monkeypatch.setattr(correction, "corriger_depot", no_pytest)
+    second, = correction.corriger_batch([repo], cache_dir=cache)
+
+    assert "cache" not in first
+    assert second["cache"] is True
+    assert second["notes"] == first["notes"]
+    assert second["empreinte"] == first["empreinte"]
+
+
+def test_fingerprint_ignores_marker_timestamps(make_repo):
+    repo = make_repo("alice")
+    before = fingerprint(repo)
+
+    marker = repo / ".test_markers" / "aht20_verified.txt"
+    marker.write_text(re.sub(r"Verified: \S+", "Verified: 1999-01-01T00:00:00", marker.read_text()))
+
+    assert fingerprint(repo) == before
+
+
+@pytest.mark.parametrize("change", [
+    lambda repo: (repo / "test_aht20.py").write_text("print('other')\n"),
+    lambda repo: (repo / ".test_markers" / "all_tests_passed.txt").unlink(),
+    lambda repo: (repo / "tests" / "conftest.py").write_text("# changed\n"),
+])
+def test_fingerprint_follows_graded_inputs(make_repo, change):
+    repo = make_repo("alice")
+    before = fingerprint(repo)
+
+    change(repo)
+
+    assert fingerprint(repo) != before
+
+
+def test_fingerprint_ignores_tool_tests(make_repo):
+    repo = make_repo("alice")
+    before = fingerprint(repo)
+
+    (repo / "tests" / correction.NOM_TESTS_OUTILS).mkdir()
+    (repo / "tests" / correction.NOM_TESTS_OUTILS / "test_extra.py").write_text("")
+
+    assert fingerprint(repo) == before
+
+
+def test_errored_results_are_not_cached(tmp_path):
+    result = {"resultats": {"erreur": "Timeout"}, "notes": {}}
+
+    correction.enregistrer_cache(tmp_path, "ab" * 32, result)
+
+    assert correction.charger_cache(tmp_path, "ab" * 32) is None
+
+
+def test_unreadable_cache_entry_is_a_miss(tmp_path):
+    key = "cd" * 32
+    (tmp_path / key[:2]).mkdir()
+    (tmp_path / key[:2] / f"{key}.json").write_text("{truncated")
+
+    assert correction.charger_cache(tmp_path, key) is None
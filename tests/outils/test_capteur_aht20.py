@@ -0,0 +1,152 @@
+"""Single-conversion AHT20 driver (aht20.py) on the simulated bus."""
+
+import pytest
+
+import aht20
+
+
+class BusyBus:
+    """I2C bus whose sensor is calibrated but never finishes a conversion."""
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        pass
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        buffer[0] = aht20.STATUT_CALIBRE | aht20.STATUT_OCCUPE
+
+
+def frame(temperature, humidity):
+    """Status, 20-bit humidity and temperature, and CRC, as sent by the AHT20."""
+    raw_h = round(humidity * 0x100000 / 100)
+    raw_t = round((temperature + 50) * 0x100000 / 200)
+    data = bytes([aht20.STATUT_CALIBRE, raw_h >> 12, (raw_h >> 4) & 0xFF,
+                  ((raw_h & 0x0F) << 4) | (raw_t >> 16), (raw_t >> 8) & 0xFF, raw_t & 0xFF])
+    return data + bytes([aht20.crc8(data)])
+
+
+def test_crc8_check_value():
+    # CRC-8, polynomial 0x31, initial value 0xFF
+    assert aht20.crc8(b"123456789") == 0xF7
+
+
+def test_decode_frame():
+    temperature, humidity = aht20.decoder_trame(frame(21.5, 40.0))
+
+    assert temperature == pytest.approx(21.5, abs=0.001)
+    assert humidity == pytest.approx(40.0, abs=0.001)
+
+
+def test_decode_frame_without_crc():
+    temperature, _ = aht20.decoder_trame(frame(-10.0, 0.0)[:6])
+
+    assert temperature == pytest.approx(-10.0, abs=0.001)
+
+
+def test_decode_rejects_a_corrupted_frame():
+    corrupted = bytearray(frame(21.5, 40.0))
+    corrupted[4] ^= 0x01
+
+    with pytest.raises(aht20.ErreurAHT20, match="CRC"):
+        aht20.decoder_trame(corrupted)
+
+
+def test_decode_rejects_a_busy_frame():
+    busy = bytearray(frame(21.5, 40.0))
+    busy[0] |= aht20.STATUT_OCCUPE
+
+    with pytest.raises(aht20.ErreurAHT20, match="occupe"):
+        aht20.decoder_trame(busy)
+
+
+def test_polling_returns_as_soon_as_the_conversion_ends(fake_board):
+    sensor = aht20.CapteurAHT20(fake_board.I2C())
+
+    sample = sensor.lire()
+
+    assert sample.temperature == pytest.approx(22.5, abs=0.01)
+    assert sample.relative_humidity == pytest.approx(45.0, abs=0.01)
+    # Simulated conversions take 7.5-8.5 ms at SIM_TIME_SCALE=0.1
+    assert sensor.latences.total == 1
+    assert 0.0075 <= sensor.latences.maximum < aht20.DELAI_CONVERSION
+
+
+def test_polling_wait_is_a_parameter(monkeypatch):
+    waits = []
+    monkeypatch.setattr(aht20.time, "sleep", waits.append)
+    sensor = aht20.CapteurAHT20(BusyBus(), attente=0.003)
+    waits.clear()
+
+    with pytest.raises(aht20.ErreurAHT20):
+        sensor._attendre_scrutation(aht20.time.perf_counter() - aht20.SCRUTATION_DELAI_MAX)
+
+    assert waits == [0.003]
+    assert aht20.SCRUTATION_ATTENTE < 0.075
+
+
+def test_polling_gives_up_on_a_stuck_sensor(monkeypatch):
+    monkeypatch.setattr(aht20, "SCRUTATION_DELAI_MAX", 0.02)
+    sensor = aht20.CapteurAHT20(BusyBus())
+
+    with pytest.raises(aht20.ErreurAHT20, match="trop longue"):
+        sensor.lire()
+
+
+def test_fixed_mode_waits_the_datasheet_delay(fake_board):
+    sensor = aht20.CapteurAHT20(fake_board.I2C(), mode=aht20.MODE_FIXE)
+
+    sample = sensor.lire()
+
+    assert sample.temperature == pytest.approx(22.5, abs=0.01)
+    assert sensor.latences.minimum >= aht20.DELAI_CONVERSION
+
+
+def test_fixed_mode_rereads_a_busy_sensor(fake_board, monkeypatch):
+    # Conversions of 82-94 ms: still busy after the fixed 80 ms wait
+    monkeypatch.setenv("SIM_TIME_SCALE", "1.1")
+    sensor = aht20.CapteurAHT20(fake_board.I2C(), mode=aht20.MODE_FIXE)
+
+    sample = sensor.lire()
+
+    assert sample.relative_humidity == pytest.approx(45.0, abs=0.01)
+    assert sensor.latences.minimum >= aht20.DELAI_CONVERSION + aht20.DELAI_RELECTURE
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        aht20.CapteurAHT20(BusyBus(), mode="rapide")
+
+
+def test_histogram_percentile_is_the_bucket_upper_bound():
+    histogram = aht20.HistogrammeLatences(largeur=0.001, maximum=0.010)
+    for latency in (0.0072, 0.0074, 0.0081, 0.0089):
+        histogram.ajouter(latency)
+
+    assert histogram.centile(50) == pytest.approx(0.008)
+    assert histogram.centile(100) == pytest.approx(0.009)
+    assert histogram.moyenne == pytest.approx(0.0079)
+    assert (histogram.minimum, histogram.maximum) == (0.0072, 0.0089)
+
+
+def test_histogram_overflow_and_lines():
+    histogram = aht20.HistogrammeLatences(largeur=0.001, maximum=0.010)
+    histogram.ajouter(0.0075)
+    histogram.ajouter(0.5)
+
+    assert histogram.comptes[-1] == 1
+    lines = histogram.lignes(largeur_barre=4)
+    assert len(lines) == 2
+    assert lines[0].split()[:2] == ["7-8", "ms"]
+
+
+def test_empty_histogram():
+    histogram = aht20.HistogrammeLatences()
+
+    assert histogram.centile(99) == 0.0
+    assert histogram.moyenne == 0.0
+    assert histogram.lignes() == []
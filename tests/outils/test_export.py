@@ -0,0 +1,127 @@
+"""Streaming export of batch results (correction.ExportateurResultats)."""
+
+import csv
+import sys
+
+import pytest
+
+import correction
+
+
+@pytest.fixture(scope="module")
+def graded(tmp_path_factory):
+    """Result of grading one passing repository."""
+    import bench_correction
+
+    repo = tmp_path_factory.mktemp("depots") / "alice"
+    bench_correction.creer_depot(repo, "reussite", "alice")
+    return correction.corriger_depot(repo)
+
+
+def test_csv_rows_are_on_disk_before_close(tmp_path, graded):
+    path = tmp_path / "notes.csv"
+
+    with correction.ExportateurResultats(path) as exporter:
+        exporter.ajouter(graded)
+        header, row = list(csv.reader(path.open(encoding="utf-8")))
+
+    assert header == exporter.en_tetes
+    assert row[0] == "alice"
+    assert float(row[3]) == graded["notes"]["finale"]
+    assert exporter.lignes == 1
+
+
+def test_xlsx_export(tmp_path, graded):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = tmp_path / "notes.xlsx"
+
+    with correction.ExportateurResultats(path) as exporter:
+        exporter.ajouter(graded)
+        exporter.ajouter(dict(graded, etudiant="bob"))
+
+    rows = list(openpyxl.load_workbook(path).active.values)
+    assert list(rows[0]) == exporter.en_tetes
+    assert [r[0] for r in rows[1:]] == ["alice", "bob"]
+
+
+def test_parquet_export_in_row_groups(tmp_path, graded, monkeypatch):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(correction.ExportateurResultats, "TAILLE_GROUPE_PARQUET", 2)
+    path = tmp_path / "notes.parquet"
+
+    with correction.ExportateurResultats(path) as exporter:
+        for name in ("alice", "bob", "carol"):
+            exporter.ajouter(dict(graded, etudiant=name))
+
+    fichier = parquet.ParquetFile(path)
+    assert fichier.metadata.num_row_groups == 2
+    assert fichier.read().column("Étudiant").to_pylist() == ["alice", "bob", "carol"]
+
+
+def test_parquet_round_trip(tmp_path, graded):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    path = tmp_path / "notes.parquet"
+    with correction.ExportateurResultats(path) as exporter:
+        exporter.ajouter(graded)
+
+    table = pyarrow.parquet.read_table(path)
+    assert table.column_names == exporter.en_tetes
+    row, = table.to_pylist()
+    assert row["Étudiant"] == "alice"
+    assert row["Note finale (%)"] == graded["notes"]["finale"]
+    assert row["IND-00SX-E (%)"] == graded["notes"]["IND-00SX-E"]["score"]
+    outcomes = {t["name"]: t["outcome"] for t in graded["resultats"]["tests"]}
+    for name in exporter.noms_tests:
+        assert row[name] == outcomes.get(name, "")
+
+
+def test_xlsx_rows_are_kept_in_a_csv_sidecar_until_saved(tmp_path, graded):
+    pytest.importorskip("openpyxl")
+    path = tmp_path / "notes.xlsx"
+
+    with correction.ExportateurResultats(path) as exporter:
+        exporter.ajouter(graded)
+        rows = list(csv.reader(exporter.chemin_partiel.open(encoding="utf-8")))
+        assert [row[0] for row in rows] == ["Étudiant", "alice"]
+
+    assert path.exists()
+    assert not exporter.chemin_partiel.exists()
+
+
+@pytest.mark.parametrize("name", ["notes.json", "notes"])
+def test_unknown_export_format_is_rejected(tmp_path, name):
+    with pytest.raises(ValueError, match="Format d'export inconnu"):
+        correction.ExportateurResultats(tmp_path / name)
+
+    assert not (tmp_path / name).exists()
+    assert correction.ouvrir_export(tmp_path / name) is None
+
+
+def test_interrupted_batch_closes_export_and_reports(tmp_path, graded, monkeypatch):
+    batch = tmp_path / "depots"
+    (batch / "alice").mkdir(parents=True)
+    (batch / "bob").mkdir()
+    export = tmp_path / "notes.csv"
+    reports = tmp_path / "rapports"
+
+    def interrupted(*args):
+        yield dict(graded)
+        raise KeyboardInterrupt
+    monkeypatch.setattr(correction, "corriger_batch", interrupted)
+    closed = []
+    for cls in (correction.ExportateurResultats, correction.EcrivainRapports):
+        monkeypatch.setattr(cls, "fermer", lambda self, fermer=cls.fermer: (
+            closed.append(type(self).__name__), fermer(self)))
+    monkeypatch.setattr(sys, "argv", ["correction.py", "--batch", str(batch),
+                                      "--export", str(export), "--rapports", str(reports)])
+    monkeypatch.setenv("SIM_REQUIRE_ISOLATION", "1")  # set by main(), restored after
+
+    with pytest.raises(SystemExit) as exit_info:
+        correction.main()
+
+    assert exit_info.value.code == 130
+    assert sorted(closed) == ["EcrivainRapports", "ExportateurResultats"]
+    assert len(export.read_text(encoding="utf-8").splitlines()) == 2
+    assert (reports / "alice.md").exists()
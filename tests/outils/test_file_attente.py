@@ -0,0 +1,132 @@
+"""Shared SQLite work queue: leases, re-claims and workers (file_attente.py)."""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import correction
+import file_attente
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "file.db"
+
+
+@pytest.fixture
+def db(db_path):
+    connection = file_attente.connecter(db_path)
+    yield connection
+    connection.close()
+
+
+def repos(*names):
+    return [Path("/depots") / name for name in names]
+
+
+def test_repos_are_reserved_in_order(db):
+    file_attente.initialiser(db, repos("alice", "bob"))
+
+    assert file_attente.reserver(db, "w1") == "/depots/alice"
+    assert file_attente.reserver(db, "w2") == "/depots/bob"
+    assert file_attente.reserver(db, "w3") is None
+    assert file_attente.restants(db) == 2
+
+
+def test_expired_lease_is_reclaimed(db):
+    file_attente.initialiser(db, repos("alice"))
+    chemin = file_attente.reserver(db, "w1", duree_bail=-1)
+
+    assert file_attente.reserver(db, "w2") == chemin
+    assert not file_attente.prolonger(db, chemin, "w1")
+    assert not file_attente.terminer(db, chemin, "w1", {"notes": 1})
+    assert file_attente.terminer(db, chemin, "w2", {"notes": 2})
+    assert file_attente.resultats(db) == [("alice", "termine", 2, {"notes": 2})]
+
+
+def test_repo_fails_after_max_attempts(db):
+    file_attente.initialiser(db, repos("alice"))
+    for attempt in range(file_attente.MAX_TENTATIVES):
+        assert file_attente.reserver(db, f"w{attempt}", duree_bail=-1)
+
+    assert file_attente.reserver(db, "last") is None
+    (etudiant, etat, tentatives, result), = file_attente.resultats(db)
+    assert etat == "echec"
+    assert tentatives == file_attente.MAX_TENTATIVES
+    assert "erreur" in result
+
+
+def test_new_batch_resets_previous_results(db):
+    file_attente.initialiser(db, repos("alice", "bob"))
+    chemin = file_attente.reserver(db, "w1")
+    file_attente.terminer(db, chemin, "w1", {"notes": 1})
+
+    file_attente.initialiser(db, repos("alice", "carol"))
+
+    assert file_attente.resultats(db) == [("alice", "en_attente", 0, None),
+                                          ("carol", "en_attente", 0, None)]
+    assert not file_attente.terminer(db, chemin, "w1", {"notes": 1})
+
+
+def test_lost_lease_is_signalled(db, db_path, monkeypatch):
+    monkeypatch.setattr(file_attente, "DUREE_BAIL", 0.03)
+    file_attente.initialiser(db, repos("alice"))
+    chemin = file_attente.reserver(db, "w1", duree_bail=-1)
+    file_attente.reserver(db, "w2")
+    stop, lost = threading.Event(), threading.Event()
+
+    heartbeat = threading.Thread(target=correction._prolonger_bail,
+                                 args=(db_path, chemin, "w1", stop, lost))
+    heartbeat.start()
+    heartbeat.join(timeout=5)
+
+    assert lost.is_set()
+    assert not heartbeat.is_alive()
+
+
+def test_abandoned_pytest_is_killed():
+    abandon = threading.Event()
+    threading.Timer(0.2, abandon.set).start()
+    debut = time.monotonic()
+
+    with pytest.raises(InterruptedError):
+        correction.executer_pytest([sys.executable, "-c", "import time; time.sleep(30)"],
+                                   30, abandon=abandon)
+
+    assert time.monotonic() - debut < 5
+
+
+def test_interrupted_pytest_group_is_killed(monkeypatch):
+    started = []
+    popen = subprocess.Popen
+
+    def spy(*args, **kwargs):
+        started.append(popen(*args, **kwargs))
+        return started[-1]
+
+    def interrupt(self, *args, **kwargs):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(popen, "communicate", interrupt)
+    monkeypatch.setattr(subprocess, "Popen", spy)
+
+    with pytest.raises(KeyboardInterrupt):
+        correction.executer_pytest([sys.executable, "-c", "import time; time.sleep(30)"], 30)
+
+    process, = started
+    assert process.returncode == -signal.SIGKILL
+    with pytest.raises(ProcessLookupError):
+        os.killpg(process.pid, 0)
+
+
+def test_worker_grades_the_whole_queue(db, db_path, make_repo):
+    file_attente.initialiser(db, [make_repo("alice"), make_repo("bob", "echec")])
+
+    assert correction.travailler(db_path, "w1") == 2
+    assert [(e, etat) for e, etat, _, _ in file_attente.resultats(db)] == [
+        ("alice", "termine"), ("bob", "termine")]
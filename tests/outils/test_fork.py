@@ -0,0 +1,70 @@
+"""Fork-server engine (correction.corriger_fork).
+
+The engine forks the process that imported pytest, so it is driven from
+a fresh interpreter rather than from inside this test session.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import correction
+
+from .conftest import outcomes
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "pidfd_open"), reason="os.pidfd_open() not available")
+
+SCRIPT = """
+import json, subprocess, sys
+from pathlib import Path
+import correction
+depots = [Path(p) for p in sys.argv[2:]]
+delais = {d: float(sys.argv[1]) for d in depots}
+other = subprocess.Popen(["sleep", "0.2"])  # not ours to reap
+results = list(correction.corriger_fork(depots, 2, delais))
+assert other.wait(timeout=10) == 0
+print(json.dumps(results))
+"""
+
+
+def fork_grade(repos, timeout=correction.DELAI_TESTS):
+    completed = subprocess.run(
+        [sys.executable, "-c", SCRIPT, str(timeout), *map(str, repos)],
+        capture_output=True, text=True, timeout=120,
+        cwd=correction.TESTS_CANONIQUES.parent, check=True)
+    return json.loads(completed.stdout)
+
+
+def test_fork_engine_matches_depot_engine(make_repo):
+    repos = [make_repo("alice"), make_repo("bob", "echec")]
+
+    forked = fork_grade(repos)
+
+    assert sorted(r["etudiant"] for r in forked) == ["alice", "bob"]
+    forked.sort(key=lambda r: r["etudiant"])
+    for in_fork, repo in zip(forked, repos):
+        alone = correction.corriger_depot(repo)
+        assert outcomes(in_fork) == outcomes(alone)
+        assert in_fork["notes"] == alone["notes"]
+
+
+def test_fork_child_is_killed_at_its_timeout(make_repo):
+    result, = fork_grade([make_repo("alice")], timeout=0.01)
+
+    assert result["resultats"]["erreur"].startswith("Timeout")
+
+
+def test_fork_engine_refuses_to_fork_a_threaded_process(make_repo):
+    release = threading.Event()
+    thread = threading.Thread(target=release.wait)
+    thread.start()
+    try:
+        with pytest.raises(RuntimeError, match="fils"):
+            next(correction.corriger_fork([make_repo("alice")], 1, {}))
+    finally:
+        release.set()
+        thread.join()
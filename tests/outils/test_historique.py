@@ -0,0 +1,57 @@
+"""Cross-run grading history in SQLite (historique.py)."""
+
+import pytest
+
+import historique
+
+DAY = 86400
+
+
+@pytest.fixture
+def db(tmp_path):
+    connection = historique.connecter(tmp_path / "historique.db")
+    yield connection
+    connection.close()
+
+
+def result(etudiant, outcomes=None, erreur=None):
+    """A graded repo with the given outcome per test, or an errored run."""
+    notes = {"IND-00SX-E": {"score": 50.0}, "IND-00SX-D": {"score": 50.0}, "finale": 50.0}
+    resultats = {"erreur": erreur} if erreur else {
+        "tests": [{"name": name, "outcome": outcome, "duration": 0.1}
+                  for name, outcome in outcomes.items()]}
+    return {"etudiant": etudiant, "resultats": resultats, "notes": notes, "duree": 1.0}
+
+
+def test_pass_to_fail_is_a_regression(db):
+    historique.enregistrer_execution(db, [result("alice", {"test_a": "passed"}),
+                                          result("bob", {"test_a": "passed"})], horodatage=0)
+    historique.enregistrer_execution(db, [result("alice", {"test_a": "failed"}),
+                                          result("bob", {"test_a": "passed"})], horodatage=2 * DAY)
+
+    assert historique.regressions(db, "test_a", DAY) == [("alice", "failed", 2 * DAY)]
+
+
+def test_pass_to_errored_run_is_a_regression(db):
+    historique.enregistrer_execution(db, [result("alice", {"test_a": "passed"})], horodatage=0)
+    historique.enregistrer_execution(db, [result("alice", erreur="Timeout")], horodatage=2 * DAY)
+
+    assert historique.regressions(db, "test_a", DAY) == [("alice", "erreur", 2 * DAY)]
+
+
+def test_recovery_after_an_error_is_not_a_regression(db):
+    historique.enregistrer_execution(db, [result("alice", {"test_a": "passed"})], horodatage=0)
+    historique.enregistrer_execution(db, [result("alice", erreur="Timeout")], horodatage=2 * DAY)
+    historique.enregistrer_execution(db, [result("alice", {"test_a": "passed"})], horodatage=3 * DAY)
+
+    assert historique.regressions(db, "test_a", DAY) == []
+
+
+def test_trend_and_student_history(db):
+    historique.enregistrer_execution(db, [result("alice", {"test_a": "passed"}),
+                                          result("bob", {"test_a": "failed"})], horodatage=0)
+    historique.enregistrer_execution(db, [result("alice", erreur="Timeout")], horodatage=DAY)
+
+    (_, test, rate, count), = historique.tendance(db, "test_a")
+    assert (test, rate, count) == ("test_a", 0.5, 2)
+    assert [erreur for *_, erreur in historique.historique_etudiant(db, "alice")] == [None, "Timeout"]
@@ -0,0 +1,150 @@
+"""Native I2C scan (i2c_scan.py) and the hardware step of run_tests.py."""
+
+import errno
+
+import pytest
+
+import i2c_scan
+import run_tests
+
+
+@pytest.fixture
+def markers(tmp_path, monkeypatch):
+    """Redirect run_tests' .test_markers directory to tmp_path."""
+    monkeypatch.setattr(run_tests, "__file__", str(tmp_path / "run_tests.py"))
+    (tmp_path / ".test_markers").mkdir()
+    return tmp_path / ".test_markers"
+
+
+class FaultyBus(i2c_scan.BusI2CSimule):
+    """Simulated bus whose probes raise the given exception."""
+
+    def __init__(self, exception):
+        super().__init__()
+        self.exception = exception
+
+    def sonder(self, adresse, methode):
+        raise self.exception
+
+
+def test_scanner_reports_present_devices():
+    bus = i2c_scan.BusI2CSimule(presentes=i2c_scan.ADRESSES_COURS)
+
+    assert i2c_scan.scanner(bus=bus) == set(i2c_scan.ADRESSES_COURS)
+
+
+def test_scanner_ignores_absent_devices():
+    bus = i2c_scan.BusI2CSimule(presentes=[i2c_scan.ADRESSE_AHT20])
+
+    assert i2c_scan.scanner(bus=bus) == {i2c_scan.ADRESSE_AHT20}
+    assert i2c_scan.scanner(bus=i2c_scan.BusI2CSimule()) == set()
+
+
+def test_busy_address_counts_as_present():
+    bus = i2c_scan.BusI2CSimule(occupees=[i2c_scan.ADRESSE_AHT20])
+
+    assert i2c_scan.sonder_adresses(bus=bus)[i2c_scan.ADRESSE_AHT20] == i2c_scan.OCCUPE
+    assert i2c_scan.scanner(bus=bus) == {i2c_scan.ADRESSE_AHT20}
+
+
+def test_probe_method_follows_i2cdetect():
+    bus = i2c_scan.BusI2CSimule()
+    i2c_scan.scanner(bus=bus)
+
+    assert dict(bus.sondages) == {
+        i2c_scan.ADRESSE_AHT20: i2c_scan.ECRITURE_RAPIDE,
+        i2c_scan.ADRESSE_NEOSLIDER: i2c_scan.LECTURE_OCTET,
+    }
+
+
+def test_probe_method_falls_back_to_adapter_functions():
+    bus = i2c_scan.BusI2CSimule(fonctionnalites=i2c_scan.I2C_FUNC_SMBUS_READ_BYTE)
+    i2c_scan.scanner(bus=bus)
+
+    assert {methode for _, methode in bus.sondages} == {i2c_scan.LECTURE_OCTET}
+
+
+class FakeIoctl:
+    """Stands in for fcntl: fails I2C_SLAVE or I2C_SMBUS with a given errno."""
+
+    def __init__(self, slave=None, smbus=None):
+        self.errors = {i2c_scan.I2C_SLAVE: slave, i2c_scan.I2C_SMBUS: smbus}
+
+    def ioctl(self, fd, request, argument):
+        code = self.errors.get(request)
+        if code is not None:
+            raise OSError(code, errno.errorcode[code])
+
+
+def linux_bus(monkeypatch, **errors):
+    monkeypatch.setattr(i2c_scan, "fcntl", FakeIoctl(**errors))
+    bus = i2c_scan.BusI2CLinux.__new__(i2c_scan.BusI2CLinux)
+    bus.fd, bus._donnees = None, i2c_scan._DonneesSMBus()
+    return bus
+
+
+@pytest.mark.parametrize("code", sorted(i2c_scan.ERREURS_ABSENT))
+def test_linux_nack_is_absent(monkeypatch, code):
+    bus = linux_bus(monkeypatch, smbus=code)
+
+    assert bus.sonder(0x38, i2c_scan.ECRITURE_RAPIDE) == i2c_scan.ABSENT
+
+
+def test_linux_ack_is_present(monkeypatch):
+    bus = linux_bus(monkeypatch)
+
+    assert bus.sonder(0x30, i2c_scan.LECTURE_OCTET) == i2c_scan.PRESENT
+
+
+def test_linux_ebusy_is_busy(monkeypatch):
+    bus = linux_bus(monkeypatch, slave=errno.EBUSY)
+
+    assert bus.sonder(0x38, i2c_scan.ECRITURE_RAPIDE) == i2c_scan.OCCUPE
+
+
+def test_linux_unexpected_error_is_raised(monkeypatch):
+    bus = linux_bus(monkeypatch, smbus=errno.EINVAL)
+
+    with pytest.raises(OSError):
+        bus.sonder(0x38, i2c_scan.ECRITURE_RAPIDE)
+
+
+def test_hardware_step_writes_the_detected_addresses(markers, capsys):
+    bus = i2c_scan.BusI2CSimule(presentes=i2c_scan.ADRESSES_COURS)
+
+    assert run_tests.run_hardware_tests(bus) is True
+    out = capsys.readouterr().out
+    assert "AHT20 detecte" in out and "NeoSlider detecte" in out
+    assert "0x30, 0x38" in (markers / "hardware_detected.txt").read_text()
+
+
+def test_hardware_step_warns_about_a_missing_sensor(markers, capsys):
+    assert run_tests.run_hardware_tests(i2c_scan.BusI2CSimule()) is True
+
+    out = capsys.readouterr().out
+    assert "AHT20 non detecte" in out
+    assert "aucune" in (markers / "hardware_detected.txt").read_text()
+
+
+def test_hardware_step_tolerates_scan_errors(markers, capsys):
+    bus = FaultyBus(OSError(errno.EINVAL, "Invalid argument"))
+
+    assert run_tests.run_hardware_tests(bus) is True
+    assert "Erreur de scan I2C" in capsys.readouterr().out
+    assert not (markers / "hardware_detected.txt").exists()
+
+
+@pytest.mark.parametrize("error, message", [
+    (FileNotFoundError, "sudo raspi-config"),
+    (PermissionError, "groupe i2c"),
+])
+def test_hardware_step_fails_without_bus_access(markers, capsys, error, message):
+    assert run_tests.run_hardware_tests(FaultyBus(error())) is False
+
+    assert message in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("error", [FileNotFoundError, PermissionError])
+def test_simulated_bus_open_errors(error):
+    with pytest.raises(error):
+        i2c_scan.BusI2CSimule(erreur=error())
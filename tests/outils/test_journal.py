@@ -0,0 +1,53 @@
+"""Checkpoint journal and --resume (correction.lire_journal, ouvrir_journal)."""
+
+import json
+
+import correction
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    journal.write_text(json.dumps({"etudiant": "alice", "notes": {}}) + "\n"
+                       + '{"etudiant": "bob", "no')
+
+    assert list(correction.lire_journal(journal)) == ["alice"]
+
+
+def test_missing_journal_is_empty(tmp_path):
+    assert correction.lire_journal(tmp_path / "absent.jsonl") == {}
+
+
+def test_reopened_journal_drops_the_truncated_line(tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    journal.write_text(json.dumps({"etudiant": "alice"}) + "\n" + '{"etudiant": "bo')
+    done = correction.lire_journal(journal)
+
+    with correction.ouvrir_journal(journal, done) as output:
+        correction.ecrire_journal(output, {"etudiant": "carol"})
+
+    assert list(correction.lire_journal(journal)) == ["alice", "carol"]
+    assert len(journal.read_text().splitlines()) == 2
+
+
+def test_resumed_repos_are_not_graded_again(make_repo, tmp_path, monkeypatch):
+    alice, bob = make_repo("alice"), make_repo("bob", "echec")
+    journal = tmp_path / "journal.jsonl"
+    with correction.ouvrir_journal(journal, {}) as output:
+        first = next(correction.corriger_batch([alice, bob]))
+        first.pop("sortie")
+        correction.ecrire_journal(output, first)
+
+    graded = []
+    corriger_depot = correction.corriger_depot
+
+    def spy(repo_dir, delai):
+        graded.append(repo_dir.name)
+        return corriger_depot(repo_dir, delai)
+    monkeypatch.setattr(correction, "corriger_depot", spy)
+    results = list(correction.corriger_batch(
+        [alice, bob], deja_corriges=correction.lire_journal(journal)))
+
+    assert graded == ["bob"]
+    assert results[0]["reprise"] is True
+    assert results[0]["notes"] == first["notes"]
+    assert "reprise" not in results[1]
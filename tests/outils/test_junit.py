@@ -0,0 +1,58 @@
+"""Reading pytest results from JUnit XML (correction.lire_junitxml)."""
+
+import correction
+
+
+REPORT = """\
+<?xml version="1.0" encoding="utf-8"?>
+<testsuites>
+  <testsuite name="pytest" tests="4" time="1.25" timestamp="2024-09-02T10:00:00.000000">
+    <testcase classname="tests.test_milestone_01" name="test_ok" time="0.10"/>
+    <testcase classname="tests.test_milestone_01" name="test_failure" time="0.20">
+      <failure message="assert 1 == 2">details</failure>
+    </testcase>
+    <testcase classname="tests.test_milestone_02" name="test_error" time="0.30">
+      <error>{long}</error>
+    </testcase>
+    <testcase classname="tests.test_milestone_03" name="test_skip" time="0.00">
+      <skipped message="no NeoSlider script"/>
+    </testcase>
+  </testsuite>
+</testsuites>
+"""
+
+
+def test_junit_report_outcomes(tmp_path):
+    report = tmp_path / "junit.xml"
+    report.write_text(REPORT.format(long="x" * 2000))
+
+    result = correction.lire_junitxml(report)
+
+    assert result["summary"] == {"total": 4, "passed": 1, "failed": 2, "skipped": 1,
+                                 "duration": 1.25, "debut": result["summary"]["debut"]}
+    tests = {t["name"]: t for t in result["tests"]}
+    assert tests["test_ok"] == {"name": "test_ok", "outcome": "passed",
+                                "duration": 0.10, "message": ""}
+    assert tests["test_failure"]["message"] == "assert 1 == 2"
+    assert tests["test_error"]["outcome"] == "failed"
+    assert len(tests["test_error"]["message"]) == correction.LONGUEUR_MESSAGE
+    assert tests["test_skip"]["message"] == "no NeoSlider script"
+
+
+def test_stdout_fallback():
+    stdout = ("tests/test_milestone_01.py::test_a PASSED  [ 50%]\n"
+              "tests/test_milestone_01.py::test_b FAILED  [100%]\n")
+
+    result = correction.parser_sortie_pytest(stdout, 1)
+
+    assert result["summary"]["passed"] == result["summary"]["failed"] == 1
+    assert [t["name"] for t in result["tests"]] == ["test_a", "test_b"]
+
+
+def test_repo_grading_reads_scores_and_start_time(make_repo):
+    result = correction.executer_tests(make_repo("alice"))
+
+    assert result["summary"]["total"] == len(result["tests"]) > 0
+    assert "debut" not in result["summary"]
+    assert result["summary"]["demarrage"] >= 0
+    assert result["points"]["score"] > 0
@@ -0,0 +1,158 @@
+"""Seqlock publication of the latest AHT20 sample in shared memory (memoire_partagee.py)."""
+
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+import aht20
+import memoire_partagee
+from memoire_partagee import LecteurPartage, PublicationPartagee, SegmentOccupe
+
+ROOT = Path(memoire_partagee.__file__).parent
+
+SAMPLE = aht20.Echantillon(1700000000.0, 21.5, 44.0)
+
+
+@pytest.fixture
+def name(request):
+    name = f"aht20-test-{os.getpid()}-{request.node.name[:20]}"
+    yield name
+    Path("/dev/shm", name).unlink(missing_ok=True)
+    lock_file(name).unlink(missing_ok=True)
+
+
+def lock_file(name):
+    return memoire_partagee.DOSSIER_VERROUS / f"{name}.verrou"
+
+
+def set_sequence(segment, value):
+    memoire_partagee.SEQUENCE.pack_into(segment.buf, memoire_partagee.POSITION_SEQUENCE, value)
+
+
+def test_reader_sees_the_published_sample(name):
+    with PublicationPartagee(name) as writer, LecteurPartage(name) as reader:
+        assert reader.lire() is None
+        writer.publier(SAMPLE)
+        writer.publier(SAMPLE._replace(temperature=22.0))
+
+        number, sample = reader.lire()
+
+    assert number == 2
+    assert sample == SAMPLE._replace(temperature=22.0)
+
+
+def test_reader_without_writer(name):
+    with pytest.raises(FileNotFoundError):
+        LecteurPartage(name)
+
+
+def test_reader_retries_until_the_write_completes(name):
+    with PublicationPartagee(name) as writer, LecteurPartage(name) as reader:
+        writer.publier(SAMPLE)
+        set_sequence(writer.segment, 3)  # writer interrupted mid-write
+        finish = threading.Timer(0.05, set_sequence, (writer.segment, 4))
+        finish.start()
+
+        number, sample = reader.lire()
+        finish.join()
+
+    assert (number, sample) == (1, SAMPLE)
+
+
+def test_reader_gives_up_on_a_stuck_writer(name, monkeypatch):
+    monkeypatch.setattr(memoire_partagee, "DELAI_LECTURE", 0.02)
+    with PublicationPartagee(name) as writer, LecteurPartage(name) as reader:
+        writer.publier(SAMPLE)
+        set_sequence(writer.segment, 3)
+
+        with pytest.raises(aht20.ErreurAHT20, match="aucune lecture coherente"):
+            reader.lire()
+
+
+def test_reader_rejects_a_sample_with_a_bad_checksum(name, monkeypatch):
+    monkeypatch.setattr(memoire_partagee, "DELAI_LECTURE", 0.02)
+    with PublicationPartagee(name) as writer, LecteurPartage(name) as reader:
+        writer.publier(SAMPLE)
+        # Temperature visible before the rest of the write (weak ordering)
+        memoire_partagee.MESURE.pack_into(writer.segment.buf, memoire_partagee.POSITION_MESURE,
+                                          1, SAMPLE.horodatage, 99.0, SAMPLE.relative_humidity)
+
+        with pytest.raises(aht20.ErreurAHT20):
+            reader.lire()
+
+
+def test_second_writer_is_refused_while_the_first_is_alive(name):
+    with PublicationPartagee(name) as writer:
+        with pytest.raises(SegmentOccupe, match=str(os.getpid())):
+            PublicationPartagee(name)
+        writer.publier(SAMPLE)
+
+        with LecteurPartage(name) as reader:
+            assert reader.lire() == (1, SAMPLE)
+
+
+def test_refused_writer_does_not_open_the_segment(name, monkeypatch):
+    opened = []
+    with PublicationPartagee(name):
+        original = memoire_partagee.shared_memory.SharedMemory
+        monkeypatch.setattr(memoire_partagee.shared_memory, "SharedMemory",
+                            lambda *args, **kwargs: opened.append(kwargs) or original(*args, **kwargs))
+
+        with pytest.raises(SegmentOccupe):
+            PublicationPartagee(name)
+
+    assert opened == []
+
+
+def test_writer_removes_the_segment_it_created(name):
+    writer = PublicationPartagee(name)
+    assert lock_file(name).exists()
+
+    writer.fermer()
+
+    assert not Path("/dev/shm", name).exists()
+    assert not lock_file(name).exists()
+
+
+def crash_writer(name):
+    """Run a writer in a child process that dies without closing it."""
+    subprocess.run([sys.executable, "-c", f"""
+import os, sys
+sys.path.insert(0, {str(ROOT)!r})
+from multiprocessing import resource_tracker
+import memoire_partagee
+writer = memoire_partagee.PublicationPartagee({name!r})
+resource_tracker.unregister(writer.segment._name, "shared_memory")
+os._exit(0)
+"""], check=True)
+
+
+def test_segment_of_a_dead_writer_is_taken_over_and_removed_on_close(name):
+    crash_writer(name)
+    with LecteurPartage(name) as reader:
+        writer = PublicationPartagee(name)
+        assert writer.repris
+        writer.publier(SAMPLE)
+        assert reader.lire() == (1, SAMPLE)
+
+        writer.fermer()
+
+        assert not Path("/dev/shm", name).exists()
+        assert reader.lire() == (1, SAMPLE)  # still mapped by the reader
+
+
+def test_incompatible_segment_is_rejected(name):
+    from multiprocessing import shared_memory
+
+    old = shared_memory.SharedMemory(name=name, create=True, size=memoire_partagee.TAILLE)
+    try:
+        old.buf[:8] = b"AH20\x01\x00\x00\x00"
+        with pytest.raises(ValueError, match="format inconnu"):
+            LecteurPartage(name)
+    finally:
+        old.close()
+        old.unlink()
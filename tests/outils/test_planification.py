@@ -0,0 +1,71 @@
+"""Longest-first scheduling and adaptive timeouts (correction._corriger)."""
+
+import json
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+import correction
+
+
+class RecordingExecutor:
+    """Stand-in for ProcessPoolExecutor that runs nothing and records submissions."""
+
+    submitted = []
+
+    def __init__(self, max_workers):
+        RecordingExecutor.submitted = []
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+    def submit(self, fonction, repo_dir, delai):
+        self.submitted.append((repo_dir.name, delai))
+        future = Future()
+        future.set_result({"etudiant": repo_dir.name})
+        return future
+
+
+@pytest.mark.parametrize("duree, delai", [
+    (None, correction.DELAI_TESTS),
+    (0.5, correction.DELAI_MIN),
+    (5, 5 * correction.FACTEUR_DELAI),
+    (600, correction.DELAI_TESTS),
+])
+def test_adaptive_timeout_is_bounded(duree, delai):
+    assert correction.delai_adaptatif(duree) == delai
+
+
+def test_slowest_and_unknown_repos_start_first(monkeypatch):
+    monkeypatch.setattr(correction, "ProcessPoolExecutor", RecordingExecutor)
+    depots = [Path(name) for name in ("fast", "unknown", "slow", "medium")]
+    durees = {"fast": 1.0, "slow": 8.0, "medium": 4.0}
+
+    results = list(correction._corriger(depots, 2, "depot", durees))
+
+    assert [name for name, _ in RecordingExecutor.submitted] == ["unknown", "slow", "medium", "fast"]
+    assert dict(RecordingExecutor.submitted)["medium"] == 4.0 * correction.FACTEUR_DELAI
+    assert sorted(r["etudiant"] for r in results) == ["fast", "medium", "slow", "unknown"]
+
+
+def test_durations_are_averaged_over_graded_repos_only(tmp_path):
+    path = tmp_path / "durees.json"
+    durees = {"alice": 4.0}
+
+    correction.enregistrer_durees(path, durees, [
+        {"etudiant": "alice", "duree": 2.0},
+        {"etudiant": "bob", "duree": 3.0},
+        {"etudiant": "copy", "duree": 0.0, "doublon_de": "alice"},
+        {"etudiant": "cached", "duree": 0.0, "cache": True},
+    ])
+
+    assert correction.charger_durees(path) == {"alice": 3.0, "bob": 3.0}
+    assert json.loads(path.read_text()) == durees
+
+
+def test_unreadable_durations_are_ignored(tmp_path):
+    path = tmp_path / "durees.json"
+    path.write_text("{")
+
+    assert correction.charger_durees(path) == {}
@@ -0,0 +1,77 @@
+"""Per-phase grading timings and folded stacks (correction.ProfilPhases, ecrire_piles)."""
+
+import cProfile
+import csv
+import json
+
+import correction
+
+
+def test_phases_split_a_pytest_run():
+    phases = {"lancement": 0.1}
+    results = {"summary": {"demarrage": 0.4},
+               "tests": [{"duration": 0.2}, {"duration": 0.3}]}
+
+    correction.repartir_phases(phases, results, 1.5)
+
+    assert abs(phases["demarrage"] - 0.3) < 1e-9
+    assert phases["execution"] == 0.5
+    assert abs(phases["collecte"] - 0.6) < 1e-9
+
+
+def test_shared_session_has_no_collection_phase():
+    phases = {}
+
+    correction.repartir_phases(phases, {"tests": [{"duration": 0.2}]}, None)
+
+    assert phases == {"execution": 0.2}
+
+
+def test_jsonl_profile_and_totals(tmp_path):
+    path = tmp_path / "profil.jsonl"
+
+    with correction.ProfilPhases(path, "session") as profile:
+        profile.ajouter({"etudiant": "alice", "duree": 1.0, "phases": {"execution": 0.8}})
+        profile.ajouter({"etudiant": "bob", "cache": True, "phases": {"export": 0.1}})
+        profile.ajouter({"etudiant": "carol", "reprise": True, "phases": {"execution": 9.0}})
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(l["etudiant"], l["origine"], l["moteur"]) for l in lines] == [
+        ("alice", "execution", "session"), ("bob", "cache", "session"),
+        ("carol", "reprise", "session")]
+    assert profile.totaux["execution"] == 0.8
+    assert profile.totaux["export"] == 0.1
+
+
+def test_csv_profile_leaves_missing_phases_empty(tmp_path):
+    path = tmp_path / "profil.csv"
+
+    with correction.ProfilPhases(path) as profile:
+        profile.ajouter({"etudiant": "bob", "doublon_de": "alice", "duree": 0.0,
+                         "phases": {"rapport": 0.25}})
+
+    header, row = list(csv.reader(path.open(encoding="utf-8")))
+    assert header == ["etudiant", "origine", "moteur", "duree"] + correction.PHASES
+    line = dict(zip(header, row))
+    assert line["origine"] == "doublon"
+    assert line["rapport"] == "0.250000"
+    assert line["execution"] == ""
+
+
+def busy():
+    return sum(i * i for i in range(200_000))
+
+
+def test_folded_stacks_are_written(tmp_path):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    busy()
+    profiler.disable()
+    path = tmp_path / "piles.txt"
+
+    count = correction.ecrire_piles(profiler, path)
+
+    lines = path.read_text().splitlines()
+    assert count >= len(lines) > 0
+    assert any("(busy)" in line for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
@@ -0,0 +1,60 @@
+"""Per-student reports rendered to files (correction.rendre_rapport, EcrivainRapports)."""
+
+import pytest
+
+import correction
+
+RESULTS = {
+    "summary": {"total": 2, "passed": 1, "failed": 1, "duration": 1.5},
+    "tests": [
+        {"name": "test_aht20_imports", "outcome": "passed", "duration": 0.01, "message": ""},
+        {"name": "test_error_handling", "outcome": "failed", "duration": 0.02,
+         "message": "a | b\n<try> missing"},
+    ],
+}
+
+
+@pytest.fixture
+def notes():
+    return correction.calculer_notes(RESULTS)
+
+
+def test_markdown_report_escapes_table_cells(notes):
+    report = correction.rendre_rapport("alice", RESULTS, notes)
+
+    assert "- **Étudiant**: alice" in report
+    assert "| test_error_handling | failed | 0.020 | a \\| b<br><try> missing |" in report
+    assert f"Score global: {notes['finale']:.1f}%" in report
+
+
+def test_html_report_escapes_markup(notes):
+    report = correction.rendre_rapport("<alice>", RESULTS, notes, "html")
+
+    assert "&lt;alice&gt;" in report
+    assert "&lt;try&gt; missing" in report
+    assert "<alice>" not in report
+
+
+def test_errors_and_points_are_shown(notes):
+    points = {"score": 40, "max": 100, "bonus": 5,
+              "milestones": [{"milestone": 1, "points": 40, "max": 50}]}
+
+    report = correction.rendre_rapport("alice", dict(RESULTS, erreur="Timeout", points=points),
+                                       notes)
+
+    assert "> ❌ Timeout" in report
+    assert "**Points: 40/100** +5 bonus (J1 40/50)" in report
+
+
+@pytest.mark.parametrize("background", [True, False])
+def test_writer_renders_every_submitted_report(tmp_path, notes, background):
+    writer = correction.EcrivainRapports(tmp_path / "rapports", "html", en_arriere_plan=background)
+    for name in ("alice", "bob", "carol"):
+        writer.soumettre({"etudiant": name, "resultats": RESULTS, "notes": notes})
+    writer.soumettre({"etudiant": "broken", "resultats": RESULTS, "notes": {}})
+    writer.fermer()
+
+    assert writer.ecrits == 3
+    assert sorted(p.name for p in (tmp_path / "rapports").iterdir()) == [
+        "alice.html", "bob.html", "carol.html"]
+    assert len(writer.erreurs) == 1 and writer.erreurs[0].startswith("broken.html")
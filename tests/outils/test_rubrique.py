@@ -0,0 +1,107 @@
+"""Rubric compiled to a weight matrix (correction.calculer_notes_lot)."""
+
+import pytest
+
+import correction
+
+
+def run(outcome="passed", **overrides):
+    """Test results with every rubric test at `outcome`, except the overrides."""
+    names, _, _ = correction.compiler_rubrique()
+    return {"tests": [{"name": name, "outcome": overrides.get(name, outcome)} for name in names]}
+
+
+NO_BONUS = {name: "skipped" for name in correction.BONUS}
+
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch):
+    """Run each test with and without numpy."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(correction, "numpy", None)
+    return request.param
+
+
+def test_all_passed_is_full_marks(engine):
+    notes = correction.calculer_notes(run())
+
+    assert notes["IND-00SX-E"]["score"] == notes["IND-00SX-D"]["score"] == 100
+    assert notes["finale"] == 100
+    assert notes["tests_inconnus"] == []
+
+
+@pytest.mark.parametrize("outcome", ["skipped", "failed"])
+def test_missed_bonus_test_costs_nothing(engine, outcome):
+    notes = correction.calculer_notes(run(test_neoslider_script=outcome))
+
+    assert notes["IND-00SX-D"]["score"] == 100
+
+
+def test_passed_bonus_test_adds_points(engine):
+    missed = correction.calculer_notes(run(test_error_handling="failed", **NO_BONUS))
+    bonus = correction.calculer_notes(run(test_error_handling="failed",
+                                          **dict(NO_BONUS, test_neoslider_script="passed")))
+
+    required = sum(correction.POINTS[name] for name in correction.RUBRIQUE["IND-00SX-D"]
+                   if name not in correction.BONUS)
+    expected = 100 * (required - correction.POINTS["test_error_handling"]
+                      + correction.POINTS["test_neoslider_script"]) / required
+    assert missed["IND-00SX-D"]["score"] < bonus["IND-00SX-D"]["score"] == round(expected, 1)
+
+
+def test_skipped_required_test_counts_as_missed(engine):
+    notes = correction.calculer_notes(run(test_error_handling="skipped", **NO_BONUS))
+
+    total = sum(correction.POINTS[name] for name in correction.RUBRIQUE["IND-00SX-D"]
+                if name not in correction.BONUS)
+    expected = 100 * (total - correction.POINTS["test_error_handling"]) / total
+    assert notes["IND-00SX-D"]["score"] == round(expected, 1)
+
+
+def test_unknown_tests_are_reported(engine):
+    results = run()
+    results["tests"].append({"name": "test_extra", "outcome": "passed"})
+
+    assert correction.calculer_notes(results)["tests_inconnus"] == ["test_extra"]
+
+
+def test_zero_point_tests_are_left_out_of_the_rubric(engine):
+    results = run()
+    results["tests"].append({"name": "test_hardware_markers_present", "outcome": "failed"})
+
+    names, _, _ = correction.compiler_rubrique()
+    assert "test_hardware_markers_present" not in names
+    assert correction.calculer_notes(results) == correction.calculer_notes(run())
+
+
+def test_batch_matches_one_by_one(engine):
+    batch = [run(), run("failed"), run(test_code_quality="failed"), {"erreur": "Timeout"}]
+
+    assert correction.calculer_notes_lot(batch) == [correction.calculer_notes(r) for r in batch]
+    assert correction.calculer_notes_lot(batch)[3]["finale"] == 0
+
+
+def test_rubric_matches_canonical_tests():
+    assert correction.verifier_rubrique() == ([], [])
+
+
+def test_rubric_weights_are_the_milestone_points():
+    names, indicators, weights = correction.compiler_rubrique()
+
+    for row, name in zip(weights, names):
+        assert sorted(row, reverse=True)[0] == correction.POINTS[name]
+        assert sum(1 for weight in row if weight) <= 1
+
+
+def test_custom_rubric_weights():
+    rubric = {"A": ("test_x", "test_y"), "B": ("test_y",)}
+    points = {"test_x": 1, "test_y": 3}
+    results = {"tests": [{"name": "test_x", "outcome": "failed"},
+                         {"name": "test_y", "outcome": "passed"}]}
+
+    notes, = correction.calculer_notes_lot([results], rubric, points)
+
+    assert notes["A"]["score"] == 75.0
+    assert notes["B"]["score"] == 100.0
@@ -0,0 +1,179 @@
+"""Unix socket sensor server (serveur_capteur.py)."""
+
+import errno
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import aht20
+import serveur_capteur
+from serveur_capteur import CapteurPartage, ClientCapteur, ServeurCapteur
+
+ROOT = Path(serveur_capteur.__file__).parent
+
+
+class FakeSensor:
+    """Sensor returning a new temperature on each read, or raising."""
+
+    def __init__(self, error=None):
+        self.reads = 0
+        self.error = error
+
+    def lire(self):
+        if self.error is not None:
+            raise self.error
+        self.reads += 1
+        return aht20.Echantillon(time.time(), 20.0 + self.reads, 45.0)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return tmp_path / "aht20.sock"
+
+
+@pytest.fixture
+def serve(socket_path):
+    """Start a server on socket_path in a thread; stopped after the test."""
+    servers = []
+
+    def start(sensor):
+        server = ServeurCapteur(socket_path, CapteurPartage(sensor))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        return server
+
+    yield start
+    for server, thread in servers:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_shared_sensor_reuses_a_recent_sample():
+    shared = CapteurPartage(FakeSensor())
+
+    first = shared.mesure(age_max=60)
+    assert shared.mesure(age_max=60) == first
+    assert shared.mesure(age_max=0)[0] == first[0] + 1
+
+
+def test_client_reads_through_one_connection(serve, socket_path):
+    sensor = FakeSensor()
+    serve(sensor)
+
+    with ClientCapteur(socket_path) as client:
+        first = client.lire(age_max=0)
+        number = client.numero
+        cached = client.lire(age_max=60)
+        fresh = client.lire(age_max=0)
+
+    assert first.temperature == 21.0
+    assert cached == first and client.numero == number + 1
+    assert fresh.temperature == 22.0
+    assert sensor.reads == 2
+
+
+def test_one_shot_read(serve, socket_path):
+    serve(FakeSensor())
+
+    sample = serveur_capteur.lire(age_max=0, chemin=socket_path)
+
+    assert sample.relative_humidity == 45.0
+
+
+def test_sensor_errors_are_reported_to_the_client(serve, socket_path):
+    serve(FakeSensor(error=aht20.ErreurAHT20("CRC invalide")))
+
+    with pytest.raises(aht20.ErreurAHT20, match="Erreur de lecture du capteur"):
+        serveur_capteur.lire(chemin=socket_path)
+
+
+def test_invalid_request_closes_the_connection(serve, socket_path):
+    serve(FakeSensor())
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as raw:
+        raw.settimeout(2)
+        raw.connect(str(socket_path))
+        raw.sendall(serveur_capteur.REQUETE.pack(b"XX", serveur_capteur.VERSION, 0))
+        reply = serveur_capteur.REPONSE.unpack(raw.recv(serveur_capteur.REPONSE.size))
+        assert raw.recv(1) == b""
+
+    assert reply[:2] == (serveur_capteur.MAGIE, serveur_capteur.REQUETE_INVALIDE)
+
+
+def test_client_without_server(socket_path):
+    with pytest.raises(FileNotFoundError):
+        ClientCapteur(socket_path)
+
+
+def test_second_server_refuses_a_live_socket(serve, socket_path):
+    serve(FakeSensor())
+
+    with pytest.raises(OSError) as raised:
+        ServeurCapteur(socket_path, CapteurPartage(FakeSensor()))
+
+    assert raised.value.errno == errno.EADDRINUSE
+    assert serveur_capteur.lire(age_max=0, chemin=socket_path).temperature == 21.0
+
+
+def test_stale_socket_is_replaced(serve, socket_path):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(socket_path))
+    stale.close()
+    assert socket_path.is_socket() and not serveur_capteur.serveur_actif(socket_path)
+
+    serve(FakeSensor())
+
+    assert serveur_capteur.lire(age_max=0, chemin=socket_path).temperature == 21.0
+
+
+def test_close_keeps_a_socket_that_is_no_longer_ours(socket_path):
+    server = ServeurCapteur(socket_path, CapteurPartage(FakeSensor()))
+    socket_path.unlink()
+    replacement = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    replacement.bind(str(socket_path))
+
+    try:
+        server.server_close()
+        assert socket_path.is_socket()
+    finally:
+        replacement.close()
+
+
+def test_close_removes_our_socket(socket_path):
+    server = ServeurCapteur(socket_path, CapteurPartage(FakeSensor()))
+    server.server_close()
+
+    assert not socket_path.exists()
+
+
+def test_sigterm_stops_the_server_cleanly(socket_path):
+    segment = f"aht20-test-{os.getpid()}"
+    env = dict(os.environ, SIM_TIME_SCALE="0.1")
+    process = subprocess.Popen(
+        [sys.executable, str(ROOT / "serveur_capteur.py"), "--simulation", "--periode", "0.05",
+         "--socket", str(socket_path), "--partage", segment],
+        stdout=subprocess.PIPE, text=True, env=env,
+    )
+    try:
+        assert "pret" in process.stdout.readline()
+        assert serveur_capteur.lire(age_max=0, chemin=socket_path).temperature == \
+            pytest.approx(22.5, abs=0.01)
+        assert Path("/dev/shm", segment).exists()
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=10) == 0
+    finally:
+        process.kill()
+        process.stdout.close()
+
+    assert not socket_path.exists()
+    assert not Path("/dev/shm", segment).exists()
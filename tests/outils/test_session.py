@@ -0,0 +1,33 @@
+"""Session engine: one pytest process for many repositories (correction.py)."""
+
+import correction
+
+from .conftest import outcomes
+
+
+def test_session_matches_depot_engine(make_repo):
+    repos = [make_repo("alice"), make_repo("bob", "echec")]
+
+    session = correction.corriger_session(repos)
+    depot = [correction.corriger_depot(repo) for repo in repos]
+
+    for in_session, alone in zip(session, depot):
+        assert in_session["etudiant"] == alone["etudiant"]
+        assert outcomes(in_session) == outcomes(alone)
+        assert in_session["notes"] == alone["notes"]
+        assert in_session["resultats"]["points"] == alone["resultats"]["points"]
+
+
+def test_session_runs_only_milestone_tests(make_repo):
+    repo = make_repo("alice")
+
+    result, = correction.corriger_session([repo])
+
+    assert set(outcomes(result)) == set(correction.noms_tests_canoniques())
+
+
+def test_tool_tests_do_not_change_fingerprints():
+    sources = correction.sources_tests(correction.TESTS_CANONIQUES)
+
+    assert sources
+    assert not [p for p in sources if "outils" in p.parts]
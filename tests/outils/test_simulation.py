@@ -0,0 +1,117 @@
+"""Sandboxed student script runs and session timeouts (tests/simulation/runner.py)."""
+
+import pytest
+
+import correction
+
+from ..simulation import runner
+
+HANG = "import time\nwhile True:\n    time.sleep(1)\n"
+
+
+@pytest.fixture
+def sandboxed():
+    if runner.available_isolation() == "none":
+        pytest.skip("no sandbox available on this machine (bwrap or user namespaces)")
+
+
+def run(tmp_path, source, **options):
+    script = tmp_path / "test_aht20.py"
+    script.write_text(source)
+    return runner.run_student_script(script, **options)
+
+
+def test_script_reads_the_simulated_sensor(tmp_path):
+    result = run(tmp_path, "import board, adafruit_ahtx0\n"
+                           "print(adafruit_ahtx0.AHTx0(board.I2C()).temperature)\n",
+                 environment={"SIM_AHT20_TEMPERATURE": 21.5})
+
+    assert result.returncode == 0
+    assert float(result.output) == pytest.approx(21.5, abs=0.1)
+    assert result.isolation == runner.available_isolation()
+
+
+def test_hanging_script_is_killed_at_the_timeout(tmp_path):
+    result = run(tmp_path, HANG, timeout=0.5)
+
+    assert result.timed_out
+    assert result.duration < 3
+
+
+def test_script_closing_its_output_is_killed_at_the_timeout(tmp_path):
+    result = run(tmp_path, "import os\nos.close(1)\nos.close(2)\n" + HANG, timeout=0.5)
+
+    assert result.timed_out
+    assert result.duration < 3
+
+
+def test_unsandboxed_run_is_refused_when_isolation_is_required(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, "available_isolation", lambda: "none")
+    monkeypatch.setenv("SIM_REQUIRE_ISOLATION", "1")
+
+    with pytest.raises(runner.IsolationUnavailable, match="--sans-isolation"):
+        run(tmp_path, "print('ran')\n")
+
+    monkeypatch.setenv("SIM_REQUIRE_ISOLATION", "0")
+    result = run(tmp_path, "print('ran')\n")
+    assert (result.output, result.isolation) == ("ran\n", "none")
+
+
+def test_timeout_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv("SIM_SCRIPT_TIMEOUT", "2.5")
+    assert runner.script_timeout() == 2.5
+
+    monkeypatch.setenv("SIM_SCRIPT_TIMEOUT", "not a number")
+    assert runner.script_timeout() == runner.DEFAULT_TIMEOUT
+
+
+def test_sandbox_has_no_network(tmp_path, sandboxed):
+    result = run(tmp_path, "for line in open('/proc/net/dev').readlines()[2:]:\n"
+                           "    print(line.split(':')[0].strip())\n")
+
+    assert result.output.split() == ["lo"]
+
+
+def test_sandbox_keeps_the_repositories_read_only(tmp_path, sandboxed):
+    result = run(tmp_path, "import pathlib, sys\n"
+                           "for folder in (pathlib.Path(sys.argv[0]).parent, sys.path[0]):\n"
+                           "    try:\n"
+                           "        (pathlib.Path(folder) / 'written').write_text('x')\n"
+                           "        print('writable')\n"
+                           "    except OSError:\n"
+                           "        print('read-only')\n"
+                           "pathlib.Path('scratch').write_text('x')\n")
+
+    assert result.output.split() == ["read-only", "read-only"]
+    assert result.returncode == 0
+    assert not (tmp_path / "written").exists()
+
+
+def test_session_timeout_scales_with_the_script_timeout(monkeypatch):
+    monkeypatch.setenv("SIM_SCRIPT_TIMEOUT", "5")
+    short = correction.delai_session(40)
+    monkeypatch.setenv("SIM_SCRIPT_TIMEOUT", "20")
+
+    assert correction.delai_session(40) - short == 40 * 15
+    assert correction.delai_session(40) > 40 * 20
+
+
+def test_hanging_script_does_not_time_out_its_neighbours(make_repo, monkeypatch):
+    monkeypatch.setattr(correction, "DELAI_TESTS", 1)
+    monkeypatch.setenv("SIM_SCRIPT_TIMEOUT", "2")
+    repos = [make_repo("alice")]
+    for name in ("hang1", "hang2", "hang3"):
+        repo = make_repo(name)
+        script = repo / "test_aht20.py"
+        script.write_text(script.read_text().replace("def main():", HANG + "\n\ndef main():"))
+        repos.append(repo)
+    repos.append(make_repo("bob"))
+
+    results = correction.executer_tests_session(repos)
+
+    assert not [r for r in results.values() if "erreur" in r]
+    runs = {name: {t["name"]: t["outcome"] for t in results[str(repo)]["tests"]}
+            ["test_aht20_script_runs"] for name, repo in zip(
+                ["alice", "hang1", "hang2", "hang3", "bob"], repos)}
+    assert runs == {"alice": "passed", "hang1": "failed", "hang2": "failed",
+                    "hang3": "failed", "bob": "passed"}
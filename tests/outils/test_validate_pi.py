@@ -0,0 +1,73 @@
+"""AHT20 checks of validate_pi.py and validate_setup.py on the simulated bus."""
+
+import sys
+
+import pytest
+
+import aht20
+import validate_pi
+import validate_setup
+
+
+@pytest.fixture
+def markers(monkeypatch, tmp_path):
+    monkeypatch.setattr(validate_pi, "MARKERS_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    """Count the conversions triggered through aht20.CapteurAHT20."""
+    count = []
+    lire = aht20.CapteurAHT20.lire
+    monkeypatch.setattr(aht20.CapteurAHT20, "lire", lambda self: count.append(1) or lire(self))
+    return count
+
+
+def test_aht20_check_takes_one_reading(fake_board, markers, conversions, capsys):
+    assert validate_pi.check_aht20(fake_board.I2C()) is True
+
+    out = capsys.readouterr().out
+    assert "Temperature: 22.5 C" in out
+    assert "Conversion time:" in out
+    assert "T=22.5C" in (markers / "aht20_verified.txt").read_text()
+    assert len(conversions) == 1
+
+
+def test_aht20_check_explains_a_missing_driver(fake_board, markers, monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, "adafruit_ahtx0", None)
+
+    assert validate_pi.check_aht20(fake_board.I2C()) is False
+    out = capsys.readouterr().out
+    assert "adafruit_ahtx0 not installed" in out
+    assert "pip install adafruit-circuitpython-ahtx0" in out
+
+
+@pytest.fixture
+def stuck_conversion(monkeypatch):
+    def stuck(self, debut):
+        raise aht20.ErreurAHT20("Conversion trop longue (bit occupe toujours leve)")
+    monkeypatch.setattr(aht20.CapteurAHT20, "_attendre_scrutation", stuck)
+
+
+def test_failed_polling_reading_fails_the_check(fake_board, markers, stuck_conversion, capsys):
+    assert validate_pi.check_aht20(fake_board.I2C()) is False
+
+    assert "[FAIL] AHT20 error: Conversion trop longue" in capsys.readouterr().out
+    assert not (markers / "aht20_verified.txt").exists()
+
+
+def test_setup_aht20_check_fails_on_a_failed_reading(fake_board, stuck_conversion, capsys):
+    assert validate_setup.test_aht20(fake_board.I2C()) is False
+    assert "x AHT20 ERREUR: Conversion trop longue" in capsys.readouterr().out
+
+
+def test_setup_aht20_check(fake_board, monkeypatch, conversions, capsys):
+    assert validate_setup.test_aht20(fake_board.I2C()) is True
+    out = capsys.readouterr().out
+    assert "AHT20 OK - Temperature: 22.5C" in out and "conversion:" in out
+    assert len(conversions) == 1
+
+    monkeypatch.setitem(sys.modules, "adafruit_ahtx0", None)
+    assert validate_setup.test_aht20(fake_board.I2C()) is False
+    assert "adafruit_ahtx0 non installe" in capsys.readouterr().out
@@ -0,0 +1,175 @@
+"""Dependency-aware check engine (verifications.MoteurVerifications)."""
+
+import sys
+import threading
+import time
+
+import pytest
+
+import validate_pi
+from verifications import MoteurVerifications, Resultat, analyser_script, formater_durees, \
+    trouver_cle_ssh
+
+
+def test_dependencies_receive_their_values_in_order():
+    engine = MoteurVerifications()
+    engine.ajouter("a", lambda: 2)
+    engine.ajouter("b", lambda: 3)
+    engine.ajouter("sum", lambda b, a: (b, a), dependances=("b", "a"))
+
+    results = engine.executer()
+
+    assert list(results) == ["a", "b", "sum"]
+    assert results["sum"].valeur == (3, 2)
+
+
+def test_independent_checks_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    engine = MoteurVerifications(fils=2)
+    engine.ajouter("a", barrier.wait)
+    engine.ajouter("b", barrier.wait)
+
+    results = engine.executer()
+
+    assert all(r.erreur is None for r in results.values())
+
+
+def test_dependent_check_waits_for_its_dependencies():
+    finished = []
+    engine = MoteurVerifications(fils=4)
+    engine.ajouter("slow", lambda: time.sleep(0.05) or finished.append("slow") or True)
+    engine.ajouter("after", lambda _: finished.append("after") or True, dependances=("slow",))
+
+    engine.executer()
+
+    assert finished == ["slow", "after"]
+
+
+def test_ordering_only_dependency_waits_without_receiving_its_value():
+    finished = []
+    engine = MoteurVerifications(fils=4)
+    engine.ajouter("slow", lambda: time.sleep(0.05) or finished.append("slow") or 2)
+    engine.ajouter("fast", lambda: 3)
+    engine.ajouter("after", lambda value: finished.append("after") or value,
+                   dependances=("fast",), apres=("slow",))
+
+    results = engine.executer()
+
+    assert finished == ["slow", "after"]
+    assert results["after"].valeur == 3
+
+
+def test_concurrent_engines_keep_their_output_and_restore_stdout(capsys):
+    stdout = sys.stdout
+    barrier = threading.Barrier(2, timeout=5)
+    results = {}
+
+    def run(name, delay):
+        def check():
+            barrier.wait()
+            time.sleep(delay)
+            print(name)
+            return True
+        engine = MoteurVerifications()
+        engine.ajouter(name, check)
+        results[name] = engine.executer()[name]
+
+    threads = [threading.Thread(target=run, args=(name, delay))
+               for name, delay in (("first", 0.0), ("second", 0.1))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sys.stdout is stdout
+    assert [results[name].sortie for name in ("first", "second")] == ["first\n", "second\n"]
+    assert sorted(capsys.readouterr().out.split()) == ["first", "second"]
+
+
+def test_output_is_printed_in_declaration_order(capsys):
+    engine = MoteurVerifications(fils=2)
+    engine.ajouter("first", lambda: time.sleep(0.05) or print("first"))
+    engine.ajouter("second", lambda: print("second"))
+
+    results = engine.executer()
+
+    assert capsys.readouterr().out == "first\nsecond\n"
+    assert results["second"].sortie == "second\n"
+
+
+def test_exception_is_recorded_and_reported(capsys):
+    def broken():
+        raise RuntimeError("boom")
+
+    engine = MoteurVerifications()
+    engine.ajouter("broken", broken)
+    engine.ajouter("after", lambda value: value, dependances=("broken",))
+
+    results = engine.executer()
+
+    assert isinstance(results["broken"].erreur, RuntimeError)
+    assert not results["broken"].reussi
+    assert results["after"].valeur is None
+    assert "broken: erreur inattendue" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("name, dependencies, after", [
+    ("a", (), ()), ("b", ("missing",), ()), ("b", (), ("missing",))])
+def test_invalid_declarations_are_rejected(name, dependencies, after):
+    engine = MoteurVerifications()
+    engine.ajouter("a", lambda: True)
+
+    with pytest.raises(ValueError):
+        engine.ajouter(name, lambda *_: True, dependencies, after)
+
+
+def test_validate_pi_sensor_checks_share_the_bus_sequentially(monkeypatch, tmp_path):
+    active = []
+    overlaps = []
+
+    def sensor_check(name):
+        def check(*_):
+            active.append(name)
+            if len(active) > 1:
+                overlaps.append(tuple(active))
+            time.sleep(0.05)
+            active.remove(name)
+            return True
+        return check
+
+    monkeypatch.setattr(validate_pi, "MARKERS_DIR", tmp_path)
+    monkeypatch.setattr(validate_pi, "check_ssh_key", lambda: True)
+    monkeypatch.setattr(validate_pi, "check_i2c", lambda: object())
+    monkeypatch.setattr(validate_pi, "check_aht20", sensor_check("AHT20"))
+    monkeypatch.setattr(validate_pi, "check_neoslider", sensor_check("NeoSlider"))
+    monkeypatch.setattr(validate_pi, "check_aht20_script", lambda: True)
+
+    assert validate_pi.main() == 0
+    assert overlaps == []
+
+
+def test_formatted_durations_are_sorted():
+    lines = formater_durees({"fast": Resultat("fast", duree=0.1),
+                             "slow": Resultat("slow", duree=2.0)})
+
+    assert [line.split()[0] for line in lines] == ["slow", "fast"]
+
+
+def test_ssh_key_prefers_the_course_key(tmp_path):
+    assert trouver_cle_ssh(tmp_path) is None
+    (tmp_path / "id_rsa.pub").write_text("rsa")
+    (tmp_path / "id_ed25519_iot.pub").write_text("iot")
+
+    assert trouver_cle_ssh(tmp_path).name == "id_ed25519_iot.pub"
+
+
+def test_script_analysis(tmp_path):
+    script = tmp_path / "test_aht20.py"
+    assert not analyser_script(script).existe
+
+    script.write_text("import board\n")
+    result = analyser_script(script, ("board", "adafruit_ahtx0"))
+    assert result.valide and result.manquants == ["adafruit_ahtx0"]
+
+    script.write_text("def broken(:\n")
+    assert not analyser_script(script).valide
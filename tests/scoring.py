@@ -0,0 +1,100 @@
+"""
+Points of the milestone tests and score summary
+================================================
+
+Each test is worth the points shown in its section header in
+tests/test_milestone_0*.py. A passed test earns its points; a failed or
+skipped test earns none. Bonus tests add points on top of the milestone
+totals (25 + 35 + 40 = 100).
+
+The hooks in conftest.py record the outcome of every test and write the
+summary built here with --score-json=<file>.
+"""
+
+import re
+
+
+# Milestone number -> (title, points)
+MILESTONES = {
+    1: ("Environment Setup", 25),
+    2: ("Basic Functionality", 35),
+    3: ("Complete Implementation", 40),
+}
+
+POINTS = {
+    # Milestone 1
+    "test_aht20_script_exists": 5,
+    "test_aht20_script_syntax": 5,
+    "test_aht20_imports": 5,
+    "test_uv_dependencies": 5,
+    "test_local_tests_executed": 5,
+    # Milestone 2
+    "test_i2c_initialization": 10,
+    "test_aht20_sensor_creation": 10,
+    "test_temperature_reading": 7,
+    "test_humidity_reading": 8,
+    "test_hardware_markers_present": 0,
+    "test_aht20_script_runs": 7,
+    # Milestone 3
+    "test_main_function_exists": 10,
+    "test_error_handling": 10,
+    "test_humidity_display": 5,
+    "test_all_local_tests_passed": 10,
+    "test_neoslider_script": 5,
+    "test_code_quality": 5,
+}
+
+# Optional tests: their points are a bonus beyond the milestone total.
+# The simulated run came after the milestone 2 weights were published, so
+# it rewards a working script without taking points from the other tests.
+BONUS = {"test_aht20_script_runs", "test_neoslider_script"}
+
+MODULE_PATTERN = re.compile(r"test_milestone_(\d+)")
+
+
+def milestone_of(module_name):
+    """Milestone number of a test module (test_milestone_02 -> 2), or None."""
+    match = MODULE_PATTERN.search(module_name)
+    return int(match.group(1)) if match else None
+
+
+def summarize(outcomes):
+    """
+    Build the score summary of one repository.
+
+    Args:
+        outcomes: {test name: (milestone number, outcome)} where outcome
+            is "passed", "failed" or "skipped"
+
+    Returns:
+        dict: Score, maximum, bonus, per-milestone and per-test points
+    """
+    milestones = {
+        number: {"milestone": number, "title": title, "points": 0, "max": total,
+                 "passed": 0, "failed": 0, "skipped": 0}
+        for number, (title, total) in MILESTONES.items()
+    }
+    tests = {}
+    bonus = 0
+
+    for name, (number, outcome) in outcomes.items():
+        worth = POINTS.get(name, 0)
+        earned = worth if outcome == "passed" else 0
+        tests[name] = {"outcome": outcome, "points": earned, "max": worth}
+
+        milestone = milestones.get(number)
+        if milestone is None:
+            continue
+        milestone[outcome] += 1
+        if name in BONUS:
+            bonus += earned
+        else:
+            milestone["points"] += earned
+
+    return {
+        "score": sum(m["points"] for m in milestones.values()),
+        "max": sum(m["max"] for m in milestones.values()),
+        "bonus": bonus,
+        "milestones": list(milestones.values()),
+        "tests": tests,
+    }
@@ -0,0 +1,19 @@
+"""
+Hardware simulation for running student scripts without a Raspberry Pi
+======================================================================
+
+fakes/ holds drop-in replacements for board, busio, adafruit_ahtx0,
+adafruit_seesaw and rainbowio, backed by a virtual I2C bus with models
+of the AHT20 and of the NeoSlider's seesaw chip (see virtual_i2c.py).
+
+run_student_script() executes a script against them in a separate,
+time-limited process, sandboxed when the machine allows it (see
+runner.py), and returns its output. available_isolation() tells which
+sandbox is used.
+"""
+
+from .runner import (FAKES_DIR, IsolationUnavailable, SimulationResult, available_isolation,
+                     run_student_script, script_timeout)
+
+__all__ = ["FAKES_DIR", "IsolationUnavailable", "SimulationResult", "available_isolation",
+           "run_student_script", "script_timeout"]
@@ -0,0 +1,87 @@
+"""
+Fake adafruit_ahtx0: same command sequence as the CircuitPython driver,
+sent to the simulated AHT20 on the virtual bus.
+"""
+
+import virtual_i2c
+
+AHTX0_I2CADDR_DEFAULT = 0x38
+AHTX0_CMD_CALIBRATE = 0xBE
+AHTX0_CMD_TRIGGER = 0xAC
+AHTX0_CMD_SOFTRESET = 0xBA
+AHTX0_STATUS_BUSY = 0x80
+AHTX0_STATUS_CALIBRATED = 0x08
+
+
+class AHTx0:
+    """Interface to the AHT10/AHT20 temperature and humidity sensor."""
+
+    def __init__(self, i2c_bus, address=AHTX0_I2CADDR_DEFAULT):
+        virtual_i2c.sleep(0.02)  # 20ms delay to wake up
+        self.i2c = i2c_bus
+        self.address = address
+        self._buf = bytearray(6)
+        self.reset()
+        if not self.calibrate():
+            raise RuntimeError("Could not calibrate")
+        self._temp = None
+        self._humidity = None
+
+    def _write(self, data):
+        while not self.i2c.try_lock():
+            pass
+        try:
+            self.i2c.writeto(self.address, bytes(data))
+        finally:
+            self.i2c.unlock()
+
+    def _read(self, length):
+        while not self.i2c.try_lock():
+            pass
+        try:
+            self.i2c.readfrom_into(self.address, self._buf, end=length)
+        finally:
+            self.i2c.unlock()
+
+    def reset(self):
+        """Perform a soft-reset of the AHT."""
+        self._write([AHTX0_CMD_SOFTRESET])
+        virtual_i2c.sleep(0.02)  # 20ms delay to wake up
+
+    def calibrate(self):
+        """Ask the sensor to self-calibrate. May not 'succeed' on first try."""
+        self._write([AHTX0_CMD_CALIBRATE, 0x08, 0x00])
+        while self.status & AHTX0_STATUS_BUSY:
+            virtual_i2c.sleep(0.01)
+        return bool(self.status & AHTX0_STATUS_CALIBRATED)
+
+    @property
+    def status(self):
+        """The status byte initially returned from the sensor."""
+        self._read(1)
+        return self._buf[0]
+
+    @property
+    def relative_humidity(self):
+        """The measured relative humidity in percent."""
+        self._readdata()
+        return self._humidity
+
+    @property
+    def temperature(self):
+        """The measured temperature in degrees Celsius."""
+        self._readdata()
+        return self._temp
+
+    def _readdata(self):
+        """Internal function for triggering the AHT to read temp/humidity"""
+        self._write([AHTX0_CMD_TRIGGER, 0x33, 0x00])
+        while self.status & AHTX0_STATUS_BUSY:
+            virtual_i2c.sleep(0.01)
+        self._read(6)
+        buf = self._buf
+
+        self._humidity = (buf[1] << 12) | (buf[2] << 4) | (buf[3] >> 4)
+        self._humidity = (self._humidity * 100) / 0x100000
+        self._temp = ((buf[3] & 0xF) << 16) | (buf[4] << 8) | buf[5]
+        self._temp = ((self._temp * 200.0) / 0x100000) - 50
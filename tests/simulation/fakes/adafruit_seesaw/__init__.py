@@ -0,0 +1 @@
+"""Fake adafruit_seesaw package (simulated NeoSlider)."""
@@ -0,0 +1,70 @@
+"""Fake adafruit_seesaw.neopixel: pixel buffer written to the seesaw."""
+
+from adafruit_seesaw.seesaw import NEOPIXEL_BASE
+
+_PIN = 0x01
+_SPEED = 0x02
+_BUF_LENGTH = 0x03
+_BUF = 0x04
+_SHOW = 0x05
+
+RGB = (0, 1, 2)
+GRB = (1, 0, 2)
+RGBW = (0, 1, 2, 3)
+GRBW = (1, 0, 2, 3)
+
+
+class NeoPixel:
+    """NeoPixels driven by a seesaw chip."""
+
+    def __init__(self, seesaw, pin, n, *, bpp=None, brightness=1.0,
+                 auto_write=True, pixel_order=None):
+        self._seesaw = seesaw
+        self.n = n
+        self.pixel_order = pixel_order or GRB
+        self.bpp = bpp or len(self.pixel_order)
+        self.brightness = brightness
+        self.auto_write = auto_write
+        self._buffer = bytearray(n * self.bpp)
+
+        seesaw.write(NEOPIXEL_BASE, _PIN, bytearray([pin]))
+        seesaw.write(NEOPIXEL_BASE, _BUF_LENGTH, len(self._buffer).to_bytes(2, "big"))
+
+    def __len__(self):
+        return self.n
+
+    def _encode(self, color):
+        if isinstance(color, int):
+            color = ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+        color = [int(c * self.brightness) & 0xFF for c in color]
+        color += [0] * (self.bpp - len(color))
+        encoded = bytearray(self.bpp)
+        for i, position in enumerate(self.pixel_order):
+            encoded[position] = color[i]
+        return encoded
+
+    def __setitem__(self, index, color):
+        if isinstance(index, slice):
+            for i, c in zip(range(*index.indices(self.n)), color):
+                self[i] = c
+            return
+        if index < 0:
+            index += self.n
+        if not 0 <= index < self.n:
+            raise IndexError(index)
+        self._buffer[index * self.bpp:(index + 1) * self.bpp] = self._encode(color)
+        if self.auto_write:
+            self.show()
+
+    def fill(self, color):
+        encoded = self._encode(color)
+        self._buffer[:] = encoded * self.n
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        self._seesaw.write(NEOPIXEL_BASE, _BUF, b"\x00\x00" + self._buffer)
+        self._seesaw.write(NEOPIXEL_BASE, _SHOW)
+
+    def deinit(self):
+        self.fill(0)
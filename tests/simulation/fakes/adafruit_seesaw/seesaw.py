@@ -0,0 +1,61 @@
+"""Fake adafruit_seesaw.seesaw: register access on the virtual bus."""
+
+import virtual_i2c
+
+STATUS_BASE = 0x00
+ADC_BASE = 0x09
+NEOPIXEL_BASE = 0x0E
+
+STATUS_HW_ID = 0x01
+STATUS_SWRST = 0x7F
+ADC_CHANNEL_OFFSET = 0x07
+
+HW_ID_CODE = 0x55
+ATTINY8X7_HW_ID_CODE = 0x87
+
+
+class Seesaw:
+    """Driver for the seesaw helper chip (subset used by the NeoSlider)."""
+
+    def __init__(self, i2c_bus, addr=0x49, drdy=None, reset=True):
+        self.i2c = i2c_bus
+        self.addr = addr
+        if reset:
+            self.sw_reset()
+        chip_id = self.read8(STATUS_BASE, STATUS_HW_ID)
+        if chip_id not in (HW_ID_CODE, ATTINY8X7_HW_ID_CODE):
+            raise RuntimeError(
+                f"Seesaw hardware ID returned 0x{chip_id:x} is not correct! "
+                "Please check your wiring."
+            )
+        self.chip_id = chip_id
+
+    def sw_reset(self, post_reset_delay=0.5):
+        """Trigger a software reset of the SeeSaw chip"""
+        self.write8(STATUS_BASE, STATUS_SWRST, 0xFF)
+        virtual_i2c.sleep(post_reset_delay)
+
+    def analog_read(self, pin, delay=0.008):
+        """Read the value of an analog pin by number"""
+        buf = bytearray(2)
+        self.read(ADC_BASE, ADC_CHANNEL_OFFSET + pin, buf, delay)
+        return int.from_bytes(buf, "big")
+
+    def read8(self, reg_base, reg):
+        ret = bytearray(1)
+        self.read(reg_base, reg, ret)
+        return ret[0]
+
+    def write8(self, reg_base, reg, value):
+        self.write(reg_base, reg, bytearray([value]))
+
+    def read(self, reg_base, reg, buf, delay=0.008):
+        self.write(reg_base, reg)
+        virtual_i2c.sleep(delay)
+        self.i2c.readfrom_into(self.addr, buf)
+
+    def write(self, reg_base, reg, buf=None):
+        full_buffer = bytearray([reg_base, reg])
+        if buf is not None:
+            full_buffer += buf
+        self.i2c.writeto(self.addr, full_buffer)
@@ -0,0 +1,31 @@
+"""Fake board: Raspberry Pi pins and the default I2C bus (simulated)."""
+
+import busio
+
+
+class Pin:
+    def __init__(self, name, number):
+        self.name = name
+        self.id = number
+
+    def __repr__(self):
+        return f"board.{self.name}"
+
+
+SDA = Pin("SDA", 2)
+SCL = Pin("SCL", 3)
+D2 = SDA
+D3 = SCL
+
+_I2C = None
+
+
+def I2C():
+    """Return the board's default I2C bus (a singleton, like Blinka)."""
+    global _I2C
+    if _I2C is None:
+        _I2C = busio.I2C(SCL, SDA)
+    return _I2C
+
+
+STEMMA_I2C = I2C
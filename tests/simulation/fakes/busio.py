@@ -0,0 +1,47 @@
+"""Fake busio: I2C on the virtual bus (see virtual_i2c.py)."""
+
+import virtual_i2c
+
+
+class I2C:
+    """Subset of busio.I2C backed by the simulated bus."""
+
+    def __init__(self, scl, sda, *, frequency=100000, timeout=255):
+        self.scl = scl
+        self.sda = sda
+        self.frequency = frequency
+        self._bus = virtual_i2c.default_bus()
+        self._locked = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
+
+    def deinit(self):
+        self._locked = False
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def scan(self):
+        return self._bus.scan()
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        self._bus.write(address, bytes(buffer)[start:end])
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        end = len(buffer) if end is None else end
+        buffer[start:end] = self._bus.read(address, end - start)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None):
+        self.writeto(address, buffer_out, start=out_start, end=out_end)
+        self.readfrom_into(address, buffer_in, start=in_start, end=in_end)
@@ -0,0 +1,13 @@
+"""Fake rainbowio (CircuitPython built-in)."""
+
+
+def colorwheel(color_value):
+    """Color wheel: 0-255 to an RGB integer (red -> green -> blue -> red)."""
+    pos = int(color_value) & 0xFF
+    if pos < 85:
+        return ((255 - pos * 3) << 16) | ((pos * 3) << 8)
+    if pos < 170:
+        pos -= 85
+        return ((255 - pos * 3) << 8) | (pos * 3)
+    pos -= 170
+    return ((pos * 3) << 16) | (255 - pos * 3)
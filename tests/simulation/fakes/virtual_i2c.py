@@ -0,0 +1,238 @@
+"""
+Virtual I2C bus and device models used by the fake hardware modules.
+
+The devices follow the byte-level protocol of the real parts, so the
+fake drivers (adafruit_ahtx0, adafruit_seesaw) exercise the same
+command sequences as the CircuitPython libraries:
+
+- AHT20 (0x38): soft reset 0xBA, calibration 0xBE 0x08 0x00, measurement
+  trigger 0xAC 0x33 0x00, status byte with busy bit 0x80 and calibrated
+  bit 0x08, 6-byte frame (status, 20-bit humidity, 20-bit temperature)
+  and CRC-8, with a variable conversion time.
+- Seesaw (0x30, NeoSlider): register reads/writes (module base, function
+  address), hardware ID, software reset, ADC and NeoPixel buffer.
+
+The simulated environment is read from environment variables so that
+the test runner can choose it per student script:
+
+    SIM_TIME_SCALE        Multiplier applied to every device delay (default 1.0)
+    SIM_AHT20_TEMPERATURE Temperature in C (default 22.5)
+    SIM_AHT20_HUMIDITY    Relative humidity in % (default 45.0)
+    SIM_SEED              Seed of the conversion time jitter (default 0)
+    SIM_I2C_DEVICES       Addresses present on the bus, e.g. "38,30" (default both)
+"""
+
+import errno
+import os
+import random
+import time
+
+
+# ---------------------------------------------------------------------------
+# Bus
+# ---------------------------------------------------------------------------
+class VirtualI2CBus:
+    """An I2C bus holding device models, addressed by 7-bit address."""
+
+    def __init__(self, devices=None):
+        self.devices = dict(devices or {})
+        self.transactions = 0
+
+    def attach(self, address, device):
+        self.devices[address] = device
+
+    def scan(self):
+        return sorted(self.devices)
+
+    def _device(self, address):
+        device = self.devices.get(address)
+        if device is None:
+            # Same error as Linux i2c-dev when no device acknowledges
+            raise OSError(errno.EREMOTEIO, "Remote I/O error")
+        return device
+
+    def write(self, address, data):
+        self.transactions += 1
+        self._device(address).write(bytes(data))
+
+    def read(self, address, length):
+        self.transactions += 1
+        data = self._device(address).read(length)
+        return bytes(data[:length]).ljust(length, b"\xff")
+
+
+# ---------------------------------------------------------------------------
+# AHT20 temperature and humidity sensor
+# ---------------------------------------------------------------------------
+AHT20_ADDRESS = 0x38
+AHT20_STATUS_BUSY = 0x80
+AHT20_STATUS_CALIBRATED = 0x08
+AHT20_CMD_CALIBRATE = 0xBE
+AHT20_CMD_TRIGGER = 0xAC
+AHT20_CMD_SOFTRESET = 0xBA
+
+# Datasheet: measurement takes about 80 ms; power-on and reset 20 ms
+AHT20_CONVERSION_TIME = (0.075, 0.085)
+AHT20_RESET_TIME = 0.020
+
+
+def crc8(data):
+    """CRC-8 of the AHT20 frame (polynomial 0x31, initial value 0xFF)."""
+    crc = 0xFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x31) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+class AHT20:
+    """Model of the AHT20: one measurement per trigger, busy during conversion."""
+
+    def __init__(self, temperature=22.5, humidity=45.0, time_scale=1.0, seed=0):
+        self.temperature = temperature
+        self.humidity = humidity
+        self.time_scale = time_scale
+        self.random = random.Random(seed)
+        self.calibrated = False
+        self.ready_at = 0.0
+        self.frame = bytes(6)
+        self.pending = None
+        self.measurements = 0
+
+    def _now(self):
+        return time.monotonic()
+
+    def _busy(self):
+        return self._now() < self.ready_at
+
+    def _status(self):
+        status = AHT20_STATUS_CALIBRATED if self.calibrated else 0
+        if self._busy():
+            status |= AHT20_STATUS_BUSY
+        return status
+
+    def _encode(self):
+        humidity = min(max(self.humidity, 0.0), 100.0)
+        temperature = min(max(self.temperature, -50.0), 150.0)
+        raw_h = min(int(round(humidity * 0x100000 / 100)), 0xFFFFF)
+        raw_t = min(int(round((temperature + 50) * 0x100000 / 200)), 0xFFFFF)
+        return bytes([
+            0,
+            (raw_h >> 12) & 0xFF,
+            (raw_h >> 4) & 0xFF,
+            ((raw_h & 0x0F) << 4) | ((raw_t >> 16) & 0x0F),
+            (raw_t >> 8) & 0xFF,
+            raw_t & 0xFF,
+        ])
+
+    def write(self, data):
+        if not data:
+            return
+        command = data[0]
+        if command == AHT20_CMD_SOFTRESET:
+            self.calibrated = False
+            self.ready_at = self._now() + AHT20_RESET_TIME * self.time_scale
+        elif command == AHT20_CMD_CALIBRATE:
+            self.calibrated = True
+        elif command == AHT20_CMD_TRIGGER and data[1:3] == b"\x33\x00":
+            conversion = self.random.uniform(*AHT20_CONVERSION_TIME)
+            self.ready_at = self._now() + conversion * self.time_scale
+            self.pending = self._encode()
+            self.measurements += 1
+
+    def read(self, length):
+        if self.pending is not None and not self._busy():
+            self.frame, self.pending = self.pending, None
+        # While busy, the previous frame is returned with the busy bit set
+        frame = bytes([self._status()]) + self.frame[1:]
+        return frame + bytes([crc8(frame)])
+
+
+# ---------------------------------------------------------------------------
+# Seesaw (NeoSlider: slide potentiometer and 4 NeoPixels)
+# ---------------------------------------------------------------------------
+SEESAW_ADDRESS = 0x30
+SEESAW_STATUS_BASE = 0x00
+SEESAW_STATUS_HW_ID = 0x01
+SEESAW_STATUS_SWRST = 0x7F
+SEESAW_ADC_BASE = 0x09
+SEESAW_ADC_CHANNEL_OFFSET = 0x07
+SEESAW_NEOPIXEL_BASE = 0x0E
+SEESAW_NEOPIXEL_BUF_LENGTH = 0x03
+SEESAW_NEOPIXEL_BUF = 0x04
+SEESAW_NEOPIXEL_SHOW = 0x05
+SEESAW_HW_ID_ATTINY817 = 0x87
+
+
+class Seesaw:
+    """Model of the seesaw firmware registers used by the NeoSlider."""
+
+    def __init__(self, slider=512):
+        self.slider = slider
+        self.register = None
+        self.pixels = bytearray()
+        self.shows = 0
+        self.resets = 0
+
+    def write(self, data):
+        if len(data) < 2:
+            return
+        base, function, payload = data[0], data[1], data[2:]
+        self.register = (base, function)
+
+        if (base, function) == (SEESAW_STATUS_BASE, SEESAW_STATUS_SWRST):
+            self.resets += 1
+            self.pixels = bytearray()
+        elif base == SEESAW_NEOPIXEL_BASE:
+            if function == SEESAW_NEOPIXEL_BUF_LENGTH and len(payload) >= 2:
+                self.pixels = bytearray(int.from_bytes(payload[:2], "big"))
+            elif function == SEESAW_NEOPIXEL_BUF and len(payload) >= 2:
+                offset = int.from_bytes(payload[:2], "big")
+                end = offset + len(payload) - 2
+                if end > len(self.pixels):
+                    self.pixels.extend(bytes(end - len(self.pixels)))
+                self.pixels[offset:end] = payload[2:]
+            elif function == SEESAW_NEOPIXEL_SHOW:
+                self.shows += 1
+
+    def read(self, length):
+        if self.register == (SEESAW_STATUS_BASE, SEESAW_STATUS_HW_ID):
+            return bytes([SEESAW_HW_ID_ATTINY817])
+        if self.register is not None and self.register[0] == SEESAW_ADC_BASE:
+            return int(self.slider).to_bytes(2, "big")
+        return bytes(length)
+
+
+# ---------------------------------------------------------------------------
+# Default bus, configured from the environment
+# ---------------------------------------------------------------------------
+_BUS = None
+
+
+def time_scale():
+    return float(os.environ.get("SIM_TIME_SCALE", "1.0"))
+
+
+def sleep(seconds):
+    """time.sleep() scaled like the device delays."""
+    time.sleep(seconds * time_scale())
+
+
+def default_bus():
+    """The bus shared by every board.I2C() / busio.I2C() of the process."""
+    global _BUS
+    if _BUS is None:
+        addresses = os.environ.get("SIM_I2C_DEVICES", "38,30")
+        present = {int(a, 16) for a in addresses.split(",") if a.strip()}
+        _BUS = VirtualI2CBus()
+        if AHT20_ADDRESS in present:
+            _BUS.attach(AHT20_ADDRESS, AHT20(
+                temperature=float(os.environ.get("SIM_AHT20_TEMPERATURE", "22.5")),
+                humidity=float(os.environ.get("SIM_AHT20_HUMIDITY", "45.0")),
+                time_scale=time_scale(),
+                seed=int(os.environ.get("SIM_SEED", "0")),
+            ))
+        if SEESAW_ADDRESS in present:
+            _BUS.attach(SEESAW_ADDRESS, Seesaw())
+    return _BUS
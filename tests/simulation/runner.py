@@ -0,0 +1,252 @@
+"""
+Run a student script against the simulated hardware.
+
+The script runs in its own process (and process group), from an empty
+temporary directory, with the fake modules of fakes/ first on sys.path.
+It is killed at the timeout, or as soon as its output satisfies the
+caller's `until` condition (scripts that loop forever are normal here).
+
+Isolation depends on what the machine allows, and is reported in
+SimulationResult.isolation:
+
+    "bwrap"    bubblewrap: whole filesystem read-only except the temporary
+               directory, no network, separate PID and IPC namespaces
+    "unshare"  unshare -rnm: no network, student and grader repositories
+               read-only; the rest of the filesystem stays writable
+    "none"     NOT sandboxed: only the CPU and memory limits, the timeout
+               and the temporary working directory apply (e.g. GitHub
+               runners that forbid unprivileged user namespaces)
+
+A student running the tests on their own repository may run without a
+sandbox. Batch grading runs other people's code: correction.py sets
+$SIM_REQUIRE_ISOLATION=1 and run_student_script() then raises
+IsolationUnavailable instead of falling back to "none" (unless the
+grader passes --sans-isolation).
+
+The wall-clock limit of a run is script_timeout(): $SIM_SCRIPT_TIMEOUT,
+or DEFAULT_TIMEOUT seconds.
+"""
+
+import functools
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+FAKES_DIR = Path(__file__).resolve().parent / "fakes"
+
+# Repository holding the canonical tests and the fakes (kept read-only)
+GRADER_ROOT = FAKES_DIR.parents[2]
+
+# Wall-clock limit of a student script (seconds), see script_timeout()
+DEFAULT_TIMEOUT = 5.0
+
+# Memory limit of a student script (bytes)
+MEMORY_LIMIT = 512 * 1024 * 1024
+
+# Maximum output kept from a student script (bytes)
+OUTPUT_LIMIT = 64 * 1024
+
+# Inserts the fake modules before anything installed (e.g. Blinka on a Pi)
+BOOTSTRAP = (
+    "import runpy, sys; "
+    "sys.path.insert(0, sys.argv[1]); "
+    "script = sys.argv[2]; "
+    "sys.argv = sys.argv[2:]; "
+    "runpy.run_path(script, run_name='__main__')"
+)
+
+
+# Bind-mounts each directory before "--" read-only, then runs the command
+MOUNT_READ_ONLY = (
+    'while [ "$1" != -- ]; do '
+    'mount --bind "$1" "$1" && mount -o remount,ro,bind "$1" "$1" || exit 125; '
+    'shift; done; shift; exec "$@"'
+)
+
+
+class IsolationUnavailable(RuntimeError):
+    """No sandbox on this machine while $SIM_REQUIRE_ISOLATION is set."""
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of one simulated run."""
+
+    output: str
+    returncode: int
+    duration: float
+    timed_out: bool = False
+    stopped: bool = False
+    isolation: str = "none"
+
+
+def script_timeout():
+    """Wall-clock limit of one student script: $SIM_SCRIPT_TIMEOUT or DEFAULT_TIMEOUT."""
+    try:
+        return float(os.environ["SIM_SCRIPT_TIMEOUT"])
+    except (KeyError, ValueError):
+        return DEFAULT_TIMEOUT
+
+
+def isolation_required():
+    """Whether an unsandboxed run is refused: $SIM_REQUIRE_ISOLATION set to 1."""
+    return os.environ.get("SIM_REQUIRE_ISOLATION") == "1"
+
+
+def sandbox_command(isolation, cmd, home, read_only):
+    """
+    Wrap a command for the given isolation level.
+
+    Args:
+        isolation: "bwrap", "unshare" or "none"
+        cmd: Command to run
+        home: Writable working directory
+        read_only: Directories to make read-only ("unshare" only; bwrap
+            makes the whole filesystem read-only)
+    """
+    if isolation == "bwrap":
+        return ["bwrap", "--ro-bind", "/", "/", "--dev", "/dev", "--proc", "/proc",
+                "--tmpfs", "/tmp", "--bind", str(home), str(home),
+                "--unshare-all", "--die-with-parent", "--chdir", str(home), "--"] + cmd
+    if isolation == "unshare":
+        return (["unshare", "-rnm", "sh", "-c", MOUNT_READ_ONLY, "sh"]
+                + [str(d) for d in read_only] + ["--"] + cmd)
+    return cmd
+
+
+@functools.lru_cache(maxsize=None)
+def available_isolation():
+    """
+    Strongest isolation that works on this machine, probed once per process.
+
+    The tools may be installed but refused at run time (user namespaces
+    disabled by sysctl or AppArmor), so each one is tried for real.
+    """
+    for isolation, tool in (("bwrap", "bwrap"), ("unshare", "unshare")):
+        if shutil.which(tool) is None:
+            continue
+        with tempfile.TemporaryDirectory(prefix="simulation-") as home:
+            try:
+                probe = subprocess.run(sandbox_command(isolation, ["true"], home, [home]),
+                                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.DEVNULL, timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                continue
+        if probe.returncode == 0:
+            return isolation
+    return "none"
+
+
+def limit_resources(cpu_seconds):
+    """Child process setup: cap CPU time and memory (POSIX only)."""
+    def apply():
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (MEMORY_LIMIT, MEMORY_LIMIT))
+        except ValueError:
+            pass
+    return apply
+
+
+def run_student_script(script, timeout=None, environment=None, until=None, time_scale=0.1):
+    """
+    Run a script against the simulated I2C bus and capture its output.
+
+    Args:
+        script: Path of the student script
+        timeout: Wall-clock limit (seconds, default: script_timeout())
+        environment: Extra SIM_* variables (see fakes/virtual_i2c.py)
+        until: Optional callable(output) -> bool; stop the script once True
+        time_scale: Multiplier applied to the simulated device delays
+
+    Returns:
+        SimulationResult: Output (stdout and stderr), return code, duration,
+        isolation level
+
+    Raises:
+        IsolationUnavailable: No sandbox works here and isolation_required()
+    """
+    if timeout is None:
+        timeout = script_timeout()
+    script = Path(script).resolve()
+    isolation = available_isolation()
+    if isolation == "none" and isolation_required():
+        raise IsolationUnavailable(
+            "no sandbox available (bwrap or unshare with user namespaces): student "
+            "script not run; grade with --sans-isolation to run it unsandboxed")
+    env = {
+        "PATH": os.environ.get("PATH", ""),
+        "PYTHONUNBUFFERED": "1",
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "PYTHONIOENCODING": "utf-8",
+        "SIM_TIME_SCALE": str(time_scale),
+    }
+    env.update({key: str(value) for key, value in (environment or {}).items()})
+
+    cmd = [sys.executable, "-c", BOOTSTRAP, str(FAKES_DIR), str(script)]
+    kwargs = {}
+    if resource is not None:
+        kwargs["preexec_fn"] = limit_resources(int(timeout) + 1)
+
+    output = bytearray()
+    timed_out = stopped = False
+    start = time.monotonic()
+
+    with tempfile.TemporaryDirectory(prefix="simulation-") as home:
+        env["HOME"] = home
+        cmd = sandbox_command(isolation, cmd, home, sorted({script.parent, GRADER_ROOT}))
+        with subprocess.Popen(cmd, cwd=home, env=env, stdin=subprocess.DEVNULL,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              start_new_session=True, **kwargs) as process:
+            with selectors.DefaultSelector() as selector:
+                selector.register(process.stdout, selectors.EVENT_READ)
+                while True:
+                    remaining = timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        timed_out = True
+                        break
+                    if not selector.select(remaining):
+                        continue
+                    chunk = os.read(process.stdout.fileno(), 4096)
+                    if not chunk:
+                        break
+                    if len(output) < OUTPUT_LIMIT:
+                        output += chunk[:OUTPUT_LIMIT - len(output)]
+                    if until is not None and until(output.decode("utf-8", "replace")):
+                        stopped = True
+                        break
+
+            if not (timed_out or stopped):
+                # Output closed, but the script may still be running
+                try:
+                    process.wait(timeout=max(timeout - (time.monotonic() - start), 0))
+                except subprocess.TimeoutExpired:
+                    timed_out = True
+            if timed_out or stopped:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except (AttributeError, ProcessLookupError):
+                    process.kill()
+            process.wait()
+
+    return SimulationResult(
+        output=output.decode("utf-8", "replace"),
+        returncode=process.returncode,
+        duration=time.monotonic() - start,
+        timed_out=timed_out,
+        stopped=stopped,
+        isolation=isolation,
+    )
@@ -12,7 +12,6 @@ Hardware validation is done locally via validate_pi.py.
 """
 
 import os
-import ast
 from pathlib import Path
 
 import pytest
@@ -36,7 +35,7 @@ REPO_ROOT = get_repo_root()
 # ---------------------------------------------------------------------------
 # Test 1.1: Script Exists (5 points)
 # ---------------------------------------------------------------------------
-def test_aht20_script_exists():
+def test_aht20_script_exists(aht20_facts):
     """
     Verify that test_aht20.py exists in the repository.
 
@@ -45,9 +44,9 @@ def test_aht20_script_exists():
     Suggestion: Create a file named test_aht20.py at the repository root.
     Copy the template from modele/test_aht20.py if available.
     """
-    script_path = REPO_ROOT / "test_aht20.py"
+    script_path = aht20_facts.path
 
-    assert script_path.exists(), (
+    assert aht20_facts.exists, (
         f"\n\n"
         f"Expected: test_aht20.py file in repository root\n"
         f"Actual: File not found at {script_path}\n\n"
@@ -59,7 +58,7 @@ def test_aht20_script_exists():
 # ---------------------------------------------------------------------------
 # Test 1.2: Script Has Valid Python Syntax (5 points)
 # ---------------------------------------------------------------------------
-def test_aht20_script_syntax():
+def test_aht20_script_syntax(aht20_facts):
     """
     Verify that test_aht20.py has valid Python syntax.
 
@@ -68,16 +67,12 @@ def test_aht20_script_syntax():
     Suggestion: Check for typos, missing colons, unbalanced parentheses.
     Run 'python3 -m py_compile test_aht20.py' locally to find errors.
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found - skipping syntax check")
 
-    content = script_path.read_text()
+    e = aht20_facts.syntax_error
 
-    try:
-        ast.parse(content)
-    except SyntaxError as e:
+    if e is not None:
         pytest.fail(
             f"\n\n"
             f"Expected: Valid Python syntax\n"
@@ -94,7 +89,7 @@ def test_aht20_script_syntax():
 # ---------------------------------------------------------------------------
 # Test 1.3: Required Imports Present (5 points)
 # ---------------------------------------------------------------------------
-def test_aht20_imports():
+def test_aht20_imports(aht20_facts):
     """
     Verify that test_aht20.py imports the required libraries.
 
@@ -104,19 +99,15 @@ def test_aht20_imports():
         import board
         import adafruit_ahtx0
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found - skipping import check")
 
-    content = script_path.read_text()
-
     missing_imports = []
 
-    if "import board" not in content and "from board" not in content:
+    if not aht20_facts.imports_any("board"):
         missing_imports.append("board")
 
-    if "adafruit_ahtx0" not in content:
+    if not aht20_facts.imports_any("adafruit_ahtx0"):
         missing_imports.append("adafruit_ahtx0")
 
     if missing_imports:
@@ -133,7 +124,7 @@ def test_aht20_imports():
 # ---------------------------------------------------------------------------
 # Test 1.4: UV Dependencies Configured (5 points)
 # ---------------------------------------------------------------------------
-def test_uv_dependencies():
+def test_uv_dependencies(aht20_facts):
     """
     Verify that UV inline dependencies are configured in the script.
 
@@ -145,15 +136,11 @@ def test_uv_dependencies():
         # dependencies = ["adafruit-circuitpython-ahtx0", "adafruit-blinka"]
         # ///
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found - skipping UV check")
 
-    content = script_path.read_text()
-
-    has_uv_block = "# /// script" in content or "dependencies" in content
-    has_ahtx0_dep = "adafruit-circuitpython-ahtx0" in content or "adafruit_ahtx0" in content
+    # The UV block is made of comments: it is only visible in the source text
+    has_uv_block = aht20_facts.contains("# /// script", "dependencies")
 
     if not has_uv_block:
         pytest.fail(
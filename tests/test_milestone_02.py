@@ -7,17 +7,20 @@ This milestone verifies that the student has:
 2. Used I2C communication correctly
 3. Created proper temperature/humidity reading functions
 
-These tests analyze code structure - actual hardware testing
-is done locally via validate_pi.py.
+These tests analyze code structure and run the script against a
+simulated AHT20 (tests/simulation) - actual hardware testing is done
+locally via validate_pi.py.
 """
 
 import os
-import ast
+import random
 import re
 from pathlib import Path
 
 import pytest
 
+from .simulation import IsolationUnavailable, run_student_script
+
 
 # ---------------------------------------------------------------------------
 # Helper: Get repository root
@@ -36,7 +39,7 @@ REPO_ROOT = get_repo_root()
 # ---------------------------------------------------------------------------
 # Test 2.1: I2C Initialization (10 points)
 # ---------------------------------------------------------------------------
-def test_i2c_initialization():
+def test_i2c_initialization(aht20_facts):
     """
     Verify that the script initializes I2C communication.
 
@@ -45,18 +48,13 @@ def test_i2c_initialization():
     Suggestion: Initialize I2C with:
         i2c = board.I2C()
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found")
 
-    content = script_path.read_text()
-
     # Check for I2C initialization patterns
     has_i2c = any([
-        "board.I2C()" in content,
-        "busio.I2C" in content,
-        "board.SCL" in content,
+        aht20_facts.calls_any("board.I2C", "busio.I2C"),
+        "SCL" in aht20_facts.attributes,
     ])
 
     if not has_i2c:
@@ -75,7 +73,7 @@ def test_i2c_initialization():
 # ---------------------------------------------------------------------------
 # Test 2.2: AHT20 Sensor Object Creation (10 points)
 # ---------------------------------------------------------------------------
-def test_aht20_sensor_creation():
+def test_aht20_sensor_creation(aht20_facts):
     """
     Verify that the script creates an AHT20 sensor object.
 
@@ -84,17 +82,14 @@ def test_aht20_sensor_creation():
     Suggestion: Create sensor with:
         sensor = adafruit_ahtx0.AHTx0(i2c)
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found")
 
-    content = script_path.read_text()
-
     # Check for sensor creation patterns
     has_sensor = any([
-        "AHTx0(" in content,
-        "adafruit_ahtx0." in content and "i2c" in content.lower(),
+        aht20_facts.calls_any("AHTx0"),
+        any(call.startswith("adafruit_ahtx0.") for call in aht20_facts.calls)
+        and aht20_facts.mentions("i2c"),
     ])
 
     if not has_sensor:
@@ -111,7 +106,7 @@ def test_aht20_sensor_creation():
 # ---------------------------------------------------------------------------
 # Test 2.3: Temperature Reading (7 points)
 # ---------------------------------------------------------------------------
-def test_temperature_reading():
+def test_temperature_reading(aht20_facts):
     """
     Verify that the script reads temperature from the sensor.
 
@@ -121,16 +116,12 @@ def test_temperature_reading():
         temp = sensor.temperature
         print(f"Temperature: {temp:.1f} C")
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found")
 
-    content = script_path.read_text()
-
     has_temp = any([
-        ".temperature" in content,
-        "temperature" in content.lower() and "sensor" in content.lower(),
+        "temperature" in aht20_facts.attributes,
+        aht20_facts.mentions("temperature", "sensor"),
     ])
 
     if not has_temp:
@@ -147,7 +138,7 @@ def test_temperature_reading():
 # ---------------------------------------------------------------------------
 # Test 2.4: Humidity Reading (8 points)
 # ---------------------------------------------------------------------------
-def test_humidity_reading():
+def test_humidity_reading(aht20_facts):
     """
     Verify that the script reads humidity from the sensor.
 
@@ -157,16 +148,12 @@ def test_humidity_reading():
         humidity = sensor.relative_humidity
         print(f"Humidite: {humidity:.1f} %")
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found")
 
-    content = script_path.read_text()
-
     has_humidity = any([
-        ".relative_humidity" in content,
-        "humidity" in content.lower() and "sensor" in content.lower(),
+        "relative_humidity" in aht20_facts.attributes,
+        aht20_facts.mentions("humidity", "sensor"),
     ])
 
     if not has_humidity:
@@ -221,3 +208,81 @@ def test_hardware_markers_present():
             f"  4. Run: python3 validate_pi.py\n"
             f"  5. Commit and push .test_markers/\n"
         )
+
+
+# ---------------------------------------------------------------------------
+# Test 2.6: Script Runs Against a Simulated AHT20 (Bonus - 7 points)
+# ---------------------------------------------------------------------------
+TEMPERATURE_LINE = re.compile(r"temp[eé]rature\s*:\s*(-?\d+(?:[.,]\d+)?)", re.IGNORECASE)
+HUMIDITY_LINE = re.compile(r"humidit[eéy]\s*:\s*(\d+(?:[.,]\d+)?)", re.IGNORECASE)
+
+# Printed values are rounded by the student (e.g. :.1f)
+READING_TOLERANCE = 0.15
+
+
+def read_value(pattern, output):
+    match = pattern.search(output)
+    return float(match.group(1).replace(",", ".")) if match else None
+
+
+def test_aht20_script_runs(aht20_facts):
+    """
+    Verify that test_aht20.py runs and prints the sensor readings.
+
+    Expected: 'Temperature: <value>' and 'Humidite: <value>' lines with
+    the values measured by the (simulated) AHT20
+
+    Suggestion: Run your script on the Raspberry Pi:
+        uv run test_aht20.py
+    """
+    if not aht20_facts.exists:
+        pytest.skip("test_aht20.py not found")
+    if aht20_facts.syntax_error is not None:
+        pytest.skip("test_aht20.py has a syntax error - see test_aht20_script_syntax")
+
+    # Conditions chosen per repository, so that hard-coded values fail
+    conditions = random.Random(aht20_facts.path.parent.name)
+    temperature = round(conditions.uniform(15.0, 30.0), 2)
+    humidity = round(conditions.uniform(30.0, 70.0), 2)
+
+    try:
+        result = run_student_script(
+            aht20_facts.path,
+            environment={
+                "SIM_AHT20_TEMPERATURE": temperature,
+                "SIM_AHT20_HUMIDITY": humidity,
+            },
+            until=lambda output: bool(TEMPERATURE_LINE.search(output)
+                                      and HUMIDITY_LINE.search(output)),
+        )
+    except IsolationUnavailable as error:
+        pytest.skip(str(error))
+
+    printed_temperature = read_value(TEMPERATURE_LINE, result.output)
+    printed_humidity = read_value(HUMIDITY_LINE, result.output)
+    last_lines = "\n".join(result.output.strip().splitlines()[-8:]) or "(no output)"
+
+    if printed_temperature is None or printed_humidity is None:
+        status = (f"stopped after {result.duration:.0f} s (timeout)" if result.timed_out
+                  else f"exit code {result.returncode}")
+        pytest.fail(
+            f"\n\n"
+            f"Expected: 'Temperature: ...' and 'Humidite: ...' lines in the output\n"
+            f"Actual: Script {status}, output:\n"
+            f"{last_lines}\n\n"
+            f"Suggestion: Print both readings, for example:\n"
+            f"  print(f\"Temperature: {{sensor.temperature:.1f}} C\")\n"
+            f"  print(f\"Humidite: {{sensor.relative_humidity:.1f}} %\")\n"
+        )
+
+    if (abs(printed_temperature - temperature) > READING_TOLERANCE
+            or abs(printed_humidity - humidity) > READING_TOLERANCE):
+        pytest.fail(
+            f"\n\n"
+            f"Expected: Temperature {temperature:.1f} C and humidity {humidity:.1f} % "
+            f"(simulated sensor)\n"
+            f"Actual: Temperature {printed_temperature} and humidity {printed_humidity}\n\n"
+            f"Suggestion: Print the values read from the sensor, not fixed values:\n"
+            f"  temperature = sensor.temperature\n"
+            f"  humidity = sensor.relative_humidity\n"
+        )
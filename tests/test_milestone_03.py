@@ -12,7 +12,6 @@ These tests verify code completeness and best practices.
 """
 
 import os
-import ast
 import re
 from pathlib import Path
 
@@ -36,7 +35,7 @@ REPO_ROOT = get_repo_root()
 # ---------------------------------------------------------------------------
 # Test 3.1: Main Function Structure (10 points)
 # ---------------------------------------------------------------------------
-def test_main_function_exists():
+def test_main_function_exists(aht20_facts):
     """
     Verify that the script has a main() function.
 
@@ -49,15 +48,11 @@ def test_main_function_exists():
         if __name__ == "__main__":
             main()
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found")
 
-    content = script_path.read_text()
-
-    has_main = "def main(" in content or "def main():" in content
-    has_guard = '__name__' in content and '__main__' in content
+    has_main = "main" in aht20_facts.functions
+    has_guard = aht20_facts.has_main_guard
 
     if not has_main:
         pytest.fail(
@@ -90,7 +85,7 @@ def test_main_function_exists():
 # ---------------------------------------------------------------------------
 # Test 3.2: Error Handling (10 points)
 # ---------------------------------------------------------------------------
-def test_error_handling():
+def test_error_handling(aht20_facts):
     """
     Verify that the script includes error handling.
 
@@ -102,17 +97,10 @@ def test_error_handling():
         except Exception as e:
             print(f"Error: {e}")
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found")
 
-    content = script_path.read_text()
-
-    has_try = "try:" in content
-    has_except = "except" in content
-
-    if not (has_try and has_except):
+    if not aht20_facts.try_except_blocks:
         pytest.fail(
             f"\n\n"
             f"Expected: Error handling with try/except blocks\n"
@@ -131,7 +119,7 @@ def test_error_handling():
 # ---------------------------------------------------------------------------
 # Test 3.3: Humidity Display Format (5 points)
 # ---------------------------------------------------------------------------
-def test_humidity_display():
+def test_humidity_display(aht20_facts):
     """
     Verify that the script displays formatted humidity output.
 
@@ -140,16 +128,12 @@ def test_humidity_display():
     Suggestion: Display humidity like this:
         print(f"Humidite: {sensor.relative_humidity:.1f} %")
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found")
 
-    content = script_path.read_text()
-
     has_humidity_display = (
-        ".relative_humidity" in content
-        and ("%" in content or "humidite" in content.lower())
+        "relative_humidity" in aht20_facts.attributes
+        and (aht20_facts.contains("%") or aht20_facts.mentions("humidite"))
     )
 
     if not has_humidity_display:
@@ -212,7 +196,7 @@ def test_all_local_tests_passed():
 # ---------------------------------------------------------------------------
 # Test 3.5: NeoSlider Script (Optional - 5 points)
 # ---------------------------------------------------------------------------
-def test_neoslider_script():
+def test_neoslider_script(neoslider_facts):
     """
     Verify NeoSlider script exists (optional bonus).
 
@@ -220,18 +204,14 @@ def test_neoslider_script():
 
     Suggestion: Create test_neoslider.py to control the NeoSlider.
     """
-    script_path = REPO_ROOT / "test_neoslider.py"
-
-    if not script_path.exists():
+    if not neoslider_facts.exists:
         pytest.skip(
             "test_neoslider.py not found - this is optional bonus content"
         )
 
-    content = script_path.read_text()
+    e = neoslider_facts.syntax_error
 
-    try:
-        ast.parse(content)
-    except SyntaxError as e:
+    if e is not None:
         pytest.fail(
             f"\n\n"
             f"Expected: Valid Python syntax in test_neoslider.py\n"
@@ -240,7 +220,7 @@ def test_neoslider_script():
         )
 
     # Check for required imports
-    if "adafruit_seesaw" not in content:
+    if not neoslider_facts.imports_any("adafruit_seesaw"):
         pytest.fail(
             f"\n\n"
             f"Expected: adafruit_seesaw import for NeoSlider\n"
@@ -254,7 +234,7 @@ def test_neoslider_script():
 # ---------------------------------------------------------------------------
 # Test 3.6: Code Quality Check (5 points)
 # ---------------------------------------------------------------------------
-def test_code_quality():
+def test_code_quality(aht20_facts):
     """
     Verify basic code quality standards.
 
@@ -262,16 +242,12 @@ def test_code_quality():
 
     Suggestion: Add documentation to your code.
     """
-    script_path = REPO_ROOT / "test_aht20.py"
-
-    if not script_path.exists():
+    if not aht20_facts.exists:
         pytest.skip("test_aht20.py not found")
 
-    content = script_path.read_text()
-
     # Check for docstring or comments
-    has_docstring = '"""' in content or "'''" in content
-    has_comments = content.count("#") >= 3  # At least 3 comment lines
+    has_docstring = aht20_facts.docstrings > 0
+    has_comments = aht20_facts.comments >= 3  # At least 3 comment lines
 
     if not (has_docstring or has_comments):
         pytest.fail(
@@ -24,10 +24,13 @@ After running successfully, commit and push the .test_markers/ folder.
 
 import os
 import sys
-import subprocess
 from pathlib import Path
 from datetime import datetime
 
+from aht20 import MODE_SCRUTATION, CapteurAHT20
+from verifications import MoteurVerifications, analyser_script, connexion_github, \
+    formater_durees, trouver_cle_ssh
+
 
 # ---------------------------------------------------------------------------
 # Terminal Colors
@@ -85,19 +88,7 @@ def check_ssh_key():
     """Verify SSH key exists and GitHub connection works."""
     header("SSH KEY VERIFICATION")
 
-    ssh_dir = Path.home() / ".ssh"
-    key_files = [
-        "id_ed25519_iot.pub",  # Recommended for this course
-        "id_ed25519.pub",
-        "id_rsa.pub",
-    ]
-
-    key_found = None
-    for key_name in key_files:
-        key_path = ssh_dir / key_name
-        if key_path.exists():
-            key_found = key_path
-            break
+    key_found = trouver_cle_ssh()
 
     if not key_found:
         fail("No SSH public key found")
@@ -112,10 +103,7 @@ def check_ssh_key():
 
     # Test GitHub connection
     try:
-        result = subprocess.run(
-            ['ssh', '-T', 'git@github.com'],
-            capture_output=True, text=True, timeout=10
-        )
+        result = connexion_github()
         if 'successfully authenticated' in result.stderr.lower():
             success("GitHub SSH connection works")
             create_marker("ssh_key_verified", f"Key: {key_found.name}")
@@ -162,14 +150,15 @@ def check_aht20(i2c):
         return False
 
     try:
-        import adafruit_ahtx0
+        import adafruit_ahtx0  # noqa: F401 - driver used by test_aht20.py
 
-        sensor = adafruit_ahtx0.AHTx0(i2c)
+        # One conversion, read directly on the bus as soon as it ends
+        # (polling, see aht20.py); a failed reading fails the check
+        sensor = CapteurAHT20(i2c, mode=MODE_SCRUTATION)
         info("AHT20 found at address 0x38")
-
-        # Read values
-        temp = sensor.temperature
-        humidity = sensor.relative_humidity
+        sample = sensor.lire()
+        temp = sample.temperature
+        humidity = sample.relative_humidity
 
         # Sanity checks
         assert -40 <= temp <= 85, f"Temperature out of range: {temp}"
@@ -177,6 +166,7 @@ def check_aht20(i2c):
 
         success(f"Temperature: {temp:.1f} C")
         success(f"Humidity: {humidity:.1f} %")
+        info(f"Conversion time: {sensor.latences.maximum * 1000:.1f} ms")
 
         create_marker("aht20_verified", f"T={temp:.1f}C H={humidity:.1f}%")
         return True
@@ -243,9 +233,14 @@ def check_aht20_script():
     """Verify test_aht20.py script."""
     header("SCRIPT VALIDATION")
 
-    script_path = Path(__file__).parent / "test_aht20.py"
+    checks = [
+        ("import board", "board import"),
+        ("adafruit_ahtx0", "adafruit_ahtx0 import"),
+    ]
+    script = analyser_script(Path(__file__).parent / "test_aht20.py",
+                             [pattern for pattern, _ in checks])
 
-    if not script_path.exists():
+    if not script.existe:
         fail("test_aht20.py not found")
         print("\n  Create your test_aht20.py script in the same folder.")
         return False
@@ -253,28 +248,20 @@ def check_aht20_script():
     success("test_aht20.py exists")
 
     # Check syntax
-    try:
-        with open(script_path) as f:
-            compile(f.read(), script_path, 'exec')
-        success("Python syntax is valid")
-    except SyntaxError as e:
+    e = script.erreur_syntaxe
+    if e is not None:
         fail(f"Syntax error on line {e.lineno}: {e.msg}")
         return False
+    success("Python syntax is valid")
 
     # Check required content
-    content = script_path.read_text()
-    checks = [
-        ("import board", "board import"),
-        ("adafruit_ahtx0", "adafruit_ahtx0 import"),
-    ]
-
     all_present = True
     for pattern, desc in checks:
-        if pattern in content:
-            success(f"Found: {desc}")
-        else:
+        if pattern in script.manquants:
             fail(f"Missing: {desc}")
             all_present = False
+        else:
+            success(f"Found: {desc}")
 
     if all_present:
         create_marker("aht20_script_verified", "Script structure valid")
@@ -289,19 +276,28 @@ def main():
     print(f"\n{Colors.BOLD}Formatif F1 - Local Hardware Validation{Colors.END}")
     print(f"{'='*60}\n")
 
-    results = {}
+    # Independent checks run concurrently; the sensor checks wait for I2C
+    # and share its bus one after the other (the bus object is not safe to
+    # drive from two threads at once)
+    engine = MoteurVerifications()
+    engine.ajouter("SSH", check_ssh_key)
+    engine.ajouter("I2C", check_i2c)
+    engine.ajouter("AHT20", check_aht20, dependances=("I2C",))
+    engine.ajouter("NeoSlider", check_neoslider, dependances=("I2C",), apres=("AHT20",))
+    engine.ajouter("Script", check_aht20_script)
+    checks = engine.executer()
 
-    # Run all checks
-    results["SSH"] = check_ssh_key()
-    i2c = check_i2c()
-    results["I2C"] = i2c is not None
-    results["AHT20"] = check_aht20(i2c)
-    results["NeoSlider"] = check_neoslider(i2c)
-    results["Script"] = check_aht20_script()
+    results = {name: check.reussi for name, check in checks.items()}
+    results["I2C"] = checks["I2C"].erreur is None and checks["I2C"].valeur is not None
 
     # Summary
     header("FINAL RESULTS")
 
+    print("Check durations:")
+    for line in formater_durees(checks):
+        print(line)
+    print()
+
     all_required_passed = results["SSH"] and results["I2C"] and results["AHT20"] and results["Script"]
 
     for test, passed in results.items():
@@ -6,6 +6,8 @@
 
 import sys
 
+from aht20 import MODE_SCRUTATION, CapteurAHT20
+
 def test_i2c():
     """Test de la communication I2C."""
     try:
@@ -20,12 +22,20 @@ def test_i2c():
 def test_aht20(i2c):
     """Test du capteur AHT20."""
     try:
-        import adafruit_ahtx0
-        sensor = adafruit_ahtx0.AHTx0(i2c)
-        temp = sensor.temperature
-        humidity = sensor.relative_humidity
-        print(f"+ AHT20 OK - Temperature: {temp:.1f}C, Humidite: {humidity:.1f}%")
+        import adafruit_ahtx0  # noqa: F401 - pilote utilise par test_aht20.py
+
+        # Une seule conversion, lue directement sur le bus des qu'elle est
+        # terminee (scrutation, voir aht20.py); un echec fait echouer le test
+        capteur = CapteurAHT20(i2c, mode=MODE_SCRUTATION)
+        echantillon = capteur.lire()
+        print(f"+ AHT20 OK - Temperature: {echantillon.temperature:.1f}C, "
+              f"Humidite: {echantillon.relative_humidity:.1f}%, "
+              f"conversion: {capteur.latences.maximum * 1000:.1f} ms")
         return True
+    except ImportError:
+        print("x AHT20 ERREUR: adafruit_ahtx0 non installe "
+              "(pip install adafruit-circuitpython-ahtx0)")
+        return False
     except Exception as e:
         print(f"x AHT20 ERREUR: {e}")
         return False
@@ -0,0 +1,319 @@
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Moteur de verifications pour run_tests.py et validate_pi.py
+
+Chaque verification declare les verifications dont elle depend (AHT20
+depend de I2C, le resume depend de toutes les autres). Les verifications
+independantes s'executent en parallele dans un pool de fils: la duree
+totale devient celle de la plus longue chaine de dependances au lieu de
+la somme (le test SSH vers GitHub peut bloquer 10 s a lui seul).
+
+Une verification est une fonction qui recoit, dans l'ordre declare, les
+valeurs retournees par ses dependances. Elle peut aussi attendre d'autres
+verifications sans recevoir leur valeur (apres=..., ex. deux capteurs
+sur le meme bus I2C). Ce qu'elle affiche est capture par fil puis
+reimprime dans l'ordre de declaration: la sortie reste lisible et
+identique a une execution sequentielle.
+
+Le module regroupe aussi les petites fonctions communes aux deux scripts
+(cle SSH, connexion GitHub, syntaxe et contenu des scripts etudiants).
+"""
+
+import io
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+# Cles SSH cherchees, dans l'ordre (la premiere est celle du cours)
+CLES_SSH = ("id_ed25519_iot.pub", "id_ed25519.pub", "id_rsa.pub")
+
+# Delai du test de connexion ssh -T git@github.com (secondes)
+DELAI_GITHUB = 10
+
+
+# ---------------------------------------------------------------------------
+# Fonctions communes
+# ---------------------------------------------------------------------------
+def trouver_cle_ssh(dossier=None):
+    """
+    Cherche la cle SSH publique de l'etudiant.
+
+    Args:
+        dossier: Dossier des cles (defaut: ~/.ssh)
+
+    Returns:
+        Path: Premiere cle trouvee parmi CLES_SSH, ou None
+    """
+    dossier = Path(dossier) if dossier else Path.home() / ".ssh"
+    for nom in CLES_SSH:
+        chemin = dossier / nom
+        if chemin.exists():
+            return chemin
+    return None
+
+
+def connexion_github(delai=DELAI_GITHUB):
+    """
+    Teste l'authentification SSH aupres de GitHub.
+
+    GitHub refuse l'ouverture d'un shell: ssh retourne 1 meme quand la
+    cle est acceptee; le message "successfully authenticated" est dans
+    stderr.
+
+    Returns:
+        subprocess.CompletedProcess: Resultat de ssh -T git@github.com
+
+    Raises:
+        subprocess.TimeoutExpired: Pas de reponse avant le delai
+        FileNotFoundError: ssh n'est pas installe
+    """
+    return subprocess.run(
+        ['ssh', '-T', 'git@github.com'],
+        capture_output=True, text=True, timeout=delai
+    )
+
+
+@dataclass
+class ScriptEtudiant:
+    """Etat d'un script etudiant: existence, syntaxe et motifs absents."""
+
+    chemin: Path
+    existe: bool
+    contenu: str = ""
+    erreur_syntaxe: Optional[SyntaxError] = None
+    manquants: list = field(default_factory=list)
+
+    @property
+    def valide(self):
+        return self.existe and self.erreur_syntaxe is None
+
+
+def analyser_script(chemin, motifs=()):
+    """
+    Lit un script, verifie sa syntaxe et cherche des motifs dans son texte.
+
+    Args:
+        chemin: Chemin du script
+        motifs: Textes attendus (ex. 'board', 'adafruit_ahtx0')
+
+    Returns:
+        ScriptEtudiant: Etat du script
+    """
+    chemin = Path(chemin)
+    if not chemin.exists():
+        return ScriptEtudiant(chemin, existe=False)
+
+    contenu = chemin.read_text()
+    try:
+        compile(contenu, str(chemin), 'exec')
+    except SyntaxError as e:
+        return ScriptEtudiant(chemin, existe=True, contenu=contenu, erreur_syntaxe=e)
+
+    manquants = [motif for motif in motifs if motif not in contenu]
+    return ScriptEtudiant(chemin, existe=True, contenu=contenu, manquants=manquants)
+
+
+# ---------------------------------------------------------------------------
+# Capture de la sortie par fil
+# ---------------------------------------------------------------------------
+class _SortieParFil(io.TextIOBase):
+    """
+    sys.stdout qui ecrit dans le tampon du fil courant, s'il en a un.
+
+    Une seule instance est installee a la fois (voir _capture_par_fil),
+    partagee par les moteurs qui s'executent en meme temps: les tampons
+    sont propres a chaque fil, et les fils sans tampon ecrivent dans la
+    sortie d'origine.
+    """
+
+    def __init__(self, originale):
+        self.originale = originale
+        self.local = threading.local()
+
+    def write(self, texte):
+        tampon = getattr(self.local, "tampon", None)
+        if tampon is None:
+            return self.originale.write(texte)
+        return tampon.write(texte)
+
+    def flush(self):
+        if getattr(self.local, "tampon", None) is None:
+            self.originale.flush()
+
+    def capturer(self):
+        self.local.tampon = io.StringIO()
+
+    def liberer(self):
+        tampon, self.local.tampon = self.local.tampon, None
+        return tampon.getvalue()
+
+
+_verrou_sortie = threading.Lock()
+_sortie_installee = None
+_utilisateurs_sortie = 0
+
+
+@contextmanager
+def _capture_par_fil():
+    """
+    Installe le _SortieParFil commun comme sys.stdout le temps du bloc.
+
+    Le remplacement de sys.stdout est global au processus: il est fait
+    une fois, sous verrou, pour tous les moteurs en cours, et annule par
+    le dernier (sauf si sys.stdout a ete remplace entre-temps).
+    """
+    global _sortie_installee, _utilisateurs_sortie
+    with _verrou_sortie:
+        if _utilisateurs_sortie == 0:
+            _sortie_installee = _SortieParFil(sys.stdout)
+            sys.stdout = _sortie_installee
+        _utilisateurs_sortie += 1
+        sortie = _sortie_installee
+    try:
+        yield sortie
+    finally:
+        with _verrou_sortie:
+            _utilisateurs_sortie -= 1
+            if _utilisateurs_sortie == 0:
+                if sys.stdout is sortie:
+                    sys.stdout = sortie.originale
+                _sortie_installee = None
+
+
+# ---------------------------------------------------------------------------
+# Moteur
+# ---------------------------------------------------------------------------
+@dataclass
+class Verification:
+    """Une verification et les noms des verifications dont elle depend."""
+
+    nom: str
+    fonction: Callable[..., Any]
+    dependances: tuple = ()
+    apres: tuple = ()
+
+
+@dataclass
+class Resultat:
+    """Resultat d'une verification."""
+
+    nom: str
+    valeur: Any = None
+    duree: float = 0.0
+    sortie: str = ""
+    erreur: Optional[BaseException] = None
+
+    @property
+    def reussi(self):
+        return self.erreur is None and bool(self.valeur)
+
+
+class MoteurVerifications:
+    """
+    Execute des verifications en respectant leurs dependances.
+
+    Args:
+        fils: Nombre maximal de verifications simultanees
+    """
+
+    def __init__(self, fils=4):
+        self.fils = fils
+        self.verifications = {}
+
+    def ajouter(self, nom, fonction, dependances=(), apres=()):
+        """
+        Declare une verification.
+
+        Args:
+            nom: Nom unique (sert de cle des resultats)
+            fonction: Appelee avec les valeurs des dependances, dans l'ordre
+            dependances: Noms de verifications deja declarees
+            apres: Verifications deja declarees a attendre, sans recevoir
+                leur valeur (ordre seulement)
+        """
+        if nom in self.verifications:
+            raise ValueError(f"Verification en double: {nom}")
+        inconnues = [d for d in (*dependances, *apres) if d not in self.verifications]
+        if inconnues:
+            # Declarer les dependances d'abord exclut aussi les cycles
+            raise ValueError(f"{nom}: dependances inconnues {inconnues}")
+        self.verifications[nom] = Verification(nom, fonction, tuple(dependances), tuple(apres))
+
+    def _executer_une(self, verification, arguments, sortie):
+        sortie.capturer()
+        debut = time.perf_counter()
+        resultat = Resultat(verification.nom)
+        try:
+            resultat.valeur = verification.fonction(*arguments)
+        except Exception as e:
+            resultat.erreur = e
+        resultat.duree = time.perf_counter() - debut
+        resultat.sortie = sortie.liberer()
+        return resultat
+
+    def executer(self):
+        """
+        Execute toutes les verifications.
+
+        La sortie de chaque verification est imprimee des que celle-ci et
+        toutes celles declarees avant elle sont terminees.
+
+        Returns:
+            dict: {nom: Resultat}, dans l'ordre de declaration
+        """
+        ordre = list(self.verifications)
+        resultats = {}
+        en_cours = {}
+        imprimees = 0
+
+        # La sortie reimprimee passe par le proxy: un moteur lance depuis une
+        # verification reste capture par le fil de celle-ci
+        with _capture_par_fil() as sortie, ThreadPoolExecutor(max_workers=self.fils) as pool:
+            while len(resultats) < len(ordre):
+                for nom in ordre:
+                    verification = self.verifications[nom]
+                    if nom in resultats or nom in en_cours.values():
+                        continue
+                    if all(d in resultats for d in verification.dependances + verification.apres):
+                        arguments = [resultats[d].valeur for d in verification.dependances]
+                        future = pool.submit(self._executer_une, verification, arguments, sortie)
+                        en_cours[future] = nom
+
+                terminees, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+                for future in terminees:
+                    resultats[en_cours.pop(future)] = future.result()
+
+                while imprimees < len(ordre) and ordre[imprimees] in resultats:
+                    resultat = resultats[ordre[imprimees]]
+                    sortie.write(resultat.sortie)
+                    if resultat.erreur is not None:
+                        sortie.write(f"{resultat.nom}: erreur inattendue: {resultat.erreur!r}\n")
+                    sortie.flush()
+                    imprimees += 1
+
+        return {nom: resultats[nom] for nom in ordre}
+
+
+def formater_durees(resultats):
+    """
+    Lignes de durees par verification, de la plus longue a la plus courte.
+
+    Args:
+        resultats: {nom: Resultat}
+
+    Returns:
+        list: Lignes "  nom ....  1.23 s"
+    """
+    largeur = max((len(nom) for nom in resultats), default=0)
+    tries = sorted(resultats.values(), key=lambda r: r.duree, reverse=True)
+    return [f"  {r.nom:<{largeur}}  {r.duree:6.2f} s" for r in tries]